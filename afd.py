@@ -1,10 +1,417 @@
+from array import array
+from visoes import ConjuntoMonitorado, DicionarioMonitorado
+
+def avisar_simbolo_invalido(simbolo: str):
+    # mensagem do modo interativo para um simbolo fora do alfabeto (a cadeia e rejeitada)
+    print(f"---------------------")
+    print(f"Erro: Símbolo '{simbolo}' não pertence ao alfabeto definido.")
+    print(f"Selecione simbolos do alfabeto fornecido: ")
+    print(f"---------------------")
+
 class AFD:
-    def __init__(self, estados, alfabeto, func_transicao, estado_inicial, estados_aceitacao):
-        self.estados = set(estados)
-        self.alfabeto = set(alfabeto)
-        self.func_transicao = func_transicao
-        self.estado_inicial = estado_inicial
-        self.estados_aceitacao = set(estados_aceitacao)
+    """
+    automato finito deterministico
+
+    internamente os estados sao numerados e as transicoes ficam em uma tabela plana
+    array('i') com uma linha por estado e uma coluna por classe de simbolos
+    (tabela[estado * colunas + classe], -1 para transicao indefinida). simbolos com
+    as mesmas transicoes em todos os estados ficam na mesma classe, entao alfabetos
+    grandes (faixas de caracteres, bytes) nao multiplicam o tamanho da tabela
+
+    os atributos estados e func_transicao continuam disponiveis como visoes montadas
+    sob demanda (e guardadas) a partir da tabela, e podem ser editadas como antes.
+    montadas, elas ocupam mais que a propria tabela (um AFD de 4096 estados e 2
+    simbolos usa cerca de 400KB sem as visoes e 1.3MB com elas, sem contar os nomes
+    dos estados), entao para apenas ler use nomes_estados(), transicoes() e
+    quantidade_estados / quantidade_transicoes, que nao montam as visoes.
+    qualquer alteracao nas visoes (ou em alfabeto, estado_inicial e estados_aceitacao)
+    descarta a tabela e a versao compilada, refeitas na proxima consulta. o
+    dicionario passado ao construtor e copiado; use afd.func_transicao para editar
+
+    adicionar_estado, remover_estados e definir_transicao alteram a tabela no lugar,
+    sem refaze-la (as linhas de estados removidos ficam livres, com nome None, e sao
+    reaproveitadas pelos proximos estados adicionados)
+    """
+    __slots__ = ("_alfabeto", "_estado_inicial", "_estados_aceitacao",
+                 "_nomes", "_ids", "_extras", "_livres", "_entradas",
+                 "_classes", "_colunas", "_transicoes",
+                 "_estados", "_func_transicao", "_tabela")
+
+    def __init__(self, estados, alfabeto, func_transicao, estado_inicial, estados_aceitacao,
+                 classes=None):
+        """
+        argumentos:
+            classes (list[list[str]]): opcional, simbolos que se comportam igual em todos
+                os estados. func_transicao so precisa ter as transicoes do primeiro
+                simbolo (em ordem) de cada classe; as dos demais sao iguais a ele
+        """
+        self._alfabeto = ConjuntoMonitorado(alfabeto, self._visao_alterada)
+        self._estado_inicial = estado_inicial
+        self._estados_aceitacao = ConjuntoMonitorado(estados_aceitacao, self._descartar_tabela)
+        self._tabela = None
+        self._estados = set(estados)
+        self._func_transicao = func_transicao
+        self._compactar(classes)
+        # as visoes so voltam a existir se forem pedidas
+        self._estados = None
+        self._func_transicao = None
+
+    def _compactar(self, classes=None):
+        """
+        monta a tabela plana a partir das visoes estados / func_transicao. os estados
+        declarados recebem os primeiros ids (em ordem) e depois vem os que so aparecem
+        nas transicoes ou como estado inicial. no fim, as colunas iguais sao juntadas
+        em uma so classe de simbolos
+        """
+        extras = {self.estado_inicial}
+        simbolos = set(self.alfabeto)
+        for (origem, simbolo), destino in self._func_transicao.items():
+            extras.add(origem)
+            extras.add(destino)
+            simbolos.add(simbolo)
+        extras.discard(None)
+        extras.difference_update(self._estados)
+
+        declarados = sorted(self._estados)
+        self._nomes = declarados + sorted(extras)
+        self._ids = {nome: i for i, nome in enumerate(self._nomes)}
+        # estados que so aparecem nas transicoes ou como inicial (fora da visao estados)
+        self._extras = extras
+        # linhas livres (de estados removidos) e, sob demanda, quantas transicoes chegam em cada estado
+        self._livres = []
+        self._entradas = None
+        if classes is None:
+            classes = [[simbolo] for simbolo in sorted(simbolos)]
+        else:
+            classes = [sorted(classe) for classe in classes if classe]
+            cobertos = {simbolo for classe in classes for simbolo in classe}
+            classes += [[simbolo] for simbolo in simbolos - cobertos]
+            classes.sort()
+        colunas = {simbolo: j for j, classe in enumerate(classes) for simbolo in classe}
+
+        k = len(classes)
+        tabela = array("i", [-1]) * (len(self._nomes) * k)
+        for (origem, simbolo), destino in self._func_transicao.items():
+            tabela[self._ids[origem] * k + colunas[simbolo]] = self._ids[destino]
+
+        # junta as colunas identicas (simbolos que levam sempre aos mesmos estados)
+        grupos = {}
+        for j in range(k):
+            grupos.setdefault(tabela[j::k].tobytes(), []).append(j)
+        if len(grupos) < k:
+            mantidas = [js[0] for js in grupos.values()]
+            classes = [sorted(simbolo for j in js for simbolo in classes[j]) for js in grupos.values()]
+            colunas = {simbolo: j for j, classe in enumerate(classes) for simbolo in classe}
+            compacta = array("i")
+            for i in range(len(self._nomes)):
+                linha = i * k
+                compacta.extend(tabela[linha + j] for j in mantidas)
+            tabela = compacta
+
+        self._classes = classes
+        self._colunas = colunas
+        self._transicoes = tabela
+
+    def _garantir_compacto(self):
+        # refaz a tabela se as visoes foram trocadas ou editadas
+        if self._transicoes is None:
+            self._compactar()
+
+    def _garantir_visoes(self):
+        self.estados
+        self.func_transicao
+
+    def _visao_alterada(self):
+        # aviso das visoes e do alfabeto: a tabela e refeita a partir das visoes
+        if self._transicoes is not None:
+            self._garantir_visoes()
+            self._transicoes = None
+        self._tabela = None
+
+    def _descartar_tabela(self):
+        # aviso de estados_aceitacao: so a versao compilada fica obsoleta
+        self._tabela = None
+
+    @property
+    def estados(self) -> set:
+        if self._estados is None:
+            extras = self._extras
+            self._estados = ConjuntoMonitorado(
+                (nome for nome in self._nomes if nome is not None and nome not in extras),
+                self._visao_alterada
+            )
+        return self._estados
+
+    @estados.setter
+    def estados(self, estados):
+        self._garantir_visoes()
+        self._estados = ConjuntoMonitorado(estados, self._visao_alterada)
+        self._visao_alterada()
+
+    @property
+    def func_transicao(self) -> dict:
+        if self._func_transicao is None:
+            self._func_transicao = DicionarioMonitorado(
+                {(origem, simbolo): destino for origem, simbolo, destino in self.transicoes()},
+                self._visao_alterada
+            )
+        return self._func_transicao
+
+    @func_transicao.setter
+    def func_transicao(self, func_transicao: dict):
+        self._garantir_visoes()
+        self._func_transicao = DicionarioMonitorado(func_transicao, self._visao_alterada)
+        self._visao_alterada()
+
+    @property
+    def alfabeto(self) -> set:
+        return self._alfabeto
+
+    @alfabeto.setter
+    def alfabeto(self, alfabeto):
+        self._alfabeto = ConjuntoMonitorado(alfabeto, self._visao_alterada)
+        self._visao_alterada()
+
+    @property
+    def estados_aceitacao(self) -> set:
+        return self._estados_aceitacao
+
+    @estados_aceitacao.setter
+    def estados_aceitacao(self, estados_aceitacao):
+        self._estados_aceitacao = ConjuntoMonitorado(estados_aceitacao, self._descartar_tabela)
+        self._tabela = None
+
+    @property
+    def estado_inicial(self):
+        return self._estado_inicial
+
+    @estado_inicial.setter
+    def estado_inicial(self, estado):
+        if self._transicoes is not None and estado is not None and estado not in self._ids:
+            # estado ainda sem id: a tabela e refeita para inclui-lo
+            self._garantir_visoes()
+            self._transicoes = None
+        self._estado_inicial = estado
+        self._tabela = None
+
+    @property
+    def quantidade_estados(self) -> int:
+        # o mesmo que len(estados), sem montar a visao
+        self._garantir_compacto()
+        return len(self._ids) - len(self._extras)
+
+    @property
+    def quantidade_transicoes(self) -> int:
+        # o mesmo que len(func_transicao), sem montar a visao
+        self._garantir_compacto()
+        k = len(self._classes)
+        tamanhos = [len(classe) for classe in self._classes]
+        return sum(tamanhos[posicao % k] for posicao, destino in enumerate(self._transicoes) if destino >= 0)
+
+    def nomes_estados(self) -> list:
+        # o mesmo que list(estados), sem montar a visao
+        self._garantir_compacto()
+        extras = self._extras
+        return [nome for nome in self._nomes if nome is not None and nome not in extras]
+
+    def transicoes(self):
+        """
+        percorre as transicoes definidas a partir da tabela, sem montar func_transicao
+
+        retorno:
+            gerador de (origem, simbolo, destino)
+        """
+        self._garantir_compacto()
+        nomes = self._nomes
+        classes = self._classes
+        tabela = self._transicoes
+        k = len(classes)
+        for posicao, destino in enumerate(tabela):
+            if destino >= 0:
+                origem = nomes[posicao // k]
+                for simbolo in classes[posicao % k]:
+                    yield origem, simbolo, nomes[destino]
+
+    def classes_simbolos(self) -> list:
+        """
+        retorno:
+            list[list[str]]: as classes de simbolos (cada uma em ordem) que tem as mesmas
+                             transicoes em todos os estados, uma por coluna da tabela
+        """
+        self._garantir_compacto()
+        return [list(classe) for classe in self._classes]
+
+    # --- alteracoes no lugar ---
+
+    def _contar_entradas(self) -> array:
+        # quantas posicoes da tabela levam a cada estado (calculado na primeira alteracao)
+        if self._entradas is None:
+            entradas = array("i", [0]) * len(self._nomes)
+            for destino in self._transicoes:
+                if destino >= 0:
+                    entradas[destino] += 1
+            self._entradas = entradas
+        return self._entradas
+
+    def adicionar_estado(self, nome: str):
+        """
+        inclui um estado, ainda sem transicoes, sem refazer a tabela: ocupa uma linha
+        livre ou ganha uma nova no fim. um estado que so aparecia nas transicoes passa
+        a ser declarado
+        """
+        self._garantir_compacto()
+        if nome in self._ids:
+            if nome in self._extras:
+                self._extras.discard(nome)
+                if self._estados is not None:
+                    set.add(self._estados, nome)
+            return
+        if self._livres:
+            i = self._livres.pop()
+            self._nomes[i] = nome
+        else:
+            i = len(self._nomes)
+            self._nomes.append(nome)
+            self._transicoes.extend(array("i", [-1]) * len(self._classes))
+            if self._entradas is not None:
+                self._entradas.append(0)
+        self._ids[nome] = i
+        # as visoes ja montadas sao atualizadas sem aviso (a tabela ja esta certa)
+        if self._estados is not None:
+            set.add(self._estados, nome)
+        self._tabela = None
+
+    def remover_estados(self, nomes):
+        """
+        retira os estados, as transicoes que saem deles e as que chegam neles (que
+        ficam indefinidas). o custo e proporcional as linhas removidas; so se algum
+        outro estado ainda tiver transicao para eles a tabela inteira e percorrida
+
+        argumentos:
+            nomes (iteravel de str): os estados a remover (o inicial nao pode estar entre eles)
+        """
+        self._garantir_compacto()
+        removidos = {nome for nome in nomes if nome in self._ids}
+        if not removidos:
+            return
+        if self.estado_inicial in removidos:
+            raise ValueError(f"O estado inicial '{self.estado_inicial}' nao pode ser removido")
+        ids = {self._ids[nome] for nome in removidos}
+        entradas = self._contar_entradas()
+        tabela = self._transicoes
+        k = len(self._classes)
+        limpas = []
+        for i in ids:
+            for posicao in range(i * k, (i + 1) * k):
+                destino = tabela[posicao]
+                if destino >= 0:
+                    entradas[destino] -= 1
+                    tabela[posicao] = -1
+                    limpas.append(posicao)
+        if any(entradas[i] for i in ids):
+            for posicao, destino in enumerate(tabela):
+                if destino in ids:
+                    entradas[destino] -= 1
+                    tabela[posicao] = -1
+                    limpas.append(posicao)
+
+        for i in ids:
+            nome = self._nomes[i]
+            del self._ids[nome]
+            self._nomes[i] = None
+            self._extras.discard(nome)
+            self._livres.append(i)
+        self.estados_aceitacao.difference_update(removidos)
+        if self._estados is not None:
+            set.difference_update(self._estados, removidos)
+        if self._func_transicao is not None:
+            for posicao in limpas:
+                origem = self._nomes[posicao // k]
+                for simbolo in self._classes[posicao % k]:
+                    dict.pop(self._func_transicao, (origem, simbolo), None)
+            for nome in removidos:
+                for classe in self._classes:
+                    for simbolo in classe:
+                        dict.pop(self._func_transicao, (nome, simbolo), None)
+        self._tabela = None
+
+    def _separar_coluna(self, simbolos: list) -> int:
+        """
+        coloca os simbolos (todos de uma mesma classe, ou ainda sem coluna) em uma
+        classe so deles, em uma nova ultima coluna: copia da coluna da classe antiga,
+        ou indefinida se eles ainda nao tinham coluna
+
+        retorno:
+            int: a nova coluna
+        """
+        antiga = self._transicoes
+        k = len(self._classes)
+        j = self._colunas.get(simbolos[0])
+        tabela = array("i")
+        for i in range(len(self._nomes)):
+            linha = antiga[i * k:(i + 1) * k]
+            tabela.extend(linha)
+            tabela.append(-1 if j is None else linha[j])
+        if j is not None:
+            separados = set(simbolos)
+            self._classes[j] = [simbolo for simbolo in self._classes[j] if simbolo not in separados]
+            if self._entradas is not None:
+                for destino in antiga[j::k]:
+                    if destino >= 0:
+                        self._entradas[destino] += 1
+        self._classes.append(sorted(simbolos))
+        for simbolo in simbolos:
+            self._colunas[simbolo] = k
+        self._transicoes = tabela
+        return k
+
+    def definir_transicoes(self, origem: str, simbolos, destino):
+        """
+        define delta(origem, simbolo) = destino para cada simbolo dado, direto na tabela
+        (com destino None, as transicoes ficam indefinidas). origem e destino precisam
+        existir (ver adicionar_estado). se parte de uma classe de simbolos passa a se
+        comportar diferente do restante dela, essa parte ganha uma coluna propria, e so
+        nesse caso a tabela e copiada
+        """
+        self._garantir_compacto()
+        for estado in (origem, destino):
+            if estado is not None and estado not in self._ids:
+                raise ValueError(f"Estado desconhecido: '{estado}'")
+        i = self._ids[origem]
+        novo = -1 if destino is None else self._ids[destino]
+
+        # agrupa os simbolos pela coluna atual (None: simbolo ainda sem coluna)
+        grupos = {}
+        for simbolo in dict.fromkeys(simbolos):
+            grupos.setdefault(self._colunas.get(simbolo), []).append(simbolo)
+        for j, grupo in grupos.items():
+            k = len(self._classes)
+            if j is not None and self._transicoes[i * k + j] == novo:
+                continue
+            if j is None or len(grupo) < len(self._classes[j]):
+                if j is None and novo < 0:
+                    continue
+                j = self._separar_coluna(grupo)
+                k = len(self._classes)
+            posicao = i * k + j
+            atual = self._transicoes[posicao]
+            if self._entradas is not None:
+                if atual >= 0:
+                    self._entradas[atual] -= 1
+                if novo >= 0:
+                    self._entradas[novo] += 1
+            self._transicoes[posicao] = novo
+            if self._func_transicao is not None:
+                for simbolo in grupo:
+                    if destino is None:
+                        dict.pop(self._func_transicao, (origem, simbolo), None)
+                    else:
+                        dict.__setitem__(self._func_transicao, (origem, simbolo), destino)
+        self._tabela = None
+
+    def definir_transicao(self, origem: str, simbolo: str, destino):
+        # o mesmo que definir_transicoes para um unico simbolo
+        self.definir_transicoes(origem, (simbolo,), destino)
         
     def processar_cadeia(self, cadeia: str) -> bool:
         """
@@ -17,44 +424,483 @@ class AFD:
             bool: true se a cadeia for aceita (terminar em estado de aceitação),
                   false caso contrario
         """
-        estado_atual = self.estado_inicial
+        # a tabela compilada (a mesma de processar_lote) e lida em variaveis locais:
+        # cada simbolo custa um get no dicionario de colunas e dois acessos a listas
+        tabela = self.compilar()
+        linhas = tabela.linhas
+        coluna = tabela.coluna.get
+        fora = tabela.coluna_fora
+        morto = tabela.morto
+        estado_atual = tabela.inicial
         
         for simbolo in cadeia:
             """
             sequencia de verificacoes:
             1. verificacao se o simbolo na cadeia fornecida pertence ao alfabeto
             2. devera buscar a transicao que corresponde ao estado atual e ao simbolo lido
-                2.1 se a transicao for indefinida(None), a cadeia sera rejeitada
+                2.1 se a transicao for indefinida (estado morto), a cadeia sera rejeitada
             """
-            if simbolo not in self.alfabeto:
-                print(f"---------------------")    
-                print(f"Erro: Símbolo '{simbolo}' não pertence ao alfabeto definido.")
-                print(f"Selecione simbolos do alfabeto fornecido: ")
-                print(f"---------------------")    
+            j = coluna(simbolo, fora)
+            if j == fora:
+                avisar_simbolo_invalido(simbolo)
                 return False
             
             # 2
-            proximo_estado = self.func_transicao.get((estado_atual, simbolo))
+            proximo_estado = linhas[estado_atual][j]
             # 2.1
-            if proximo_estado is None:
-                print(f"Erro: Transição indefinida para o estado '{estado_atual}' com o símbolo '{simbolo}'.")
+            if proximo_estado == morto:
+                nome_atual = tabela.estados[estado_atual] if estado_atual != morto else self._estado_inicial
+                print(f"Erro: Transição indefinida para o estado '{nome_atual}' com o símbolo '{simbolo}'.")
                 return False
             estado_atual = proximo_estado
         # apos processar toda a cadeia, verifica se o estado final esta no conjunto de aceitacao
-        return estado_atual in self.estados_aceitacao
+        return tabela.aceitacao[estado_atual]
+
+    def compilar(self, recompilar: bool = False) -> "TabelaAFD":
+        """
+        gera (uma unica vez) a tabela de transicoes densa usada por processar_lote
+        e processar_fluxo. alterar o AFD descarta a tabela, que e gerada de novo na
+        proxima chamada; recompilar=True forca a geracao
+        """
+        if self._tabela is None or recompilar:
+            self._garantir_compacto()
+            self._tabela = TabelaAFD(self)
+        return self._tabela
+
+    def processar_lote(self, cadeias) -> list:
+        """
+        testa varias cadeias de uma vez usando a tabela compilada, sem imprimir nada
+
+        argumentos:
+            cadeias (iteravel de str): as cadeias de entrada
+        retorno:
+            list[bool]: true/false para cada cadeia, na mesma ordem
+        """
+        aceita = self.compilar().aceita
+        return [aceita(cadeia) for cadeia in cadeias]
+
+    def processar_fluxo(self, arquivo):
+        """
+        testa cada linha de um arquivo de texto aberto (sem o '\\n' final),
+        produzindo os resultados sob demanda, sem carregar o arquivo inteiro
+
+        argumentos:
+            arquivo: objeto de arquivo (ou qualquer iteravel de linhas)
+        retorno:
+            gerador de bool, um resultado por linha
+        """
+        aceita = self.compilar().aceita
+        for linha in arquivo:
+            yield aceita(linha.rstrip("\r\n"))
+
+    def minimizar(self) -> "AFD":
+        """
+        gera o AFD minimo equivalente a este
+
+        1. remove os estados inalcancaveis a partir do estado inicial
+        2. remove os estados mortos (que nao alcancam nenhum estado de aceitacao);
+           as transicoes para eles ficam indefinidas, o que ja rejeita a cadeia
+        3. junta os estados equivalentes pelo refinamento de particoes de Hopcroft,
+           em O(n.k.log n) para n estados e k classes de simbolos
+
+        cada estado do AFD minimo recebe o nome do primeiro (em ordem) dos estados
+        originais que ele representa
+
+        retorno:
+            AFD: um novo objeto AFD, o original nao e alterado
+        """
+        self._garantir_compacto()
+        # o refinamento e feito por classe de simbolos (uma coluna da tabela), usando
+        # o primeiro simbolo do alfabeto de cada classe como representante
+        classes = [[simbolo for simbolo in classe if simbolo in self.alfabeto] for classe in self._classes]
+        colunas = [j for j, classe in enumerate(classes) if classe]
+        classes = [classes[j] for j in colunas]
+        simbolos = [classe[0] for classe in classes]
+        tabela = self._transicoes
+        k = len(self._classes)
+
+        def destino_original(estado: int, j: int) -> int:
+            return tabela[estado * k + colunas[j]]
+
+        # 1- estados alcancaveis (busca em largura a partir do inicial)
+        inicial = self._ids.get(self.estado_inicial)
+        alcancaveis = {inicial}
+        fila = [inicial]
+        for estado in fila:
+            for j in range(len(simbolos)):
+                destino = destino_original(estado, j)
+                if destino >= 0 and destino not in alcancaveis:
+                    alcancaveis.add(destino)
+                    fila.append(destino)
+
+        # 2- estados uteis: alcancaveis que chegam a algum estado de aceitacao
+        anteriores = {}
+        for estado in alcancaveis:
+            for j in range(len(simbolos)):
+                destino = destino_original(estado, j)
+                if destino >= 0:
+                    anteriores.setdefault(destino, []).append(estado)
+        uteis = {estado for estado in alcancaveis if self._nomes[estado] in self.estados_aceitacao}
+        fila = list(uteis)
+        for estado in fila:
+            for origem in anteriores.get(estado, ()):
+                if origem not in uteis:
+                    uteis.add(origem)
+                    fila.append(origem)
+
+        if inicial not in uteis:
+            # linguagem vazia: basta o estado inicial, sem transicoes
+            return AFD({self.estado_inicial}, self.alfabeto, {}, self.estado_inicial, set())
+
+        # 3- Hopcroft sobre os estados uteis completados com um sumidouro (indice n)
+        # mesma ordem dos ids de uma tabela recem-montada: declarados e depois os extras,
+        # cada grupo por nome (as linhas reaproveitadas por adicionar_estado ficam fora de ordem)
+        originais = sorted(uteis, key=lambda estado: (self._nomes[estado] in self._extras, self._nomes[estado]))
+        estados = [self._nomes[estado] for estado in originais]
+        n = len(estados)
+        indice = {estado: i for i, estado in enumerate(estados)}
+        novo_id = {estado: i for i, estado in enumerate(originais)}
+        delta = [[n] * len(simbolos) for _ in range(n + 1)]
+        for i, estado in enumerate(originais):
+            for j in range(len(simbolos)):
+                destino = destino_original(estado, j)
+                if destino in novo_id:
+                    delta[i][j] = novo_id[destino]
+
+        # inversa: inversa[j][q] = estados p com delta(p, simbolos[j]) = q
+        inversa = [[[] for _ in range(n + 1)] for _ in simbolos]
+        for p in range(n + 1):
+            for j in range(len(simbolos)):
+                inversa[j][delta[p][j]].append(p)
+
+        finais = {i for i, estado in enumerate(estados) if estado in self.estados_aceitacao}
+        nao_finais = set(range(n + 1)) - finais
+        blocos = [set(finais)] + ([nao_finais] if nao_finais else [])
+        bloco_de = [0] * (n + 1)
+        for b, membros in enumerate(blocos):
+            for q in membros:
+                bloco_de[q] = b
+
+        menor = min(range(len(blocos)), key=lambda b: len(blocos[b]))
+        pendentes = [(menor, j) for j in range(len(simbolos))]
+        em_pendentes = set(pendentes)
+
+        while pendentes:
+            divisor = pendentes.pop()
+            em_pendentes.discard(divisor)
+            b, j = divisor
+            # X = estados que vao para o bloco b com o simbolo j
+            atingidos = {}
+            for q in blocos[b]:
+                for p in inversa[j][q]:
+                    atingidos.setdefault(bloco_de[p], set()).add(p)
+
+            for y, dentro in atingidos.items():
+                if len(dentro) == len(blocos[y]):
+                    continue
+                # divide o bloco y em (y - X) e (y & X); a parte em X vira o bloco z
+                z = len(blocos)
+                blocos[y] -= dentro
+                blocos.append(dentro)
+                for p in dentro:
+                    bloco_de[p] = z
+                for c in range(len(simbolos)):
+                    if (y, c) in em_pendentes:
+                        novo = (z, c)
+                    else:
+                        novo = (z, c) if len(dentro) <= len(blocos[y]) else (y, c)
+                    pendentes.append(novo)
+                    em_pendentes.add(novo)
+
+        # monta o AFD minimo (o bloco do sumidouro so contem estados mortos e e descartado)
+        sumidouro = bloco_de[n]
+        nomes_blocos = {}
+        for i, estado in enumerate(estados):
+            nomes_blocos.setdefault(bloco_de[i], estado)
+
+        func_transicao = {}
+        for b, nome in nomes_blocos.items():
+            representante = indice[nome]
+            for j, simbolo in enumerate(simbolos):
+                destino = bloco_de[delta[representante][j]]
+                if destino != sumidouro:
+                    func_transicao[(nome, simbolo)] = nomes_blocos[destino]
+
+        return AFD(
+            estados=set(nomes_blocos.values()),
+            alfabeto=self.alfabeto,
+            func_transicao=func_transicao,
+            estado_inicial=nomes_blocos[bloco_de[indice[self.estado_inicial]]],
+            estados_aceitacao={nomes_blocos[bloco_de[q]] for q in finais},
+            classes=classes
+        )
+
+    # --- operacoes por construcao de produto ---
+
+    def _classes_comuns(self, outro: "AFD" = None) -> list:
+        """
+        agrupa os simbolos do alfabeto (da uniao dos alfabetos, se houver outro AFD)
+        que caem na mesma classe nas duas tabelas, ou seja, que se comportam igual nos
+        dois automatos; as operacoes abaixo exploram apenas um simbolo por grupo
+        """
+        self._garantir_compacto()
+        alfabeto = self.alfabeto if outro is None else self.alfabeto | outro.alfabeto
+        if outro is not None:
+            outro._garantir_compacto()
+        grupos = {}
+        for simbolo in sorted(alfabeto):
+            chave = (self._colunas[simbolo] if simbolo in self.alfabeto else None,
+                     None if outro is None or simbolo not in outro.alfabeto else outro._colunas[simbolo])
+            grupos.setdefault(chave, []).append(simbolo)
+        return list(grupos.values())
+
+    def _funcao_destino(self, simbolos: list):
+        """
+        devolve destino(estado, j) sobre a tabela compacta para a lista de simbolos dada,
+        usando -1 como estado morto (transicao indefinida ou simbolo fora do alfabeto)
+        """
+        self._garantir_compacto()
+        tabela = self._transicoes
+        k = len(self._classes)
+        colunas = [self._colunas.get(simbolo) if simbolo in self.alfabeto else None
+                   for simbolo in simbolos]
+
+        def destino(estado: int, j: int) -> int:
+            coluna = colunas[j]
+            if estado < 0 or coluna is None:
+                return -1
+            return tabela[estado * k + coluna]
+        return destino
+
+    def _aceitacao_ids(self) -> set:
+        return {self._ids[estado] for estado in self.estados_aceitacao if estado in self._ids}
+
+    def _produto(self, outro: "AFD", aceita, morto) -> "AFD":
+        """
+        construcao de produto sob demanda: parte do par de estados iniciais e so cria
+        os pares alcancaveis. um par (p, q) usa -1 para o estado morto de cada lado
+
+        argumentos:
+            outro (AFD): o segundo automato
+            aceita: funcao (bool, bool) -> bool que diz se o par e de aceitacao
+            morto: funcao (p, q) -> bool para os pares que nunca levam a aceitacao;
+                   as transicoes para eles ficam indefinidas
+        retorno:
+            AFD: novo AFD sobre a uniao dos alfabetos, com estados S0, S1, ...
+        """
+        alfabeto = self.alfabeto | outro.alfabeto
+        classes = self._classes_comuns(outro)
+        simbolos = [classe[0] for classe in classes]
+        destino_a = self._funcao_destino(simbolos)
+        destino_b = outro._funcao_destino(simbolos)
+        finais_a = self._aceitacao_ids()
+        finais_b = outro._aceitacao_ids()
+
+        inicial = (self._ids.get(self.estado_inicial, -1), outro._ids.get(outro.estado_inicial, -1))
+        nomes = {inicial: "S0"}
+        fila = [inicial]
+        func_transicao = {}
+        if not morto(*inicial):
+            for par in fila:
+                p, q = par
+                for j, simbolo in enumerate(simbolos):
+                    proximo = (destino_a(p, j), destino_b(q, j))
+                    if morto(*proximo):
+                        continue
+                    if proximo not in nomes:
+                        nomes[proximo] = f"S{len(nomes)}"
+                        fila.append(proximo)
+                    func_transicao[(nomes[par], simbolo)] = nomes[proximo]
+
+        finais = {nome for (p, q), nome in nomes.items() if aceita(p in finais_a, q in finais_b)}
+        return AFD(set(nomes.values()), alfabeto, func_transicao, "S0", finais, classes=classes)
+
+    def intersecao(self, outro: "AFD") -> "AFD":
+        """
+        AFD que aceita as cadeias aceitas pelos dois automatos
+        """
+        return self._produto(outro, lambda a, b: a and b, lambda p, q: p < 0 or q < 0)
+
+    def uniao(self, outro: "AFD") -> "AFD":
+        """
+        AFD que aceita as cadeias aceitas por pelo menos um dos automatos
+        """
+        return self._produto(outro, lambda a, b: a or b, lambda p, q: p < 0 and q < 0)
+
+    def diferenca(self, outro: "AFD") -> "AFD":
+        """
+        AFD que aceita as cadeias aceitas por este automato e rejeitadas pelo outro
+        """
+        return self._produto(outro, lambda a, b: a and not b, lambda p, q: p < 0)
+
+    def _completo(self) -> tuple:
+        """
+        completa o automato com um estado sumidouro ("morto", ou com ' ate o nome
+        ficar livre) para onde vao as transicoes indefinidas. o sumidouro so e
+        incluido se alguma transicao (ou o estado inicial) precisar dele
+
+        retorno:
+            tuple: (estados, func_transicao, estado_inicial, classes) do automato completo
+        """
+        classes = self._classes_comuns()
+        simbolos = [classe[0] for classe in classes]
+        destino = self._funcao_destino(simbolos)
+        nomes = list(self._nomes)
+        sumidouro = "morto"
+        while sumidouro in self._ids:
+            sumidouro += "'"
+
+        inicial = self.estado_inicial if self.estado_inicial in self._ids else sumidouro
+        func_transicao = {}
+        usou_sumidouro = inicial == sumidouro
+        for estado, nome in enumerate(nomes):
+            if nome is None:
+                continue
+            for j, simbolo in enumerate(simbolos):
+                proximo = destino(estado, j)
+                if proximo < 0:
+                    func_transicao[(nome, simbolo)] = sumidouro
+                    usou_sumidouro = True
+                else:
+                    func_transicao[(nome, simbolo)] = nomes[proximo]
+        estados = set(nomes)
+        estados.discard(None)
+        if usou_sumidouro:
+            estados.add(sumidouro)
+            for simbolo in simbolos:
+                func_transicao[(sumidouro, simbolo)] = sumidouro
+        return estados, func_transicao, inicial, classes
+
+    def completar(self) -> "AFD":
+        """
+        AFD equivalente sem transicoes indefinidas: elas passam a ir para um estado
+        sumidouro explicito (ver _completo). util para testar cadeias no AFD minimo,
+        que nao tem o estado morto, sem que toda rejeicao vire "transicao indefinida"
+        """
+        estados, func_transicao, inicial, classes = self._completo()
+        return AFD(estados, self.alfabeto, func_transicao, inicial, set(self.estados_aceitacao),
+                   classes=classes)
+
+    def complemento(self) -> "AFD":
+        """
+        AFD que aceita exatamente as cadeias sobre o alfabeto que este rejeita.
+        o automato e completado com um estado sumidouro (ver _completo) e os estados
+        de aceitacao sao trocados
+        """
+        estados, func_transicao, inicial, classes = self._completo()
+        return AFD(estados, self.alfabeto, func_transicao, inicial, estados - self.estados_aceitacao,
+                   classes=classes)
+
+    def equivalente(self, outro: "AFD") -> tuple:
+        """
+        verifica se os dois automatos aceitam a mesma linguagem (algoritmo de
+        Hopcroft-Karp): percorre os pares alcancaveis juntando os estados em uma
+        estrutura union-find e para no primeiro par em que um aceita e o outro nao
+
+        os simbolos fora do alfabeto de um automato levam ao estado morto dele,
+        como em processar_cadeia
+
+        retorno:
+            tuple: (True, None) se forem equivalentes, ou (False, contraexemplo) com
+                   uma cadeia (encontrada em largura) que so um dos dois aceita
+        """
+        simbolos = [classe[0] for classe in self._classes_comuns(outro)]
+        destino_a = self._funcao_destino(simbolos)
+        destino_b = outro._funcao_destino(simbolos)
+        finais_a = self._aceitacao_ids()
+        finais_b = outro._aceitacao_ids()
+
+        # os estados de 'outro' sao deslocados para nao colidir com os deste automato;
+        # cada lado tem o seu estado morto (chave -1 e deslocamento - 1)
+        deslocamento = len(self._nomes) + 1
+        pai = {}
+
+        def raiz(x):
+            pai.setdefault(x, x)
+            while pai[x] != x:
+                pai[x] = pai[pai[x]]
+                x = pai[x]
+            return x
+
+        inicial = (self._ids.get(self.estado_inicial, -1), outro._ids.get(outro.estado_inicial, -1))
+        # cada par guarda (indice do par anterior, simbolo) para remontar o contraexemplo
+        pares = [inicial]
+        origem = [None]
+        pai[raiz(inicial[0])] = raiz(deslocamento + inicial[1])
+        for i, (p, q) in enumerate(pares):
+            if (p in finais_a) != (q in finais_b):
+                cadeia = []
+                while origem[i] is not None:
+                    i, simbolo = origem[i]
+                    cadeia.append(simbolo)
+                return False, "".join(reversed(cadeia))
+            for j, simbolo in enumerate(simbolos):
+                p2, q2 = destino_a(p, j), destino_b(q, j)
+                raiz_a, raiz_b = raiz(p2), raiz(deslocamento + q2)
+                if raiz_a != raiz_b:
+                    pai[raiz_a] = raiz_b
+                    pares.append((p2, q2))
+                    origem.append((i, simbolo))
+        return True, None
 
     def imprimir(self):
         #imprimindo o afd
         print("\n--- Autômato Finito Determinístico (AFD) ---")
-        print(f"Estados (Q): {sorted(list(self.estados))}")
+        print(f"Estados (Q): {sorted(self.nomes_estados())}")
         print(f"Alfabeto (Σ): {sorted(list(self.alfabeto))}")
         print(f"Estado Inicial (q0): {self.estado_inicial}")
         print(f"Estados Finais (F): {sorted(list(self.estados_aceitacao))}")
         print("Função de Transição (δ):")
         
-        # imprimindo de forma ordenada as funcoes de transicao
-        chaves_ordenadas = sorted(self.func_transicao.keys())
-        for (estado, simbolo) in chaves_ordenadas:
-            proximo = self.func_transicao[(estado, simbolo)]
+        # imprimindo de forma ordenada as funcoes de transicao (lidas da tabela, sem
+        # montar as visoes, que ficariam guardadas no AFD)
+        for estado, simbolo, proximo in sorted(self.transicoes()):
             print(f"  δ({estado}, {simbolo}) = {proximo}")
-        print("--------------------------------------------")
\ No newline at end of file
+        print("--------------------------------------------")
+
+
+class TabelaAFD:
+    """
+    forma compilada do AFD para testar muitas cadeias rapidamente
+
+    os estados viram indices de linha e as classes de simbolos do AFD indices de
+    coluna (coluna[simbolo] e a tabela simbolo -> classe). cada linha e um array('i')
+    com o destino de cada coluna; transicoes indefinidas e simbolos fora do alfabeto
+    levam ao estado morto (a ultima linha), que nunca aceita. a ultima coluna e
+    reservada para os simbolos fora do alfabeto
+    """
+    def __init__(self, afd: AFD):
+        # copia: a lista de nomes do AFD muda com adicionar_estado / remover_estados
+        self.estados: list = list(afd._nomes)
+        self.simbolos: list = sorted(afd.alfabeto)
+
+        k = len(afd._classes)
+        self.coluna: dict = {simbolo: afd._colunas[simbolo] for simbolo in self.simbolos}
+        self.coluna_fora = k
+        self.morto = len(self.estados)
+
+        # reorganiza a tabela plana do AFD em linhas, trocando -1 pelo estado morto
+        tabela = afd._transicoes
+        self.linhas: list = []
+        for estado in range(self.morto):
+            linha = array('i', (self.morto if destino < 0 else destino
+                                for destino in tabela[estado * k:(estado + 1) * k]))
+            linha.append(self.morto)
+            self.linhas.append(linha)
+        self.linhas.append(array('i', [self.morto]) * (k + 1))
+
+        self.inicial = afd._ids.get(afd.estado_inicial, self.morto)
+        self.aceitacao: list = [estado in afd.estados_aceitacao for estado in self.estados] + [False]
+
+    def aceita(self, cadeia: str) -> bool:
+        # mesma semantica de AFD.processar_cadeia, mas sem mensagens
+        linhas = self.linhas
+        coluna = self.coluna.get
+        fora = self.coluna_fora
+        morto = self.morto
+        estado = self.inicial
+        for simbolo in cadeia:
+            estado = linhas[estado][coluna(simbolo, fora)]
+            if estado == morto:
+                return False
+        return self.aceitacao[estado]
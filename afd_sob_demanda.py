@@ -0,0 +1,114 @@
+from afn import AFN
+from afd import avisar_simbolo_invalido
+
+# quantidade padrao de macro-estados mantidos no cache do AFD sob demanda
+MAX_ESTADOS_PADRAO = 10000
+# quantas vezes o cache pode ser esvaziado durante uma mesma cadeia antes de
+# desistir dele e simular o AFN diretamente no restante da cadeia
+MAX_REINICIOS_POR_CADEIA = 3
+
+class AFDSobDemanda:
+    """
+    AFD construido sob demanda (determinizacao preguicosa) a partir de um AFN
+
+    em vez de fazer a construcao de subconjuntos completa, os macro-estados e as
+    transicoes sao criados apenas quando uma cadeia passa por eles, e ficam guardados
+    em um cache limitado a max_estados macro-estados. quando o cache enche ele e
+    esvaziado por inteiro (como no cache de estados do RE2); se isso acontecer mais
+    de max_reinicios vezes na mesma cadeia, o restante dela e processado simulando o
+    AFN passo a passo, sem guardar nada
+
+    o AFN nao deve ser alterado enquanto este objeto estiver em uso
+    """
+    def __init__(self, afn: AFN, max_estados: int = MAX_ESTADOS_PADRAO,
+                 max_reinicios: int = MAX_REINICIOS_POR_CADEIA):
+        if max_estados < 2:
+            raise ValueError("O cache precisa comportar pelo menos 2 macro-estados")
+        self.alfabeto = set(afn.alfabeto)
+        self.max_estados = max_estados
+        self.max_reinicios = max_reinicios
+
+        self._indice = afn.indexar()
+        self._inicial = self._indice.mascara_inicial
+        # as transicoes conhecidas sao guardadas por classe de simbolos do indice, entao
+        # descobrir a transicao de um simbolo ja resolve a de toda a sua classe
+        self._classe_de = self._indice.classe_de
+
+        # contadores para acompanhar o comportamento do cache
+        self.estados_criados = 0
+        self.reinicios = 0
+        self.cadeias_simuladas = 0
+
+        self._esvaziar_cache()
+
+    def _esvaziar_cache(self):
+        # macro-estado (bitmask) -> id, e por id: bitmask, transicoes ja conhecidas
+        # (classe de simbolos -> id) e aceitacao
+        self._ids: dict[int, int] = {}
+        self._mascaras: list[int] = []
+        self._transicoes: list[dict] = []
+        self._aceitacao: list[bool] = []
+
+    def _obter_id(self, mascara: int) -> int:
+        # retorna o id do macro-estado no cache, criando-o se necessario
+        id_estado = self._ids.get(mascara)
+        if id_estado is None:
+            id_estado = len(self._mascaras)
+            self._ids[mascara] = id_estado
+            self._mascaras.append(mascara)
+            self._transicoes.append({})
+            self._aceitacao.append(bool(mascara & self._indice.aceitacao))
+            self.estados_criados += 1
+        return id_estado
+
+    def processar_cadeia(self, cadeia: str) -> bool:
+        """
+        simulacao do afd sob demanda atraves da cadeia de entrada, com a mesma
+        semantica de AFD.processar_cadeia
+
+        argumentos:
+            cadeia (string): a cadeia de entrada a ser testada
+        retorno:
+            bool: true se a cadeia for aceita, false caso contrario
+        """
+        reinicios_cadeia = 0
+        if self._inicial not in self._ids and len(self._mascaras) >= self.max_estados:
+            self.reinicios += 1
+            self._esvaziar_cache()
+        estado = self._obter_id(self._inicial)
+
+        classe_de = self._classe_de
+        for posicao, simbolo in enumerate(cadeia):
+            classe = classe_de.get(simbolo)
+            if classe is None:
+                avisar_simbolo_invalido(simbolo)
+                return False
+            proximo = self._transicoes[estado].get(classe)
+            if proximo is not None:
+                estado = proximo
+                continue
+
+            # transicao ainda nao conhecida: calcula o macro-estado destino
+            mascara = self._indice.sucessor(self._mascaras[estado], simbolo)
+            if mascara not in self._ids and len(self._mascaras) >= self.max_estados:
+                self.reinicios += 1
+                reinicios_cadeia += 1
+                if reinicios_cadeia > self.max_reinicios:
+                    # o cache nao esta ajudando: simula o AFN no restante da cadeia
+                    self.cadeias_simuladas += 1
+                    for simbolo in cadeia[posicao + 1:]:
+                        if simbolo not in classe_de:
+                            avisar_simbolo_invalido(simbolo)
+                            return False
+                        mascara = self._indice.sucessor(mascara, simbolo)
+                    return bool(mascara & self._indice.aceitacao)
+                # o estado de origem sai do cache junto com os demais, entao a
+                # transicao nao e guardada: apenas segue para o destino
+                self._esvaziar_cache()
+                proximo = self._obter_id(mascara)
+            else:
+                proximo = self._obter_id(mascara)
+                self._transicoes[estado][classe] = proximo
+            estado = proximo
+
+        return self._aceitacao[estado]
@@ -1,16 +1,237 @@
+from array import array
+from collections import OrderedDict
+from afd import avisar_simbolo_invalido
+from visoes import ConjuntoMonitorado, DicionarioMonitorado
+
 EPSILON = ''
 
+# quantidade maxima de conjuntos guardados no cache de fecho-epsilon de cada indice
+TAMANHO_CACHE_FECHO = 4096
+
 class AFN:
+    """
+    automato finito nao deterministico
+
+    internamente os estados e simbolos sao numerados e as transicoes ficam em arrays
+    no estilo CSR (compressed sparse row): as transicoes do estado i ocupam as posicoes
+    inicio[i] .. inicio[i + 1] - 1 de simbolo_de / destino_de, ordenadas por simbolo e
+    destino. o simbolo 0 e sempre o EPSILON. isso ocupa 8 bytes por transicao, em vez
+    de uma tupla, um set e suas entradas em um dicionario
+
+    os atributos estados e func_transicao continuam disponiveis como visoes montadas
+    sob demanda (e guardadas) a partir dos arrays. as visoes podem ser editadas como
+    antes (inclusive func_transicao[(estado, simbolo)].add(destino)): qualquer
+    alteracao descarta os arrays e o indice, que sao refeitos a partir delas na
+    proxima consulta. o dicionario passado ao construtor e copiado, entao alteracoes
+    posteriores nele nao afetam o AFN; use afn.func_transicao. alfabeto e
+    estados_aceitacao tambem avisam quando sao editados, e o indice e descartado
+
+    as visoes ocupam bem mais que os arrays e ficam guardadas depois de montadas, entao
+    o codigo que so le o AFN usa nomes_estados(), transicoes() e quantidade_estados
+    """
+    __slots__ = ("_alfabeto", "_estado_inicial", "_estados_aceitacao",
+                 "_nomes", "_ids", "_n_declarados", "_simbolos", "_ids_simbolo",
+                 "_inicio", "_simbolo_de", "_destino_de",
+                 "_estados", "_func_transicao", "_indice")
+
     def __init__(self, estados, alfabeto, func_transicao, estado_inicial, estados_aceitacao):
-        self.estados = set(estados)
-        self.alfabeto = set(alfabeto)
-        self.func_transicao = func_transicao
-        self.estado_inicial = estado_inicial
-        self.estados_aceitacao = set(estados_aceitacao)
+        self._indice = None
+        self._alfabeto = ConjuntoMonitorado(alfabeto, self._descartar_indice)
+        self._estado_inicial = estado_inicial
+        self._estados_aceitacao = ConjuntoMonitorado(estados_aceitacao, self._descartar_indice)
+        self._estados = set(estados)
+        self._func_transicao = func_transicao
+        self._compactar()
+        # as visoes so voltam a existir se forem pedidas
+        self._estados = None
+        self._func_transicao = None
+
+    def _compactar(self):
+        """
+        monta a representacao compacta a partir das visoes estados / func_transicao.
+        os estados declarados recebem os primeiros ids (em ordem) e depois vem os que
+        so aparecem nas transicoes ou como estado inicial
+        """
+        declarados = sorted(self._estados)
+        extras = set()
+        simbolos = set()
+        for (origem, simbolo), destinos in self._func_transicao.items():
+            if not destinos:
+                continue
+            simbolos.add(simbolo)
+            extras.add(origem)
+            extras.update(destinos)
+        extras.add(self.estado_inicial)
+        extras.discard(None)
+        extras.difference_update(self._estados)
+
+        self._nomes = declarados + sorted(extras)
+        self._ids = {nome: i for i, nome in enumerate(self._nomes)}
+        self._n_declarados = len(declarados)
+        simbolos.discard(EPSILON)
+        self._simbolos = [EPSILON] + sorted(simbolos)
+        self._ids_simbolo = {simbolo: j for j, simbolo in enumerate(self._simbolos)}
+
+        # (origem, simbolo, destino) numerados e ordenados, agrupados por origem
+        triplas = sorted(
+            (self._ids[origem], self._ids_simbolo[simbolo], self._ids[destino])
+            for (origem, simbolo), destinos in self._func_transicao.items()
+            for destino in destinos
+        )
+        self._inicio = array("i", [0]) * (len(self._nomes) + 1)
+        self._simbolo_de = array("i", (simbolo for _, simbolo, _ in triplas))
+        self._destino_de = array("i", (destino for _, _, destino in triplas))
+        for origem, _, _ in triplas:
+            self._inicio[origem + 1] += 1
+        for i in range(len(self._nomes)):
+            self._inicio[i + 1] += self._inicio[i]
+
+    def _garantir_compacto(self):
+        # refaz os arrays se as visoes foram trocadas ou editadas
+        if self._inicio is None:
+            self._compactar()
+
+    def _garantir_visoes(self):
+        # monta as duas visoes, para poder editar uma delas e compactar de novo
+        self.estados
+        self.func_transicao
+
+    def _visao_alterada(self):
+        # aviso das visoes: a partir de agora elas valem, e os arrays e o indice sao refeitos
+        if self._inicio is not None:
+            self._garantir_visoes()
+            self._inicio = None
+        self._indice = None
+
+    def _descartar_indice(self):
+        # aviso de alfabeto / estados_aceitacao: so o indice depende deles
+        self._indice = None
+
+    @property
+    def alfabeto(self) -> set:
+        return self._alfabeto
+
+    @alfabeto.setter
+    def alfabeto(self, alfabeto):
+        self._alfabeto = ConjuntoMonitorado(alfabeto, self._descartar_indice)
+        self._indice = None
+
+    @property
+    def estados_aceitacao(self) -> set:
+        return self._estados_aceitacao
+
+    @estados_aceitacao.setter
+    def estados_aceitacao(self, estados_aceitacao):
+        self._estados_aceitacao = ConjuntoMonitorado(estados_aceitacao, self._descartar_indice)
+        self._indice = None
+
+    @property
+    def estados(self) -> set:
+        if self._estados is None:
+            self._estados = ConjuntoMonitorado(self._nomes[:self._n_declarados], self._visao_alterada)
+        return self._estados
+
+    @estados.setter
+    def estados(self, estados):
+        self._garantir_visoes()
+        self._estados = ConjuntoMonitorado(estados, self._visao_alterada)
+        self._visao_alterada()
+
+    @property
+    def func_transicao(self) -> dict:
+        if self._func_transicao is None:
+            self._func_transicao = DicionarioMonitorado(
+                {(origem, simbolo): destinos for origem, simbolo, destinos in self.transicoes()},
+                self._visao_alterada, monitorar_valores=True
+            )
+        return self._func_transicao
+
+    @func_transicao.setter
+    def func_transicao(self, func_transicao: dict):
+        # trocar a funcao de transicao torna o indice (e os fechos guardados) obsoleto
+        self._garantir_visoes()
+        self._func_transicao = DicionarioMonitorado(func_transicao, self._visao_alterada,
+                                                    monitorar_valores=True)
+        self._visao_alterada()
+
+    @property
+    def estado_inicial(self):
+        return self._estado_inicial
+
+    @estado_inicial.setter
+    def estado_inicial(self, estado):
+        if self._inicio is not None and estado is not None and estado not in self._ids:
+            # estado ainda sem id: os arrays sao refeitos para inclui-lo
+            self._garantir_visoes()
+            self._inicio = None
+        self._estado_inicial = estado
+        self._indice = None
+
+    @property
+    def quantidade_estados(self) -> int:
+        # o mesmo que len(estados), sem montar a visao
+        self._garantir_compacto()
+        return self._n_declarados
+
+    def nomes_estados(self) -> list:
+        # o mesmo que sorted(estados), sem montar a visao
+        self._garantir_compacto()
+        return self._nomes[:self._n_declarados]
+
+    def transicoes(self):
+        """
+        percorre as transicoes a partir dos arrays, sem montar func_transicao
+
+        retorno:
+            gerador de (origem, simbolo, destinos), com destinos em uma tupla
+        """
+        self._garantir_compacto()
+        nomes = self._nomes
+        simbolos = self._simbolos
+        inicio = self._inicio
+        simbolo_de = self._simbolo_de
+        destino_de = self._destino_de
+        for i in range(len(nomes)):
+            k = inicio[i]
+            fim = inicio[i + 1]
+            while k < fim:
+                simbolo = simbolo_de[k]
+                grupo = k
+                while k < fim and simbolo_de[k] == simbolo:
+                    k += 1
+                yield nomes[i], simbolos[simbolo], tuple(nomes[d] for d in destino_de[grupo:k])
+
+    def invalidar_indice(self):
+        """
+        descarta o indice e os fechos-epsilon calculados, para que sejam refeitos na
+        proxima consulta. as alteracoes em func_transicao, estados, alfabeto e
+        estados_aceitacao ja fazem isso sozinhas; este metodo so forca a reconstrucao
+        """
+        self._indice = None
+        if self._func_transicao is not None or self._estados is not None:
+            # uma visao pode ter sido editada: os arrays sao refeitos a partir dela
+            self._garantir_visoes()
+            self._inicio = None
+
+    def adicionar_transicao(self, origem: str, simbolo: str, destino: str):
+        # inclui destino em delta(origem, simbolo); a visao avisa a alteracao
+        self.func_transicao.setdefault((origem, simbolo), set()).add(destino)
+        if simbolo != EPSILON:
+            self.alfabeto.add(simbolo)
+
+    def remover_transicao(self, origem: str, simbolo: str, destino: str):
+        # retira destino de delta(origem, simbolo), se existir
+        destinos = self.func_transicao.get((origem, simbolo))
+        if destinos is None or destino not in destinos:
+            return
+        destinos.discard(destino)
+        if not destinos:
+            del self.func_transicao[(origem, simbolo)]
 
     """
-    o metodo calcula_fecho epsilon recebe um conjunto de estados e retorna o fecho-epsilon desses estados
-    utilizando uma abordagem de busca em profundidade (dfs) para explorar todas as transicoes
+    o metodo calcula_fecho epsilon recebe um conjunto de estados e retorna o fecho-epsilon desses estados.
+    os fechos de cada estado sao calculados uma unica vez pelo IndiceAFN (e so quando
+    alguem precisa deles), entao o fecho de um conjunto e apenas a uniao dos fechos ja calculados
     """
     def calcula_fecho_epsilon(self, estados: set) -> set:
         """
@@ -19,9 +240,6 @@ class AFN:
         o fecho-epsilon de um conjunto S e o conjunto de todos os estados alcancaveis
         a partir de qualquer estado em S seguindo zero ou mais transicoes-epsilon (&).
 
-        utiliza o algoritmo de busca em profundidade (DFS) com uma pilha
-        para percorrer todos os estados alcancaveis por transicoes vazias
-
         argumentos:
             estados (set): o conjunto inicial de estados do AFN.
 
@@ -29,18 +247,459 @@ class AFN:
             set: o conjunto completo de estados que inclui os estados originais
                  mais todos os estados alcancaveis via transicoes-epsilon.
         """
-        fecho = set(estados)
-        pilha = list(estados)
-        
-        while pilha:
-            estado_atual = pilha.pop()
-            
-            # obtem os estados alcancaveis a partir do estado_atual via EPSILON (&)
-            for proximo_estado in self.func_transicao.get((estado_atual, EPSILON), set()):
-                if proximo_estado not in fecho:
-                    fecho.add(proximo_estado)
-                    pilha.append(proximo_estado)
-                    
+        indice = self.indexar()
+        posicoes = []
+        desconhecidos = []
+        for estado in estados:
+            posicao = indice.posicao.get(estado)
+            if posicao is None:
+                # estado sem nenhuma transicao: o fecho e ele mesmo
+                desconhecidos.append(estado)
+            else:
+                posicoes.append(posicao)
+        nomes = indice.nomes
+        fecho = {nomes[i] for i in indice.fecho_de(posicoes)}
+        fecho.update(desconhecidos)
         return fecho
-    
-    
\ No newline at end of file
+
+    def processar_cadeia(self, cadeia: str) -> bool:
+        """
+        simulacao direta do AFN (sem converter para AFD) atraves da cadeia de entrada
+
+        o conjunto de estados ativos e uma bitmask; a cada simbolo ele e substituido
+        pelo OU dos sucessores (ja com fecho-epsilon) dos estados ativos, no estilo de
+        Thompson. o custo e O(n.m) para uma cadeia de tamanho n e m estados, e o
+        resultado e o mesmo de AFD.processar_cadeia no AFD equivalente
+
+        argumentos:
+            cadeia (string): a cadeia de entrada a ser testada
+        retorno:
+            bool: true se a cadeia for aceita, false caso contrario
+        """
+        indice = self.indexar()
+        alfabeto = self.alfabeto
+        mascara = indice.mascara_inicial
+        for simbolo in cadeia:
+            if simbolo not in alfabeto:
+                avisar_simbolo_invalido(simbolo)
+                return False
+            # com o conjunto vazio a cadeia ja e rejeitada, mas os simbolos seguintes
+            # ainda sao verificados
+            if mascara:
+                mascara = indice.sucessor(mascara, simbolo)
+        return bool(mascara & indice.aceitacao)
+
+    def processar_lote(self, cadeias) -> list:
+        """
+        simula o AFN para varias cadeias, sem imprimir mensagens (simbolos fora do
+        alfabeto apenas rejeitam a cadeia)
+
+        argumentos:
+            cadeias (iteravel de str): as cadeias de entrada
+        retorno:
+            list[bool]: true/false para cada cadeia, na mesma ordem
+        """
+        indice = self.indexar()
+        inicial = indice.mascara_inicial
+        aceitacao = indice.aceitacao
+        simular = indice.simular
+        return [bool(simular(inicial, cadeia) & aceitacao) for cadeia in cadeias]
+
+    def indexar(self) -> "IndiceAFN":
+        """
+        retorna a representacao do AFN com os estados internados como inteiros,
+        usada pelos algoritmos que trabalham com macro-estados em forma de bitmask.
+        o indice e construido na primeira chamada e reaproveitado ate ser invalidado
+
+        retorno:
+            IndiceAFN: o indice com os estados numerados, os fechos e as mascaras de sucessores
+        """
+        if self._indice is None:
+            self._garantir_compacto()
+            self._indice = IndiceAFN(self)
+        return self._indice
+
+
+class IndiceAFN:
+    """
+    representacao do AFN em que cada estado recebe um indice inteiro e um conjunto
+    de estados passa a ser um inteiro (bitmask): o bit i ligado indica o estado nomes[i]
+
+    o indice so guarda, de saida, o que e proporcional ao AFN (os arrays CSR sao os do
+    proprio AFN) e monta o resto sob demanda:
+    - o fecho-epsilon de um estado e calculado na primeira vez em que e pedido, pela
+      condensacao do grafo de transicoes-epsilon em componentes fortemente conexas
+      (Tarjan): estados de uma mesma componente tem o mesmo fecho, e cada componente e
+      resolvida uma vez, depois das que ela alcanca. fechos triviais (so o proprio
+      estado) nao sao guardados; os demais ficam como uma tupla de indices, ou como
+      bitmask quando ela ocupa menos memoria que a tupla (fechos com muitos estados)
+    - a mascara de sucessores de um estado com um simbolo (fecho-epsilon dos destinos)
+      so e montada quando um macro-estado que contem o estado e expandido, e fica
+      guardada por classe de simbolos. o macro-estado destino de M com o simbolo a e o
+      OU dessas mascaras para os estados de M
+    """
+    def __init__(self, afn: AFN):
+        # os indices sao os mesmos da representacao compacta do AFN (listas compartilhadas)
+        self.nomes: list[str] = afn._nomes
+        self.posicao: dict[str, int] = afn._ids
+        self._inicio = afn._inicio
+        self._simbolo_de = afn._simbolo_de
+        self._destino_de = afn._destino_de
+        self._ids_simbolo: dict[str, int] = afn._ids_simbolo
+        n = len(self.nomes)
+        # tuplas com mais indices que isto ocupam mais que uma bitmask de n bits
+        self._limite_tupla = max(n // 64, 1)
+
+        # fechos nao triviais ja resolvidos: indice do estado -> tupla de indices ou bitmask
+        self._fechos: dict = {}
+        # cache LRU dos fechos de conjuntos: frozenset de indices -> tupla de indices
+        self._cache_fecho: OrderedDict = OrderedDict()
+        # contadores de uso (lidos pela instrumentacao da conversao): fechos de
+        # componentes e de conjuntos calculados, e fechos de conjuntos vindos do cache
+        self.fechos_calculados = 0
+        self.acertos_cache = 0
+
+        # classes de simbolos, montadas na primeira consulta (ver _montar_classes)
+        self._alfabeto = frozenset(afn.alfabeto)
+        self._classes = None
+        self._classe_de = None
+        self._representante = None
+        # id do representante -> {indice do estado: mascara de sucessores}
+        self._sucessores: dict[int, dict[int, int]] = {}
+
+        self.aceitacao: int = self.mascara_de(
+            estado for estado in afn.estados_aceitacao if estado in self.posicao
+        )
+        self._posicao_inicial = self.posicao.get(afn.estado_inicial)
+        self._mascara_inicial = None
+
+    @property
+    def mascara_inicial(self) -> int:
+        # macro-estado inicial: fecho-epsilon do estado inicial (0 se nao houver); so e
+        # calculado na primeira consulta, para entrar nas estatisticas de quem o pede
+        if self._mascara_inicial is None:
+            posicao = self._posicao_inicial
+            self._mascara_inicial = 0 if posicao is None else self._mascara_do_fecho(posicao)
+        return self._mascara_inicial
+
+    def _montar_classes(self):
+        # classes de simbolos: simbolos do alfabeto com exatamente as mesmas transicoes
+        # (inclusive os que nao tem nenhuma) levam sempre ao mesmo macro-estado, entao
+        # a conversao so precisa calcular o sucessor de um simbolo por classe
+        transicoes = [[] for _ in self._ids_simbolo]
+        inicio = self._inicio
+        simbolo_de = self._simbolo_de
+        destino_de = self._destino_de
+        for origem in range(len(self.nomes)):
+            for k in range(inicio[origem], inicio[origem + 1]):
+                transicoes[simbolo_de[k]].append((origem, destino_de[k]))
+        grupos = {}
+        for simbolo in sorted(self._alfabeto):
+            j = self._ids_simbolo.get(simbolo)
+            grupos.setdefault(None if j is None else tuple(transicoes[j]), []).append(simbolo)
+        self._classes = list(grupos.values())
+        self._classe_de = {simbolo: c for c, classe in enumerate(self._classes) for simbolo in classe}
+        # simbolo -> id do simbolo que representa a classe (as mascaras de sucessores
+        # sao guardadas por representante); simbolos sem transicao ficam de fora
+        self._representante = {}
+        for simbolo, j in self._ids_simbolo.items():
+            if j:
+                classe = self._classe_de.get(simbolo)
+                representante = simbolo if classe is None else self._classes[classe][0]
+                self._representante[simbolo] = self._ids_simbolo[representante]
+
+    @property
+    def classes(self) -> list:
+        # list[list[str]]: os simbolos do alfabeto agrupados em classes
+        if self._classes is None:
+            self._montar_classes()
+        return self._classes
+
+    @property
+    def classe_de(self) -> dict:
+        # dict[str, int]: simbolo -> posicao da sua classe em classes
+        if self._classes is None:
+            self._montar_classes()
+        return self._classe_de
+
+    def mascara_de(self, estados) -> int:
+        # converte um conjunto de nomes de estados em bitmask
+        return _mascara(self.posicao[estado] for estado in estados)
+
+    def nomes_de(self, mascara: int) -> frozenset:
+        # converte uma bitmask de volta para o conjunto de nomes de estados
+        nomes = self.nomes
+        return frozenset(nomes[i] for i in _indices(mascara))
+
+    # --- fechos-epsilon ---
+
+    def _destinos_epsilon(self, i: int):
+        # destinos das transicoes-epsilon de i (o simbolo 0 vem primeiro em cada estado)
+        k = fim = self._inicio[i]
+        limite = self._inicio[i + 1]
+        simbolo_de = self._simbolo_de
+        while fim < limite and simbolo_de[fim] == 0:
+            fim += 1
+        return self._destino_de[k:fim]
+
+    def _fecho(self, i: int):
+        """
+        fecho-epsilon do estado i
+
+        retorno:
+            None se o fecho e so o proprio estado, senao uma tupla de indices ou uma bitmask
+        """
+        fecho = self._fechos.get(i)
+        if fecho is None and self._destinos_epsilon(i):
+            self._resolver_fechos(i)
+            fecho = self._fechos[i]
+        return fecho
+
+    def _resolver_fechos(self, raiz: int):
+        """
+        Tarjan iterativo a partir de raiz no grafo das transicoes-epsilon, passando so
+        pelos estados ainda sem fecho resolvido. as componentes saem em ordem
+        topologica reversa, entao quando uma componente e fechada o fecho de todas as
+        componentes que ela alcanca ja esta pronto
+        """
+        fechos = self._fechos
+        ordem = {raiz: 0}
+        menor = {raiz: 0}
+        pilha = [raiz]
+        na_pilha = {raiz}
+        chamadas = [(raiz, iter(self._destinos_epsilon(raiz)))]
+
+        while chamadas:
+            v, vizinhos = chamadas[-1]
+            for w in vizinhos:
+                if w in fechos:
+                    continue
+                if w not in ordem:
+                    destinos = self._destinos_epsilon(w)
+                    if not destinos:
+                        # fecho trivial: nao entra na busca
+                        continue
+                    # desce para o vizinho ainda nao visitado
+                    ordem[w] = menor[w] = len(ordem)
+                    pilha.append(w)
+                    na_pilha.add(w)
+                    chamadas.append((w, iter(destinos)))
+                    break
+                if w in na_pilha and ordem[w] < menor[v]:
+                    menor[v] = ordem[w]
+            else:
+                chamadas.pop()
+                if chamadas:
+                    pai = chamadas[-1][0]
+                    if menor[v] < menor[pai]:
+                        menor[pai] = menor[v]
+                if menor[v] == ordem[v]:
+                    # v e raiz de uma componente: desempilha os membros
+                    membros = []
+                    while True:
+                        w = pilha.pop()
+                        na_pilha.discard(w)
+                        membros.append(w)
+                        if w == v:
+                            break
+                    indices = set(membros)
+                    mascara = 0
+                    for w in membros:
+                        for x in self._destinos_epsilon(w):
+                            fecho = fechos.get(x)
+                            if fecho is None or x in indices:
+                                indices.add(x)
+                            elif type(fecho) is int:
+                                mascara |= fecho
+                            else:
+                                indices.update(fecho)
+                    if mascara or len(indices) > self._limite_tupla:
+                        fecho = mascara | _mascara(indices)
+                    else:
+                        fecho = tuple(sorted(indices))
+                    self.fechos_calculados += 1
+                    for w in membros:
+                        fechos[w] = fecho
+
+    def _mascara_do_fecho(self, i: int) -> int:
+        fecho = self._fecho(i)
+        return 1 << i if fecho is None else mascara_compacta(fecho)
+
+    def fecho_de(self, indices) -> tuple:
+        """
+        calcula o fecho-epsilon de um conjunto de estados (indices), consultando antes
+        o cache LRU (limitado a TAMANHO_CACHE_FECHO entradas). so os fechos dos estados
+        do conjunto sao resolvidos
+
+        argumentos:
+            indices (iteravel de int): o conjunto de estados de origem
+        retorno:
+            tuple: os indices dos estados do fecho-epsilon
+        """
+        chave = frozenset(indices)
+        cache = self._cache_fecho
+        fecho = cache.get(chave)
+        if fecho is not None:
+            cache.move_to_end(chave)
+            self.acertos_cache += 1
+            return fecho
+
+        self.fechos_calculados += 1
+        resultado = set()
+        mascara = 0
+        for i in chave:
+            fecho_estado = self._fecho(i)
+            if fecho_estado is None:
+                resultado.add(i)
+            elif type(fecho_estado) is int:
+                mascara |= fecho_estado
+            else:
+                resultado.update(fecho_estado)
+        if mascara:
+            resultado.update(_indices(mascara))
+        fecho = tuple(resultado)
+
+        cache[chave] = fecho
+        if len(cache) > TAMANHO_CACHE_FECHO:
+            cache.popitem(last=False)
+        return fecho
+
+    # --- sucessores ---
+
+    def sucessores_de(self, i: int, simbolo: str):
+        """
+        fecho-epsilon dos destinos do estado i com o simbolo, na forma mais compacta
+
+        retorno:
+            None se nao ha destinos, senao uma tupla de indices ou uma bitmask
+        """
+        j = self._ids_simbolo.get(simbolo)
+        if not j:
+            return None
+        simbolo_de = self._simbolo_de
+        destino_de = self._destino_de
+        indices = set()
+        mascara = 0
+        for k in range(self._inicio[i], self._inicio[i + 1]):
+            if simbolo_de[k] != j:
+                continue
+            destino = destino_de[k]
+            fecho = self._fecho(destino)
+            if fecho is None:
+                indices.add(destino)
+            elif type(fecho) is int:
+                mascara |= fecho
+            else:
+                indices.update(fecho)
+        if mascara or len(indices) > self._limite_tupla:
+            return mascara | _mascara(indices)
+        return tuple(sorted(indices)) if indices else None
+
+    def tabela_compacta(self, simbolo: str) -> dict:
+        """
+        sucessores_de() de todos os estados que tem transicao com o simbolo, para
+        enviar a outros processos (ver mascara_compacta)
+
+        retorno:
+            dict: indice do estado -> tupla de indices ou bitmask
+        """
+        tabela = {}
+        j = self._ids_simbolo.get(simbolo)
+        if not j:
+            return tabela
+        inicio = self._inicio
+        simbolo_de = self._simbolo_de
+        for i in range(len(self.nomes)):
+            if j in simbolo_de[inicio[i]:inicio[i + 1]]:
+                tabela[i] = self.sucessores_de(i, simbolo)
+        return tabela
+
+    def _tabela(self, simbolo: str):
+        # mascaras de sucessores ja montadas para a classe do simbolo (None se ele nao tem transicoes)
+        if self._classes is None:
+            self._montar_classes()
+        j = self._representante.get(simbolo)
+        if j is None:
+            return None
+        tabela = self._sucessores.get(j)
+        if tabela is None:
+            tabela = self._sucessores[j] = {}
+        return tabela
+
+    def _sucessor_estado(self, tabela: dict, i: int, simbolo: str) -> int:
+        # monta (e guarda) a mascara de sucessores do estado i
+        mascara = tabela[i] = mascara_compacta(self.sucessores_de(i, simbolo))
+        return mascara
+
+    def sucessor(self, mascara: int, simbolo: str) -> int:
+        """
+        calcula o macro-estado destino (ja com fecho-epsilon) a partir de uma bitmask
+
+        argumentos:
+            mascara (int): o macro-estado de origem
+            simbolo (str): o simbolo lido
+        retorno:
+            int: a bitmask do macro-estado destino (0 representa o conjunto vazio)
+        """
+        tabela = self._tabela(simbolo)
+        if tabela is None:
+            return 0
+        destino = 0
+        while mascara:
+            bit = mascara & -mascara
+            i = bit.bit_length() - 1
+            sucessores = tabela.get(i)
+            if sucessores is None:
+                sucessores = self._sucessor_estado(tabela, i, simbolo)
+            destino |= sucessores
+            mascara ^= bit
+        return destino
+
+    def simular(self, mascara: int, cadeia: str) -> int:
+        """
+        aplica sucessor() para cada simbolo da cadeia, parando assim que o conjunto
+        de estados ativos fica vazio. simbolos sem transicao levam ao conjunto vazio
+
+        argumentos:
+            mascara (int): o conjunto de estados ativos no inicio
+            cadeia (str): os simbolos a consumir
+        retorno:
+            int: a bitmask dos estados ativos ao final da cadeia
+        """
+        sucessor = self.sucessor
+        for simbolo in cadeia:
+            mascara = sucessor(mascara, simbolo)
+            if not mascara:
+                return 0
+        return mascara
+
+
+def mascara_compacta(valor) -> int:
+    # converte um fecho / sucessores na forma compacta do IndiceAFN (None, tupla ou bitmask) em bitmask
+    if valor is None:
+        return 0
+    return valor if type(valor) is int else _mascara(valor)
+
+def _mascara(indices) -> int:
+    """
+    bitmask com os bits dos indices ligados. conjuntos grandes sao montados em um
+    bytearray, para nao refazer o inteiro inteiro a cada bit
+    """
+    if not isinstance(indices, (set, frozenset, tuple, list)):
+        indices = list(indices)
+    if len(indices) < 64:
+        mascara = 0
+        for i in indices:
+            mascara |= 1 << i
+        return mascara
+    dados = bytearray((max(indices) >> 3) + 1)
+    for i in indices:
+        dados[i >> 3] |= 1 << (i & 7)
+    return int.from_bytes(dados, "little")
+
+def _indices(mascara: int):
+    # percorre os indices dos bits ligados da bitmask
+    while mascara:
+        bit = mascara & -mascara
+        yield bit.bit_length() - 1
+        mascara ^= bit
@@ -0,0 +1,240 @@
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from afn import AFN, EPSILON
+from conversor import MODOS_CONVERSAO, conversor_afn_para_afd
+from io_jflap import carregar_afn_jflap, salvar_afd_jflap, salvar_afn_jflap
+
+"""
+benchmark das etapas principais do conversor, com AFNs sinteticos
+
+cada caso gera um AFN, grava em .jff e mede separadamente:
+    carregar  -> carregar_afn_jflap
+    converter -> conversor_afn_para_afd
+    processar -> AFD.processar_cadeia em um conjunto fixo de cadeias
+    salvar    -> salvar_afd_jflap
+o tempo e o melhor de varias repeticoes e o pico de memoria (tracemalloc) e medido
+em uma execucao separada, para nao distorcer o tempo. o resultado vai para um JSON
+que pode ser comparado com um JSON anterior (baseline) para apontar regressoes
+
+exemplo:
+    python3 benchmark.py --saida atual.json --baseline referencia.json
+"""
+
+ETAPAS = ("carregar", "converter", "processar", "salvar")
+# diferencas absolutas abaixo destes valores sao tratadas como ruido em comparar(),
+# mesmo que a piora relativa passe da tolerancia (etapas de microssegundos variam
+# bem mais que 20% entre execucoes)
+PISO_TEMPO = 0.001
+PISO_MEMORIA = 64 * 1024
+
+# --- geradores de AFNs sinteticos ---
+
+def gerar_afn_n_esimo(n: int, alfabeto: str = "ab") -> AFN:
+    """
+    AFN da linguagem "o n-esimo simbolo a partir do fim e 'a'": tem n + 1 estados,
+    mas o AFD minimo equivalente tem 2^n estados (pior caso classico da conversao)
+    """
+    estados = [f"q{i}" for i in range(n + 1)]
+    func_transicao = {}
+    for simbolo in alfabeto:
+        func_transicao[("q0", simbolo)] = {"q0"}
+    func_transicao[("q0", alfabeto[0])].add("q1")
+    for i in range(1, n):
+        for simbolo in alfabeto:
+            func_transicao[(f"q{i}", simbolo)] = {f"q{i + 1}"}
+    return AFN(estados, set(alfabeto), func_transicao, "q0", {f"q{n}"})
+
+def gerar_afn_aleatorio(n: int, densidade: float = 0.1, proporcao_epsilon: float = 0.05,
+                        alfabeto: str = "abc", semente: int = 0) -> AFN:
+    """
+    AFN aleatorio com n estados: cada par (origem, destino) recebe cada simbolo com
+    probabilidade 'densidade' e uma transicao-epsilon com probabilidade 'proporcao_epsilon'
+    """
+    gerador = random.Random(semente)
+    estados = [f"q{i}" for i in range(n)]
+    func_transicao = {}
+    for origem in estados:
+        for destino in estados:
+            for simbolo in alfabeto:
+                if gerador.random() < densidade:
+                    func_transicao.setdefault((origem, simbolo), set()).add(destino)
+            if gerador.random() < proporcao_epsilon:
+                func_transicao.setdefault((origem, EPSILON), set()).add(destino)
+    finais = {estado for estado in estados if gerador.random() < 0.2} or {estados[-1]}
+    return AFN(estados, set(alfabeto), func_transicao, "q0", finais)
+
+def gerar_afn_cadeia_epsilon(n: int) -> AFN:
+    """
+    AFN com uma cadeia de n transicoes-epsilon q0 -> q1 -> ... -> qn; cada estado le
+    'a' voltando ao inicio e 'b' avancando dois estados, entao os fechos sao longos
+    """
+    estados = [f"q{i}" for i in range(n + 1)]
+    func_transicao = {}
+    for i in range(n):
+        func_transicao[(f"q{i}", EPSILON)] = {f"q{i + 1}"}
+    for i in range(n + 1):
+        func_transicao[(f"q{i}", "a")] = {"q0"}
+        func_transicao[(f"q{i}", "b")] = {f"q{min(i + 2, n)}"}
+    return AFN(estados, {"a", "b"}, func_transicao, "q0", {f"q{n}"})
+
+# casos medidos por padrao: nome -> funcao que gera o AFN
+CASOS = {
+    "n_esimo_8": lambda: gerar_afn_n_esimo(8),
+    "n_esimo_12": lambda: gerar_afn_n_esimo(12),
+    "aleatorio_40": lambda: gerar_afn_aleatorio(40, densidade=0.05, proporcao_epsilon=0.02),
+    "aleatorio_200_esparso": lambda: gerar_afn_aleatorio(200, densidade=0.008, proporcao_epsilon=0.005),
+    "cadeia_epsilon_300": lambda: gerar_afn_cadeia_epsilon(300),
+}
+
+# --- medicao ---
+
+def _cadeias_teste(afn: AFN, quantidade: int, tamanho: int) -> list:
+    gerador = random.Random(1)
+    simbolos = sorted(afn.alfabeto)
+    return ["".join(gerador.choice(simbolos) for _ in range(tamanho)) for _ in range(quantidade)]
+
+def _medir(funcao, repeticoes: int):
+    """
+    executa funcao() 'repeticoes' vezes e mais uma com tracemalloc
+
+    retorno:
+        tuple: (resultado da ultima execucao, melhor tempo em s, pico de memoria em bytes)
+    """
+    melhor = float("inf")
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        resultado = funcao()
+        melhor = min(melhor, time.perf_counter() - inicio)
+    tracemalloc.start()
+    try:
+        funcao()
+        _, pico = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return resultado, melhor, pico
+
+def medir_caso(afn: AFN, diretorio: str, modo: str = "bitset", repeticoes: int = 5,
+               quantidade_cadeias: int = 1000, tamanho_cadeias: int = 50) -> dict:
+    """
+    mede as quatro etapas (ETAPAS) para um AFN
+
+    retorno:
+        dict: tamanho do AFN/AFD e, para cada etapa, {"tempo": s, "memoria_pico": bytes}
+    """
+    caminho_afn = os.path.join(diretorio, "afn.jff")
+    caminho_afd = os.path.join(diretorio, "afd.jff")
+    salvar_afn_jflap(afn, caminho_afn)
+    cadeias = _cadeias_teste(afn, quantidade_cadeias, tamanho_cadeias)
+    resultado = {"estados_afn": afn.quantidade_estados}
+
+    def converter():
+        # o indice do AFN fica guardado entre as repeticoes: sem descartar, so a
+        # primeira execucao pagaria os fechos e sucessores que ele guarda
+        afn_lido.invalidar_indice()
+        return conversor_afn_para_afd(afn_lido, modo=modo)
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        afn_lido, tempo, pico = _medir(lambda: carregar_afn_jflap(caminho_afn), repeticoes)
+        resultado["carregar"] = {"tempo": tempo, "memoria_pico": pico}
+
+        afd, tempo, pico = _medir(converter, repeticoes)
+        resultado["converter"] = {"tempo": tempo, "memoria_pico": pico}
+        resultado["estados_afd"] = afd.quantidade_estados
+
+        _, tempo, pico = _medir(lambda: [afd.processar_cadeia(c) for c in cadeias], repeticoes)
+        resultado["processar"] = {"tempo": tempo, "memoria_pico": pico}
+
+        _, tempo, pico = _medir(lambda: salvar_afd_jflap(afd, caminho_afd), repeticoes)
+        resultado["salvar"] = {"tempo": tempo, "memoria_pico": pico}
+
+    return resultado
+
+def comparar(atual: dict, baseline: dict, tolerancia: float,
+             piso_tempo: float = PISO_TEMPO, piso_memoria: int = PISO_MEMORIA) -> list:
+    """
+    compara dois resultados de benchmark
+
+    argumentos:
+        tolerancia (float): piora relativa aceita (0.2 = 20%)
+        piso_tempo (float): piora absoluta minima, em segundos, para contar como regressao
+        piso_memoria (int): piora absoluta minima, em bytes, para contar como regressao
+    retorno:
+        list[str]: uma descricao por metrica que piorou mais que 'tolerancia' e mais que o piso
+    """
+    pisos = {"tempo": piso_tempo, "memoria_pico": piso_memoria}
+    regressoes = []
+    for caso, medidas in atual["casos"].items():
+        referencia = baseline.get("casos", {}).get(caso)
+        if referencia is None:
+            continue
+        for etapa in ETAPAS:
+            for metrica in ("tempo", "memoria_pico"):
+                novo = medidas.get(etapa, {}).get(metrica)
+                antigo = referencia.get(etapa, {}).get(metrica)
+                if novo is None or not antigo:
+                    continue
+                if novo > antigo * (1 + tolerancia) and novo - antigo > pisos[metrica]:
+                    regressoes.append(f"{caso}/{etapa}/{metrica}: {antigo:.6g} -> {novo:.6g} "
+                                      f"(+{(novo / antigo - 1) * 100:.1f}%)")
+    return regressoes
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark do conversor AFN -> AFD")
+    parser.add_argument("--casos", nargs="*", choices=sorted(CASOS), default=None,
+                        help="casos a medir (padrao: todos)")
+    parser.add_argument("--modo", choices=MODOS_CONVERSAO, default="bitset",
+                        help="motor de conversao medido")
+    parser.add_argument("--repeticoes", type=int, default=5,
+                        help="execucoes por etapa; o tempo e o melhor delas (padrao: 5)")
+    parser.add_argument("--saida", default=None, help="arquivo JSON com os resultados")
+    parser.add_argument("--baseline", default=None, help="JSON de uma execucao anterior para comparar")
+    parser.add_argument("--tolerancia", type=float, default=0.2,
+                        help="piora relativa aceita antes de apontar regressao (padrao: 0.2)")
+    parser.add_argument("--piso-tempo", type=float, default=PISO_TEMPO,
+                        help=f"piora absoluta minima em segundos para apontar regressao (padrao: {PISO_TEMPO})")
+    parser.add_argument("--piso-memoria", type=int, default=PISO_MEMORIA,
+                        help=f"piora absoluta minima em bytes para apontar regressao (padrao: {PISO_MEMORIA})")
+    args = parser.parse_args(argv)
+
+    resultados = {
+        "python": platform.python_version(),
+        "plataforma": platform.platform(),
+        "data": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "modo": args.modo,
+        "casos": {},
+    }
+    with tempfile.TemporaryDirectory() as diretorio:
+        for nome in args.casos or CASOS:
+            medidas = medir_caso(CASOS[nome](), diretorio, modo=args.modo, repeticoes=args.repeticoes)
+            resultados["casos"][nome] = medidas
+            tempos = "  ".join(f"{etapa}={medidas[etapa]['tempo'] * 1000:.1f}ms" for etapa in ETAPAS)
+            print(f"{nome:<24} {medidas['estados_afn']:>5} -> {medidas['estados_afd']:>6} estados  {tempos}")
+
+    if args.saida:
+        with open(args.saida, "w", encoding="utf-8") as arquivo:
+            json.dump(resultados, arquivo, indent=2)
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as arquivo:
+            baseline = json.load(arquivo)
+        regressoes = comparar(resultados, baseline, args.tolerancia,
+                              args.piso_tempo, args.piso_memoria)
+        if regressoes:
+            print("\nRegressoes em relacao ao baseline:")
+            for regressao in regressoes:
+                print(f"  {regressao}")
+            return 1
+        print("\nNenhuma regressao em relacao ao baseline.")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
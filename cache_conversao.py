@@ -0,0 +1,187 @@
+import hashlib
+import json
+import os
+import struct
+import tempfile
+from collections import OrderedDict
+from contextlib import contextmanager
+from afn import AFN
+from afd import AFD
+from conversor import conversor_afn_para_afd
+from io_binario import carregar_afd_binario, salvar_afd_binario
+
+try:
+    import fcntl
+except ImportError:  # windows: sem trava entre processos na remocao de arquivos
+    fcntl = None
+
+# limites padrao do cache: AFDs mantidos em memoria e bytes ocupados em disco
+MAX_AFDS_MEMORIA = 64
+MAX_BYTES_DISCO = 256 * 1024 * 1024
+
+def impressao_digital(afn: AFN) -> str:
+    """
+    calcula uma impressao digital (sha-256) canonica do AFN
+
+    os conjuntos e o dicionario de transicoes sao serializados em ordem, entao o
+    resultado nao depende da ordem de insercao dos estados, simbolos ou transicoes,
+    apenas do conteudo de estados, alfabeto, func_transicao, estado_inicial e
+    estados_aceitacao
+
+    retorno:
+        str: o hash em hexadecimal
+    """
+    transicoes = sorted(
+        (origem, simbolo, sorted(destinos))
+        for origem, simbolo, destinos in afn.transicoes()
+        if destinos
+    )
+    canonico = [
+        afn.nomes_estados(),
+        sorted(afn.alfabeto),
+        transicoes,
+        afn.estado_inicial,
+        sorted(afn.estados_aceitacao),
+    ]
+    texto = json.dumps(canonico, ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha256(texto.encode("utf-8")).hexdigest()
+
+
+class CacheConversao:
+    """
+    cache das conversoes AFN -> AFD, indexado pela impressao digital do AFN
+
+    os AFDs ficam em dois niveis: um LRU em memoria (ate max_memoria objetos) e um
+    diretorio com um arquivo .afdb por conversao (ate max_bytes no total, removendo
+    os menos usados primeiro). os arquivos sao gravados em um temporario e renomeados,
+    entao varios processos podem usar o mesmo diretorio sem ler arquivos pela metade;
+    a remocao por tamanho e feita com uma trava de arquivo (fcntl), quando disponivel
+
+    os AFDs devolvidos sao compartilhados com o cache e nao devem ser alterados
+    """
+    def __init__(self, diretorio: str, max_bytes: int = MAX_BYTES_DISCO,
+                 max_memoria: int = MAX_AFDS_MEMORIA):
+        self.diretorio = diretorio
+        self.max_bytes = max_bytes
+        self.max_memoria = max_memoria
+        os.makedirs(diretorio, exist_ok=True)
+
+        self._memoria: OrderedDict = OrderedDict()
+        self.acertos_memoria = 0
+        self.acertos_disco = 0
+        self.falhas = 0
+
+    def estatisticas(self) -> dict:
+        # contadores de acertos e falhas desde a criacao do cache
+        return {
+            "acertos_memoria": self.acertos_memoria,
+            "acertos_disco": self.acertos_disco,
+            "falhas": self.falhas,
+            "em_memoria": len(self._memoria),
+        }
+
+    def _caminho(self, chave: str) -> str:
+        return os.path.join(self.diretorio, chave + ".afdb")
+
+    def obter(self, afn: AFN, minimizar: bool = False) -> AFD:
+        """
+        retorna o AFD equivalente ao AFN, convertendo apenas se ele ainda nao estiver no cache
+
+        argumentos:
+            afn (AFN): o automato de entrada
+            minimizar (bool): repassado a conversor_afn_para_afd; faz parte da chave
+        retorno:
+            AFD: o AFD equivalente
+        """
+        chave = impressao_digital(afn) + ("-min" if minimizar else "")
+
+        afd = self._memoria.get(chave)
+        if afd is not None:
+            self._memoria.move_to_end(chave)
+            self.acertos_memoria += 1
+            return afd
+
+        caminho = self._caminho(chave)
+        try:
+            with carregar_afd_binario(caminho) as afd_binario:
+                afd = afd_binario.para_afd()
+            # marca o uso para a remocao por tamanho (menos usados saem primeiro)
+            os.utime(caminho)
+            self.acertos_disco += 1
+        except (FileNotFoundError, ValueError, struct.error, IndexError):
+            # ausente, removido por outro processo, truncado ou invalido: converte de novo
+            # e grava por cima
+            afd = conversor_afn_para_afd(afn, modo="bitset", minimizar=minimizar)
+            self._gravar(caminho, afd)
+            self.falhas += 1
+
+        self._guardar_memoria(chave, afd)
+        return afd
+
+    def _guardar_memoria(self, chave: str, afd: AFD):
+        self._memoria[chave] = afd
+        self._memoria.move_to_end(chave)
+        while len(self._memoria) > self.max_memoria:
+            self._memoria.popitem(last=False)
+
+    def _gravar(self, caminho: str, afd: AFD):
+        # grava em um temporario no mesmo diretorio e renomeia de forma atomica
+        descritor, temporario = tempfile.mkstemp(dir=self.diretorio, suffix=".tmp")
+        os.close(descritor)
+        try:
+            salvar_afd_binario(afd, temporario)
+            os.replace(temporario, caminho)
+        except BaseException:
+            if os.path.exists(temporario):
+                os.remove(temporario)
+            raise
+        self._remover_excedente()
+
+    @contextmanager
+    def _trava(self):
+        # trava exclusiva entre processos para a remocao de arquivos
+        if fcntl is None:
+            yield
+            return
+        with open(os.path.join(self.diretorio, ".trava"), "w") as arquivo:
+            fcntl.flock(arquivo, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(arquivo, fcntl.LOCK_UN)
+
+    def _remover_excedente(self):
+        # remove os arquivos usados ha mais tempo ate o diretorio caber em max_bytes
+        with self._trava():
+            arquivos = []
+            total = 0
+            for entrada in os.scandir(self.diretorio):
+                if not entrada.name.endswith(".afdb"):
+                    continue
+                try:
+                    info = entrada.stat()
+                except FileNotFoundError:
+                    continue
+                arquivos.append((info.st_mtime, info.st_size, entrada.path))
+                total += info.st_size
+
+            arquivos.sort()
+            for _, tamanho, caminho in arquivos:
+                if total <= self.max_bytes:
+                    break
+                try:
+                    os.remove(caminho)
+                except FileNotFoundError:
+                    pass
+                total -= tamanho
+
+    def limpar(self):
+        # esvazia o cache em memoria e remove todos os arquivos do diretorio
+        self._memoria.clear()
+        with self._trava():
+            for entrada in os.scandir(self.diretorio):
+                if entrada.name.endswith(".afdb"):
+                    try:
+                        os.remove(entrada.path)
+                    except FileNotFoundError:
+                        pass
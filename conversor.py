@@ -1,5 +1,11 @@
-from afn import AFN, EPSILON
+import logging
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from afn import AFN, EPSILON, mascara_compacta
 from afd import AFD
+from instrumentacao import ConversaoInterrompida, LimitesConversao, MonitorConversao, ObservadorConversao
 from typing import Set, Dict, Tuple, FrozenSet
 """
 a importação da biblioteca typing auxilia na estruturacao dos dados, exemplo:
@@ -11,19 +17,66 @@ tuple -> tupla com dois tipos especificos (representacao do estado, simbolo)
 MacroEstado = Set[str] # permite adicionar e remover elementos (set)
 MacroEstadoHashable = FrozenSet[str] # nao permite alteracao (frozenset)
 
-def conversor_afn_para_afd(afn: AFN) -> AFD:
+# as mensagens da conversao vao para este logger; o main.py as exibe no terminal
+logger = logging.getLogger(__name__)
+
+MODOS_CONVERSAO = ("conjuntos", "bitset", "paralelo")
+
+# no modo paralelo, fronteiras menores que isto sao expandidas no proprio processo,
+# porque o custo de enviar o lote aos trabalhadores seria maior que o da expansao
+MIN_FRONTEIRA_PARALELA = 256
+
+def conversor_afn_para_afd(afn: AFN, modo: str = "conjuntos", minimizar: bool = False,
+                           observador: ObservadorConversao = None,
+                           limites: LimitesConversao = None, processos: int = None) -> AFD:
     """
     algoritmo de construcao de subconjuntos para converter um AFN para um AFD
     argumentos:
         afn (AFN): objeto AFN de entrada (contendo epsilon ou nao)
+        modo (str): motor da conversao, "conjuntos" (macro-estados como set),
+                    "bitset" (macro-estados como inteiros, mais rapido em AFNs grandes)
+                    ou "paralelo" (bitset com cada nivel da BFS expandido por um pool de processos)
+        minimizar (bool): se true, o AFD gerado passa pela minimizacao de Hopcroft
+        observador (ObservadorConversao): recebe as estatisticas durante a conversao
+        limites (LimitesConversao): limites de estados, tempo e memoria; se algum for
+                                    ultrapassado e lancada ConversaoInterrompida
+        processos (int): tamanho do pool no modo paralelo (padrao: numero de CPUs)
     retorno:
         afd: o objeto AFD equivalente
     """
-    print("=============================================================")
-    print("   Iniciando a conversão do AFN para seu equivalente AFD    ")
-    print("=============================================================")
-    
+    if modo not in MODOS_CONVERSAO:
+        raise ValueError(f"Modo de conversao invalido: '{modo}'. Use um de {MODOS_CONVERSAO}")
+
+    logger.info("=============================================================")
+    logger.info("   Iniciando a conversão do AFN para seu equivalente AFD    ")
+    logger.info("=============================================================")
+
+    monitor = MonitorConversao(modo, observador, limites)
+    if modo == "bitset":
+        afd = _conversor_bitset(afn, monitor)
+    elif modo == "paralelo":
+        afd = _conversor_paralelo(afn, monitor, processos or os.cpu_count() or 1)
+    else:
+        afd = _conversor_conjuntos(afn, monitor)
+    monitor.finalizar()
+
+    if minimizar:
+        afd = afd.minimizar()
+        logger.info("O AFD minimizado contem %d estados.", afd.quantidade_estados)
+    return afd
+
+
+def _conversor_conjuntos(afn: AFN, monitor: MonitorConversao) -> AFD:
+    """
+    construcao de subconjuntos com os macro-estados representados como set/frozenset
+    """
+    estatisticas = monitor.estatisticas
+    monitor.acompanhar_indice(afn.indexar())
+
     afd_alfabeto = afn.alfabeto
+    # transicoes lidas da representacao compacta do AFN (a mesma dos outros motores),
+    # em um dicionario local que nao fica guardado no AFN
+    func_transicao = {(origem, simbolo): destinos for origem, simbolo, destinos in afn.transicoes()}
     estado_inicial_afd: MacroEstado = afn.calcula_fecho_epsilon({afn.estado_inicial})
     # fila para os macro-estados a serem explorados (busca em largura - BFS)
     fila: list[MacroEstado] = [estado_inicial_afd]
@@ -46,14 +99,18 @@ def conversor_afn_para_afd(afn: AFN) -> AFD:
             # if simbolo == EPSILON: continue 
             # o alfabeto do AFN deve ser passado sem o EPSILON
             # 1- encontrar todos os destinos do AFN para o simbolo
+            inicio = time.perf_counter()
             estados_destino_simbolo: Set[str] = set()
             for estado_individual in macro_estado_atual:
                 # O AFN retorna um conjunto de destinos para o par (estado, simbolo)
-                destinos = afn.func_transicao.get((estado_individual, simbolo), set())
+                destinos = func_transicao.get((estado_individual, simbolo), set())
                 estados_destino_simbolo.update(destinos)
                 
             # 2- aplicar o fecho-epsilon no resultado
+            meio = time.perf_counter()
             proximo_macro_estado: MacroEstado = afn.calcula_fecho_epsilon(estados_destino_simbolo)
+            estatisticas.tempo_sucessores += meio - inicio
+            estatisticas.tempo_fecho += time.perf_counter() - meio
             
             proximo_macro_estado_hash: MacroEstadoHashable = frozenset(proximo_macro_estado)
             
@@ -63,16 +120,195 @@ def conversor_afn_para_afd(afn: AFN) -> AFD:
             if proximo_macro_estado_hash not in estados_descobertos:
                 estados_descobertos.add(proximo_macro_estado_hash)
                 fila.append(proximo_macro_estado)
-    
+
+        monitor.processado(len(estados_descobertos), len(fila))
+
+    return _montar_afd(afn, frozenset(estado_inicial_afd), estados_descobertos, afd_transicoes_temp)
+
+
+def _conversor_bitset(afn: AFN, monitor: MonitorConversao) -> AFD:
+    """
+    construcao de subconjuntos com os macro-estados representados como bitmasks
+
+    os estados do AFN sao numerados pelo IndiceAFN, cada macro-estado e um inteiro
+    e os sucessores por simbolo (ja com fecho-epsilon) de cada estado sao montados
+    pelo indice na primeira vez em que o estado aparece em um macro-estado.
+    a fila de trabalho e uma deque, entao cada retirada custa O(1). os sucessores sao
+    calculados uma vez por classe de simbolos do IndiceAFN, e o AFD guarda uma coluna
+    por classe
+    """
+    estatisticas = monitor.estatisticas
+    inicio = time.perf_counter()
+    indice = afn.indexar()
+    estatisticas.tempo_fecho += time.perf_counter() - inicio
+    monitor.acompanhar_indice(indice)
+
+    # um simbolo por classe: os demais simbolos da classe tem os mesmos sucessores
+    representantes = [classe[0] for classe in indice.classes]
+
+    estado_inicial_afd = indice.mascara_inicial
+    fila = deque([estado_inicial_afd])
+    estados_descobertos: Set[int] = {estado_inicial_afd}
+    afd_transicoes_temp: Dict[Tuple[int, str], int] = {}
+
+    while fila:
+        inicio = time.perf_counter()
+        macro_estado_atual = fila.popleft()
+        for simbolo in representantes:
+            proximo_macro_estado = indice.sucessor(macro_estado_atual, simbolo)
+            afd_transicoes_temp[(macro_estado_atual, simbolo)] = proximo_macro_estado
+            if proximo_macro_estado not in estados_descobertos:
+                estados_descobertos.add(proximo_macro_estado)
+                fila.append(proximo_macro_estado)
+        estatisticas.tempo_sucessores += time.perf_counter() - inicio
+        monitor.processado(len(estados_descobertos), len(fila))
+
+    # volta das bitmasks para frozensets de nomes, apenas uma vez por macro-estado
+    conjuntos = {mascara: indice.nomes_de(mascara) for mascara in estados_descobertos}
+    transicoes = {
+        (conjuntos[origem], simbolo): conjuntos[destino]
+        for (origem, simbolo), destino in afd_transicoes_temp.items()
+    }
+    return _montar_afd(afn, conjuntos[estado_inicial_afd], set(conjuntos.values()), transicoes,
+                       indice.classes)
+
+
+# tabelas de sucessores do AFN em cada processo trabalhador (ver _iniciar_trabalhador)
+# e as mascaras ja montadas a partir delas
+_tabelas_trabalhador = None
+_mascaras_trabalhador = None
+
+def _iniciar_trabalhador(tabelas: list):
+    # executado uma vez em cada processo do pool: guarda as tabelas do IndiceAFN
+    global _tabelas_trabalhador, _mascaras_trabalhador
+    _tabelas_trabalhador = tabelas
+    _mascaras_trabalhador = [{} for _ in tabelas]
+
+def _expandir_macro_estados(macro_estados: list, tabelas: list = None, mascaras: list = None) -> list:
+    """
+    calcula os sucessores de cada macro-estado (bitmask) para cada simbolo
+
+    argumentos:
+        macro_estados (list[int]): os macro-estados a expandir
+        tabelas (list): por simbolo, IndiceAFN.tabela_compacta(simbolo); por padrao,
+                        as tabelas recebidas pelo processo trabalhador
+        mascaras (list): por simbolo, um dict que guarda as mascaras ja montadas
+    retorno:
+        list[list[int]]: para cada macro-estado, os destinos na ordem das tabelas
+    """
+    if tabelas is None:
+        tabelas = _tabelas_trabalhador
+        mascaras = _mascaras_trabalhador
+    resultado = []
+    for macro_estado in macro_estados:
+        destinos = []
+        for tabela, montadas in zip(tabelas, mascaras):
+            destino = 0
+            mascara = macro_estado
+            while mascara:
+                bit = mascara & -mascara
+                i = bit.bit_length() - 1
+                sucessores = montadas.get(i)
+                if sucessores is None:
+                    sucessores = montadas[i] = mascara_compacta(tabela.get(i))
+                destino |= sucessores
+                mascara ^= bit
+            destinos.append(destino)
+        resultado.append(destinos)
+    return resultado
+
+
+def _conversor_paralelo(afn: AFN, monitor: MonitorConversao, processos: int) -> AFD:
+    """
+    construcao de subconjuntos em bitmasks com a BFS feita nivel a nivel
+
+    cada fronteira (macro-estados descobertos no nivel anterior) e dividida em lotes
+    expandidos pelos processos do pool, que recebem as tabelas do IndiceAFN uma unica
+    vez ao iniciar. o processo principal junta os resultados na ordem dos lotes,
+    elimina repetidos e monta a proxima fronteira, entao o AFD gerado (inclusive os
+    nomes S<i>) e identico ao dos outros modos
+    """
+    estatisticas = monitor.estatisticas
+    inicio = time.perf_counter()
+    indice = afn.indexar()
+    monitor.acompanhar_indice(indice)
+    simbolos = [classe[0] for classe in indice.classes]
+    # os trabalhadores recebem os sucessores na forma compacta do indice e montam as
+    # mascaras sob demanda
+    tabelas = [indice.tabela_compacta(simbolo) for simbolo in simbolos]
+    estatisticas.tempo_fecho += time.perf_counter() - inicio
+
+    estado_inicial_afd = indice.mascara_inicial
+    estados_descobertos: Set[int] = {estado_inicial_afd}
+    afd_transicoes_temp: Dict[Tuple[int, str], int] = {}
+    fronteira = [estado_inicial_afd]
+    # mascaras montadas no proprio processo (fronteiras pequenas)
+    mascaras = [{} for _ in tabelas]
+
+    with ProcessPoolExecutor(max_workers=processos, initializer=_iniciar_trabalhador,
+                             initargs=(tabelas,)) as pool:
+        while fronteira:
+            inicio = time.perf_counter()
+            if len(fronteira) < MIN_FRONTEIRA_PARALELA or processos == 1:
+                resultados = _expandir_macro_estados(fronteira, tabelas, mascaras)
+            else:
+                # alguns lotes por processo, para equilibrar a carga
+                tamanho_lote = -(-len(fronteira) // (processos * 4))
+                lotes = [fronteira[i:i + tamanho_lote] for i in range(0, len(fronteira), tamanho_lote)]
+                resultados = []
+                try:
+                    # um nivel grande pode levar muito tempo: os limites de tempo e memoria
+                    # sao verificados a cada lote que volta do pool
+                    for parcial in pool.map(_expandir_macro_estados, lotes):
+                        resultados.extend(parcial)
+                        monitor.verificar_limites()
+                except ConversaoInterrompida:
+                    # os lotes que ainda nao comecaram sao descartados
+                    pool.shutdown(cancel_futures=True)
+                    raise
+            estatisticas.tempo_sucessores += time.perf_counter() - inicio
+
+            proxima_fronteira = []
+            for macro_estado_atual, destinos in zip(fronteira, resultados):
+                for simbolo, proximo_macro_estado in zip(simbolos, destinos):
+                    afd_transicoes_temp[(macro_estado_atual, simbolo)] = proximo_macro_estado
+                    if proximo_macro_estado not in estados_descobertos:
+                        estados_descobertos.add(proximo_macro_estado)
+                        proxima_fronteira.append(proximo_macro_estado)
+                monitor.processado(len(estados_descobertos), len(proxima_fronteira))
+            fronteira = proxima_fronteira
+
+    conjuntos = {mascara: indice.nomes_de(mascara) for mascara in estados_descobertos}
+    transicoes = {
+        (conjuntos[origem], simbolo): conjuntos[destino]
+        for (origem, simbolo), destino in afd_transicoes_temp.items()
+    }
+    return _montar_afd(afn, conjuntos[estado_inicial_afd], set(conjuntos.values()), transicoes,
+                       indice.classes)
+
+
+def _nomear_macro_estados(estados_descobertos) -> Dict[MacroEstadoHashable, str]:
     # definicao AFD: {frozenset} -> 'S0', 'S1', ...
-    # apresentacao dos estados na forma ordenada
-    estados_ordenados = sorted(list(estados_descobertos), key=lambda x: str(x))
-    mapa_nomes = {fs: f"S{i}" for i, fs in enumerate(estados_ordenados)}
+    # a ordenacao usa a lista ordenada dos nomes de cada macro-estado, entao os nomes
+    # gerados nao dependem da ordem de descoberta nem da ordem interna dos frozensets
+    estados_ordenados = sorted(estados_descobertos, key=lambda x: sorted(x))
+    return {fs: f"S{i}" for i, fs in enumerate(estados_ordenados)}
+
+
+def _montar_afd(afn: AFN, estado_inicial_afd: MacroEstadoHashable,
+                estados_descobertos: Set[MacroEstadoHashable],
+                afd_transicoes_temp: Dict[Tuple[MacroEstadoHashable, str], MacroEstadoHashable],
+                classes: list = None) -> AFD:
+    """
+    renomeia os macro-estados descobertos para 'S0', 'S1', ... e cria o objeto AFD.
+    com classes de simbolos, afd_transicoes_temp tem apenas o primeiro simbolo de cada classe
+    """
+    mapa_nomes = _nomear_macro_estados(estados_descobertos)
     
-    print(f"O AFD equivalente gerado contem {len(estados_descobertos)} estados.")
+    logger.info("O AFD equivalente gerado contem %d estados.", len(estados_descobertos))
     
     afd_estados_nomes = set(mapa_nomes.values())
-    afd_estado_inicial_nome = mapa_nomes[frozenset(estado_inicial_afd)]
+    afd_estado_inicial_nome = mapa_nomes[estado_inicial_afd]
     
     afd_transicoes_finais: Dict[Tuple[str, str], str] = {}
     for (origem_fs, simbolo), destino_fs in afd_transicoes_temp.items():
@@ -83,17 +319,15 @@ def conversor_afn_para_afd(afn: AFN) -> AFD:
     afd_estados_finais_nomes: Set[str] = set()
     for macro_estado_fs in estados_descobertos:
         # regra do estado final: o macro-estado e final se contiver pelo menos um estado final do AFN
-        # convertendo o frozenset de volta para set para usar 'any' com o conjunto de aceitacao do AFN
-        macro_estado_set = set(macro_estado_fs) 
-        
-        if any(estado_afn in afn.estados_aceitacao for estado_afn in macro_estado_set):
+        if any(estado_afn in afn.estados_aceitacao for estado_afn in macro_estado_fs):
             afd_estados_finais_nomes.add(mapa_nomes[macro_estado_fs])
             
     # cria e retona o objeto AFD
     return AFD(
         estados=afd_estados_nomes,
-        alfabeto=afd_alfabeto,
+        alfabeto=afn.alfabeto,
         func_transicao=afd_transicoes_finais,
         estado_inicial=afd_estado_inicial_nome,
-        estados_aceitacao=afd_estados_finais_nomes
-    )
\ No newline at end of file
+        estados_aceitacao=afd_estados_finais_nomes,
+        classes=classes
+    )
@@ -0,0 +1,472 @@
+import heapq
+import logging
+from collections import Counter, deque
+from afn import AFN, mascara_compacta
+from afd import AFD
+
+"""
+reconversao incremental AFN -> AFD: depois de alterar algumas transicoes do AFN,
+apenas os macro-estados afetados sao recalculados
+
+    conversor = ConversorIncremental(afn)
+    afd = conversor.afd
+    afn.adicionar_transicao("q1", "a", "q3")
+    afn.remover_transicao("q0", "b", "q2")
+    afd = conversor.atualizar()
+
+os macro-estados que continuam existindo mantem o nome S<i> que ja tinham e os
+novos recebem os proximos numeros. a primeira conversao gera os mesmos nomes de
+conversor_afn_para_afd
+"""
+
+logger = logging.getLogger(__name__)
+
+class ConversorIncremental:
+    """
+    guarda o resultado da construcao de subconjuntos (macro-estados como bitmasks do
+    IndiceAFN e o destino de cada um por simbolo) para refaze-la em parte
+
+    em atualizar(), os sucessores de cada estado no novo IndiceAFN sao comparados com
+    os anteriores: para cada simbolo a, alterados[a] e a mascara dos estados do AFN cujo
+    fecho(delta(estado, a)) mudou (por uma transicao com a ou por uma transicao-epsilon
+    que mudou algum fecho). um indice invertido (estado do AFN -> macro-estados que o
+    contem) leva direto as transicoes (M, a) a recalcular, sem passar pelas demais
+
+    cada macro-estado tambem guarda quantas transicoes chegam nele vindas de cada
+    antecessor. so os que perderam transicoes de entrada podem ter ficado
+    inalcancaveis: para cada um deles, uma busca para tras procura o estado inicial
+    (ou um estado ja confirmado); se nao encontra, todos os estados visitados so sao
+    alcancaveis entre si e sao removidos juntos
+
+    o AFD em self.afd e corrigido no lugar (adicionar_estado, remover_estados,
+    definir_transicoes), entao o custo de atualizar() acompanha o tamanho da
+    alteracao. alteracoes no alfabeto, nos estados de aceitacao ou no conjunto de
+    estados do AFN afetam todos os macro-estados e custam o mesmo que converter de
+    novo (com alfabeto diferente, o AFD e montado de novo)
+
+    qualquer alteracao no AFN (pelos metodos ou direto nas visoes) faz o AFN gerar um
+    novo IndiceAFN, que e comparado com o anterior
+    """
+    def __init__(self, afn: AFN):
+        self.afn = afn
+        # resumo da ultima atualizacao
+        self.recalculadas = 0
+        self.novos = 0
+        self.removidos = 0
+
+        indice = afn.indexar()
+        self._indice = indice
+        self._alfabeto = sorted(afn.alfabeto)
+        self._inicial = indice.mascara_inicial
+        # macro-estado (bitmask) -> {simbolo: macro-estado destino}
+        self._linhas: dict = {}
+        # indice invertido: estado do AFN (posicao no indice) -> macro-estados que o contem
+        self._contem: list = [set() for _ in indice.nomes]
+        # macro-estado -> Counter {antecessor: transicoes do antecessor que chegam nele}
+        self._anteriores: dict = {}
+        # macro-estado -> distancia ao inicial quando foi criado (so orienta a busca em _podar)
+        self._profundidade: dict = {}
+        self._expandir([self._inicial])
+
+        # mesmos nomes da conversao completa: ordem da lista ordenada de nomes do AFN
+        ordenados = sorted(self._linhas, key=lambda mascara: sorted(indice.nomes_de(mascara)))
+        self._nomes: dict = {mascara: f"S{i}" for i, mascara in enumerate(ordenados)}
+        self._proximo = len(ordenados)
+        self.afd = self._montar_afd()
+
+    def _indexar(self, mascara: int, incluir: bool):
+        # inclui / retira o macro-estado do indice invertido
+        contem = self._contem
+        resto = mascara
+        while resto:
+            bit = resto & -resto
+            if incluir:
+                contem[bit.bit_length() - 1].add(mascara)
+            else:
+                contem[bit.bit_length() - 1].discard(mascara)
+            resto ^= bit
+
+    def _ligar(self, origem: int, destino: int):
+        # conta mais uma transicao de origem para destino
+        anteriores = self._anteriores.get(destino)
+        if anteriores is None:
+            anteriores = self._anteriores[destino] = Counter()
+        anteriores[origem] += 1
+
+    def _desligar(self, origem: int, destino: int):
+        # desconta uma transicao de origem para destino (se o destino ainda existe)
+        anteriores = self._anteriores.get(destino)
+        if anteriores is None:
+            return
+        anteriores[origem] -= 1
+        if not anteriores[origem]:
+            del anteriores[origem]
+
+    def _expandir(self, fila) -> list:
+        """
+        busca em largura a partir dos macro-estados da fila que ainda nao tem linha,
+        calculando o destino de cada um com cada simbolo (uma vez por classe de simbolos)
+
+        retorno:
+            list[int]: os macro-estados criados, na ordem em que foram criados
+        """
+        indice = self._indice
+        linhas = self._linhas
+        profundidade = self._profundidade
+        fila = deque(mascara for mascara in fila if mascara not in linhas)
+        for mascara in fila:
+            if mascara == self._inicial:
+                profundidade[mascara] = 0
+            else:
+                profundidade[mascara] = 1 + min((profundidade[antecessor]
+                                                 for antecessor in self._anteriores.get(mascara, ())
+                                                 if antecessor in profundidade), default=0)
+        criados = []
+        while fila:
+            mascara = fila.popleft()
+            if mascara in linhas:
+                continue
+            linha = {}
+            for classe in indice.classes:
+                destino = indice.sucessor(mascara, classe[0])
+                for simbolo in classe:
+                    linha[simbolo] = destino
+                    self._ligar(mascara, destino)
+                if destino not in linhas:
+                    profundidade.setdefault(destino, profundidade[mascara] + 1)
+                    fila.append(destino)
+            linhas[mascara] = linha
+            self._indexar(mascara, True)
+            criados.append(mascara)
+        return criados
+
+    def _descartar(self, mascaras):
+        # retira os macro-estados (linhas, indice invertido e contadores dos destinos)
+        for mascara in mascaras:
+            for destino in self._linhas.pop(mascara).values():
+                if destino is not None:
+                    self._desligar(mascara, destino)
+            self._anteriores.pop(mascara, None)
+            self._profundidade.pop(mascara, None)
+            self._indexar(mascara, False)
+
+    def _podar(self, candidatos) -> list:
+        """
+        remove os candidatos que deixaram de ser alcancaveis a partir do inicial, junto
+        com os estados que so eram alcancaveis por eles. se as buscas para tras ja
+        visitaram tantos estados quanto existem, o restante e feito por _podar_tudo(),
+        entao o custo nunca passa muito do de uma busca a partir do inicial
+
+        retorno:
+            list[int]: os macro-estados removidos
+        """
+        linhas = self._linhas
+        anteriores = self._anteriores
+        profundidade = self._profundidade
+        confirmados = {self._inicial}
+        removidos = []
+        orcamento = len(linhas)
+        pilha = list(candidatos)
+        while pilha:
+            candidato = pilha.pop()
+            if candidato not in linhas or candidato in confirmados:
+                continue
+            # busca para tras ate o inicial ou um estado ja confirmado, pelos antecessores
+            # mais proximos do inicial primeiro. sucessor_de guarda por qual estado cada
+            # antecessor foi encontrado, para confirmar o caminho todo
+            sucessor_de = {candidato: None}
+            fila = [(0, candidato)]
+            encontrado = None
+            while fila and encontrado is None:
+                mascara = heapq.heappop(fila)[1]
+                for antecessor in anteriores.get(mascara, ()):
+                    if antecessor in confirmados:
+                        encontrado = mascara
+                        break
+                    if antecessor not in sucessor_de:
+                        sucessor_de[antecessor] = mascara
+                        heapq.heappush(fila, (profundidade.get(antecessor, 0), antecessor))
+            orcamento -= len(sucessor_de)
+            if encontrado is not None:
+                while encontrado is not None:
+                    confirmados.add(encontrado)
+                    encontrado = sucessor_de[encontrado]
+            else:
+                # todos os antecessores dos visitados foram visitados: nenhum caminho chega neles
+                for mascara in sucessor_de:
+                    pilha.extend(destino for destino in linhas[mascara].values() if destino not in sucessor_de)
+                self._descartar(sucessor_de)
+                removidos.extend(sucessor_de)
+            if orcamento < 0 and pilha:
+                return removidos + self._podar_tudo()
+        return removidos
+
+    def _podar_tudo(self) -> list:
+        # o mesmo que _podar, mas percorrendo todos os macro-estados a partir do inicial
+        alcancaveis = {self._inicial}
+        pilha = [self._inicial]
+        while pilha:
+            for destino in self._linhas[pilha.pop()].values():
+                if destino not in alcancaveis:
+                    alcancaveis.add(destino)
+                    pilha.append(destino)
+        removidos = [mascara for mascara in self._linhas if mascara not in alcancaveis]
+        self._descartar(removidos)
+        return removidos
+
+    def _remapear(self, antigo, novo):
+        """
+        quando os indices dos estados do AFN mudam (estados novos ou que sumiram),
+        reescreve as mascaras guardadas nos indices novos e refaz o indice invertido e
+        os contadores. os macro-estados com algum estado que nao existe mais sao
+        descartados, e as transicoes que iam para eles ficam None (recalculadas em
+        atualizar())
+
+        retorno:
+            tuple: (funcao que converte uma mascara antiga, None se ela tinha estado
+                    removido; posicao nova de cada estado antigo; nomes descartados)
+        """
+        mapa = [novo.posicao.get(nome) for nome in antigo.nomes]
+        removidos = 0
+        for i, j in enumerate(mapa):
+            if j is None:
+                removidos |= 1 << i
+
+        def remapear(mascara: int):
+            if mascara & removidos:
+                return None
+            resultado = 0
+            while mascara:
+                bit = mascara & -mascara
+                resultado |= 1 << mapa[bit.bit_length() - 1]
+                mascara ^= bit
+            return resultado
+
+        linhas = {}
+        nomes = {}
+        profundidade = {}
+        descartados = []
+        for mascara, linha in self._linhas.items():
+            nova = remapear(mascara)
+            if nova is None:
+                descartados.append(self._nomes[mascara])
+                continue
+            linhas[nova] = {simbolo: remapear(destino) for simbolo, destino in linha.items()}
+            nomes[nova] = self._nomes[mascara]
+            profundidade[nova] = self._profundidade[mascara]
+        self._linhas = linhas
+        self._nomes = nomes
+        self._profundidade = profundidade
+        self._contem = [set() for _ in novo.nomes]
+        self._anteriores = {}
+        for mascara, linha in linhas.items():
+            self._indexar(mascara, True)
+            for destino in linha.values():
+                if destino is not None:
+                    self._ligar(mascara, destino)
+        return remapear, mapa, descartados
+
+    def _alterados(self, antigo, novo, remapear, mapa) -> dict:
+        # simbolo -> mascara (indices novos) dos estados cujo sucessor mudou
+        n = len(novo.nomes)
+        todos = (1 << n) - 1
+        conhecidos = set(self._alfabeto)
+
+        # simbolos da mesma classe tem os mesmos sucessores: cada par de classes e
+        # comparado uma vez, e so nos estados com transicao pelo simbolo
+        comparados = {}
+        alterados = {}
+        for simbolo in sorted(self.afn.alfabeto):
+            if simbolo not in conhecidos:
+                alterados[simbolo] = todos
+                continue
+            chave = (antigo.classe_de[simbolo], novo.classe_de[simbolo])
+            mascara = comparados.get(chave)
+            if mascara is None:
+                tabela_antiga = {mapa[i]: sucessores for i, sucessores in antigo.tabela_compacta(simbolo).items()
+                                 if mapa[i] is not None}
+                tabela_nova = novo.tabela_compacta(simbolo)
+                mascara = 0
+                for j in tabela_antiga.keys() | tabela_nova.keys():
+                    velho = remapear(mascara_compacta(tabela_antiga.get(j)))
+                    if velho != mascara_compacta(tabela_nova.get(j)):
+                        mascara |= 1 << j
+                comparados[chave] = mascara
+            if mascara:
+                alterados[simbolo] = mascara
+        return alterados
+
+    def _afetadas(self, alterados: dict) -> dict:
+        # macro-estado -> simbolos cujas transicoes precisam ser recalculadas
+        contem = self._contem
+        por_bits = {}
+        afetadas = {}
+        for simbolo, bits in alterados.items():
+            mascaras = por_bits.get(bits)
+            if mascaras is None:
+                mascaras = por_bits[bits] = set()
+                resto = bits
+                while resto:
+                    bit = resto & -resto
+                    mascaras |= contem[bit.bit_length() - 1]
+                    resto ^= bit
+            for mascara in mascaras:
+                afetadas.setdefault(mascara, []).append(simbolo)
+        return afetadas
+
+    def atualizar(self, afn: AFN = None) -> AFD:
+        """
+        refaz apenas a parte da conversao afetada pelas alteracoes no AFN
+
+        argumentos:
+            afn (AFN): opcional, um novo objeto AFN que substitui o anterior (por
+                       exemplo, o mesmo .jff editado e carregado de novo)
+        retorno:
+            AFD: o AFD equivalente ao AFN atual (tambem guardado em self.afd; e o mesmo
+                 objeto de antes, corrigido no lugar, a menos que o alfabeto mude)
+        """
+        if afn is not None:
+            self.afn = afn
+        antigo = self._indice
+        novo = self.afn.indexar()
+        if novo is antigo:
+            self.recalculadas = self.novos = self.removidos = 0
+            return self.afd
+
+        anteriores = len(self._linhas)
+        descartados = []
+        if novo.nomes == antigo.nomes:
+            mapa = list(range(len(novo.nomes)))
+            remapear = lambda mascara: mascara
+        else:
+            remapear, mapa, descartados = self._remapear(antigo, novo)
+        alterados = self._alterados(antigo, novo, remapear, mapa)
+        aceitacao_alterada = remapear(antigo.aceitacao) != novo.aceitacao
+        self._indice = novo
+
+        alfabeto = sorted(self.afn.alfabeto)
+        conhecidos = set(self._alfabeto)
+        retirados = conhecidos - set(alfabeto)
+        alfabeto_alterado = bool(retirados) or len(alfabeto) != len(conhecidos)
+        self._alfabeto = alfabeto
+
+        # transicoes (M, a) a recalcular: as dos macro-estados que contem estados
+        # afetados, as que iam para macro-estados descartados e, com simbolo novo, as
+        # desse simbolo em todos os macro-estados. simbolos retirados saem das linhas
+        afetadas = self._afetadas({simbolo: bits for simbolo, bits in alterados.items()
+                                   if simbolo in conhecidos})
+        if descartados or alfabeto_alterado:
+            for mascara, linha in self._linhas.items():
+                for simbolo in retirados:
+                    destino = linha.pop(simbolo)
+                    if destino is not None:
+                        self._desligar(mascara, destino)
+                for simbolo in alfabeto:
+                    if linha.get(simbolo) is None:
+                        afetadas.setdefault(mascara, []).append(simbolo)
+
+        recalculadas = 0
+        candidatos = []
+        fila = []
+        # macro-estado -> simbolos com destino diferente do que esta no AFD
+        alteradas = {}
+        for mascara, simbolos in afetadas.items():
+            linha = self._linhas[mascara]
+            por_classe = {}
+            for simbolo in simbolos:
+                classe = novo.classe_de[simbolo]
+                destino = por_classe.get(classe)
+                if destino is None:
+                    destino = por_classe[classe] = novo.sucessor(mascara, simbolo)
+                recalculadas += 1
+                anterior = linha.get(simbolo)
+                if anterior == destino:
+                    continue
+                if anterior is not None:
+                    self._desligar(mascara, anterior)
+                    candidatos.append(anterior)
+                linha[simbolo] = destino
+                self._ligar(mascara, destino)
+                alteradas.setdefault(mascara, []).append(simbolo)
+                fila.append(destino)
+
+        # o inicial anterior, nos indices novos (None se foi descartado)
+        inicial_anterior = remapear(self._inicial)
+        self._inicial = novo.mascara_inicial
+        if inicial_anterior is not None:
+            candidatos.append(inicial_anterior)
+        fila.append(self._inicial)
+        criados = self._expandir(fila)
+
+        if descartados or alfabeto_alterado:
+            # essas alteracoes ja passaram por todos os macro-estados
+            removidos = self._podar_tudo()
+        else:
+            removidos = self._podar(candidatos)
+        self.novos = len(criados)
+        self.removidos = anteriores + self.novos - len(self._linhas)
+        self.recalculadas = recalculadas
+
+        # os removidos liberam o nome; os novos que sobraram recebem os proximos numeros
+        descartados += [self._nomes.pop(mascara) for mascara in removidos if mascara in self._nomes]
+        criados = [mascara for mascara in criados if mascara in self._linhas]
+        for mascara in criados:
+            self._nomes[mascara] = f"S{self._proximo}"
+            self._proximo += 1
+
+        logger.info("Reconversao incremental: %d transicoes recalculadas, %d macro-estados novos, %d removidos.",
+                    recalculadas, self.novos, self.removidos)
+        if alfabeto_alterado:
+            # todas as linhas mudaram de tamanho: o AFD e montado de novo
+            self.afd = self._montar_afd()
+        else:
+            self._corrigir_afd(criados, descartados, alteradas, aceitacao_alterada)
+        return self.afd
+
+    def _corrigir_afd(self, criados: list, descartados: list, alteradas: dict, aceitacao_alterada: bool):
+        # aplica ao self.afd as mudancas feitas nos macro-estados
+        afd = self.afd
+        nomes = self._nomes
+        aceitacao = self._indice.aceitacao
+        for mascara in criados:
+            afd.adicionar_estado(nomes[mascara])
+            alteradas[mascara] = list(self._linhas[mascara])
+        # o inicial muda antes da remocao, que nao aceita remover o inicial
+        afd.estado_inicial = nomes[self._inicial]
+        afd.remover_estados(descartados)
+
+        for mascara, simbolos in alteradas.items():
+            linha = self._linhas.get(mascara)
+            if linha is None:
+                continue
+            # agrupados por destino, para que uma classe de simbolos nao seja separada a toa
+            por_destino = {}
+            for simbolo in simbolos:
+                por_destino.setdefault(linha[simbolo], []).append(simbolo)
+            for destino, grupo in por_destino.items():
+                afd.definir_transicoes(nomes[mascara], grupo, nomes[destino])
+
+        for mascara in (self._linhas if aceitacao_alterada else criados):
+            if mascara & aceitacao:
+                afd.estados_aceitacao.add(nomes[mascara])
+            else:
+                afd.estados_aceitacao.discard(nomes[mascara])
+
+    def macro_estados(self) -> dict:
+        """
+        retorno:
+            dict: nome de cada estado do AFD -> frozenset dos estados do AFN que ele representa
+        """
+        return {self._nomes[mascara]: self._indice.nomes_de(mascara) for mascara in self._linhas}
+
+    def _montar_afd(self) -> AFD:
+        indice = self._indice
+        nomes = self._nomes
+        func_transicao = {}
+        for mascara, linha in self._linhas.items():
+            origem = nomes[mascara]
+            for classe in indice.classes:
+                func_transicao[(origem, classe[0])] = nomes[linha[classe[0]]]
+        aceitacao = {nomes[mascara] for mascara in self._linhas if mascara & indice.aceitacao}
+        return AFD(set(nomes.values()), self.afn.alfabeto, func_transicao,
+                   nomes[self._inicial], aceitacao, classes=indice.classes)
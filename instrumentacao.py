@@ -0,0 +1,256 @@
+import logging
+import os
+import sys
+import time
+
+try:
+    import resource
+except ImportError:  # windows: o limite de memoria nao e verificado
+    resource = None
+
+"""
+acompanhamento da construcao de subconjuntos: estatisticas, observadores e limites
+
+    observador = ObservadorLog(intervalo=10000)
+    limites = LimitesConversao(max_estados=1_000_000, max_segundos=60)
+    afd = conversor_afn_para_afd(afn, modo="bitset", observador=observador, limites=limites)
+
+se um limite for ultrapassado a conversao para com ConversaoInterrompida, que carrega
+as estatisticas parciais
+"""
+
+logger = logging.getLogger(__name__)
+
+class EstatisticasConversao:
+    """
+    metricas de uma conversao, atualizadas durante a construcao de subconjuntos
+
+    atributos:
+        modo: motor usado ("conjuntos", "bitset", ...)
+        macro_estados: macro-estados descobertos ate o momento
+        processados: macro-estados ja retirados da fila e expandidos
+        tamanho_fila / fila_maxima: profundidade atual e maxima da fila de trabalho
+        fechos_calculados: fechos-epsilon efetivamente calculados (nos modos bitset e
+                           paralelo, os componentes resolvidos pelo IndiceAFN)
+        acertos_cache: fechos-epsilon obtidos do cache do IndiceAFN
+        tempo_fecho / tempo_sucessores: segundos gastos em cada parte da conversao
+        tempo_total: segundos desde o inicio
+        memoria_pico: pico de memoria residente do processo em bytes (se disponivel)
+        memoria_usada: crescimento da memoria residente desde o inicio da conversao,
+                       em bytes (e o valor comparado com LimitesConversao.max_memoria)
+        interrompida / motivo: preenchidos quando um limite e ultrapassado
+    """
+    def __init__(self, modo: str):
+        self.modo = modo
+        self.macro_estados = 0
+        self.processados = 0
+        self.tamanho_fila = 0
+        self.fila_maxima = 0
+        self.fechos_calculados = 0
+        self.acertos_cache = 0
+        self.tempo_fecho = 0.0
+        self.tempo_sucessores = 0.0
+        self.tempo_total = 0.0
+        self.memoria_pico = None
+        self.memoria_usada = None
+        self.interrompida = False
+        self.motivo = None
+
+    def como_dict(self) -> dict:
+        return dict(vars(self))
+
+    def __repr__(self):
+        return f"EstatisticasConversao({self.como_dict()})"
+
+
+class ObservadorConversao:
+    """
+    interface de observacao da conversao; basta sobrescrever os metodos desejados.
+    progresso() e chamado a cada 'intervalo' macro-estados processados
+    """
+    intervalo = 1000
+
+    def inicio(self, estatisticas: EstatisticasConversao):
+        pass
+
+    def progresso(self, estatisticas: EstatisticasConversao):
+        pass
+
+    def fim(self, estatisticas: EstatisticasConversao):
+        pass
+
+
+class ObservadorLog(ObservadorConversao):
+    """
+    observador que registra o progresso no logger deste modulo (nivel INFO)
+    """
+    def __init__(self, intervalo: int = 1000):
+        self.intervalo = intervalo
+
+    def progresso(self, estatisticas: EstatisticasConversao):
+        logger.info(
+            "%d macro-estados descobertos, %d processados, fila com %d, %.2fs (fecho %.2fs, sucessores %.2fs)",
+            estatisticas.macro_estados, estatisticas.processados, estatisticas.tamanho_fila,
+            estatisticas.tempo_total, estatisticas.tempo_fecho, estatisticas.tempo_sucessores
+        )
+
+    def fim(self, estatisticas: EstatisticasConversao):
+        situacao = f"interrompida ({estatisticas.motivo})" if estatisticas.interrompida else "concluida"
+        logger.info("Conversao %s: %d macro-estados em %.2fs",
+                    situacao, estatisticas.macro_estados, estatisticas.tempo_total)
+
+
+class LimitesConversao:
+    """
+    limites opcionais da conversao (None desativa cada um)
+
+    argumentos:
+        max_estados (int): quantidade maxima de macro-estados descobertos
+        max_segundos (float): tempo maximo de conversao
+        max_memoria (int): quanto a memoria residente do processo pode crescer durante a
+                           conversao, em bytes (a memoria ja ocupada antes dela nao conta)
+
+    no modo paralelo, a memoria contada e apenas a do processo principal (a dos
+    processos do pool fica de fora) e os limites sao verificados a cada lote de
+    macro-estados devolvido pelo pool
+    """
+    def __init__(self, max_estados=None, max_segundos=None, max_memoria=None):
+        self.max_estados = max_estados
+        self.max_segundos = max_segundos
+        self.max_memoria = max_memoria
+
+
+class ConversaoInterrompida(Exception):
+    """
+    a conversao ultrapassou um dos LimitesConversao; 'estatisticas' tem os dados parciais
+    """
+    def __init__(self, motivo: str, estatisticas: EstatisticasConversao):
+        super().__init__(f"Conversao interrompida: {motivo}")
+        self.motivo = motivo
+        self.estatisticas = estatisticas
+
+
+def _memoria_atual():
+    # memoria residente atual do processo em bytes (linux), ou None se nao suportado
+    try:
+        with open("/proc/self/statm") as arquivo:
+            paginas = int(arquivo.read().split()[1])
+    except (OSError, ValueError, IndexError):
+        return None
+    return paginas * os.sysconf("SC_PAGE_SIZE")
+
+def _memoria_pico():
+    # pico de memoria residente do processo em bytes, ou None se nao suportado
+    if resource is None:
+        return None
+    pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # o macOS informa em bytes, o linux em KiB
+    return pico if sys.platform == "darwin" else pico * 1024
+
+
+class MonitorConversao:
+    """
+    usado pelos motores de conversao para atualizar as estatisticas, avisar o
+    observador e verificar os limites. o limite de estados e verificado a cada
+    macro-estado; tempo, memoria e progresso a cada 'intervalo' macro-estados
+    """
+    def __init__(self, modo: str, observador: ObservadorConversao = None,
+                 limites: LimitesConversao = None):
+        self.estatisticas = EstatisticasConversao(modo)
+        self.observador = observador
+        self.limites = limites or LimitesConversao()
+        self.intervalo = observador.intervalo if observador is not None else 1000
+        self._proxima_verificacao = self.intervalo
+        self._inicio = time.perf_counter()
+        # referencia para memoria_usada: a memoria residente atual ou, sem /proc, o pico
+        # do processo (ru_maxrss so cresce, entao o crescimento dele e um limite inferior)
+        self._memoria_inicial = _memoria_atual()
+        self._pico_inicial = _memoria_pico()
+        self._indice = None
+        if observador is not None:
+            observador.inicio(self.estatisticas)
+
+    def acompanhar_indice(self, indice):
+        """
+        passa a contar os fechos calculados e os acertos de cache do IndiceAFN
+        a partir deste momento
+        """
+        self._indice = indice
+        self._base_fechos = indice.fechos_calculados
+        self._base_acertos = indice.acertos_cache
+
+    def _atualizar(self):
+        estatisticas = self.estatisticas
+        estatisticas.tempo_total = time.perf_counter() - self._inicio
+        estatisticas.memoria_pico = _memoria_pico()
+        if self._memoria_inicial is not None:
+            atual = _memoria_atual()
+            if atual is not None:
+                estatisticas.memoria_usada = max(0, atual - self._memoria_inicial)
+        elif self._pico_inicial is not None and estatisticas.memoria_pico is not None:
+            estatisticas.memoria_usada = max(0, estatisticas.memoria_pico - self._pico_inicial)
+        if self._indice is not None:
+            estatisticas.fechos_calculados = self._indice.fechos_calculados - self._base_fechos
+            estatisticas.acertos_cache = self._indice.acertos_cache - self._base_acertos
+
+    def processado(self, descobertos: int, tamanho_fila: int):
+        """
+        registra a expansao de um macro-estado
+
+        argumentos:
+            descobertos (int): total de macro-estados descobertos ate agora
+            tamanho_fila (int): macro-estados ainda na fila
+        """
+        estatisticas = self.estatisticas
+        estatisticas.processados += 1
+        estatisticas.macro_estados = descobertos
+        estatisticas.tamanho_fila = tamanho_fila
+        if tamanho_fila > estatisticas.fila_maxima:
+            estatisticas.fila_maxima = tamanho_fila
+
+        limites = self.limites
+        if limites.max_estados is not None and descobertos > limites.max_estados:
+            self._interromper(f"mais de {limites.max_estados} macro-estados")
+
+        if estatisticas.processados >= self._proxima_verificacao:
+            self._proxima_verificacao += self.intervalo
+            self.verificar()
+
+    def verificar(self):
+        # atualiza tempo/memoria, avisa o observador e checa os limites de tempo e memoria
+        self._atualizar()
+        if self.observador is not None:
+            self.observador.progresso(self.estatisticas)
+        self._verificar_limites()
+
+    def verificar_limites(self):
+        """
+        checa os limites de tempo e memoria sem avisar o observador. usado pelos
+        motores que passam muito tempo sem registrar macro-estados (modo paralelo)
+        """
+        self._atualizar()
+        self._verificar_limites()
+
+    def _verificar_limites(self):
+        estatisticas = self.estatisticas
+        limites = self.limites
+        if limites.max_segundos is not None and estatisticas.tempo_total > limites.max_segundos:
+            self._interromper(f"mais de {limites.max_segundos} segundos")
+        if (limites.max_memoria is not None and estatisticas.memoria_usada is not None
+                and estatisticas.memoria_usada > limites.max_memoria):
+            self._interromper(f"mais de {limites.max_memoria} bytes de memoria")
+
+    def _interromper(self, motivo: str):
+        estatisticas = self.estatisticas
+        estatisticas.interrompida = True
+        estatisticas.motivo = motivo
+        self.finalizar()
+        raise ConversaoInterrompida(motivo, estatisticas)
+
+    def finalizar(self) -> EstatisticasConversao:
+        # fecha as estatisticas e avisa o observador
+        estatisticas = self.estatisticas
+        self._atualizar()
+        if self.observador is not None:
+            self.observador.fim(estatisticas)
+        return estatisticas
@@ -0,0 +1,222 @@
+import mmap
+import struct
+import sys
+from array import array
+from afd import AFD
+
+"""
+formato binario compacto para AFDs ja convertidos (.afdb), todo em little-endian:
+
+    cabecalho (32 bytes) -> ver CABECALHO abaixo
+    aceitacao            -> int32[n_estados], 1 se o estado e de aceitacao
+    transicoes           -> int32[n_estados * n_simbolos], destino de (estado, simbolo)
+                            na posicao estado * n_simbolos + simbolo, ou -1 se indefinida
+    tabela de nomes      -> int32[n_estados + 1] com o inicio de cada nome no bloco
+                            seguinte, mais o bloco de nomes em utf-8 (alinhado em 4 bytes)
+    tabela de simbolos   -> mesmo formato, com n_simbolos + 1 posicoes
+
+os estados e simbolos aparecem em ordem (sorted), entao o mesmo AFD gera sempre o
+mesmo arquivo. como os arrays sao int32 alinhados, o arquivo pode ser mapeado com
+mmap e lido via memoryview sem criar um objeto por transicao
+"""
+MAGICO = b"AFDB"
+VERSAO = 1
+# magico, versao, reservado, n_estados, n_simbolos, estado_inicial,
+# inicio da tabela de nomes, inicio da tabela de simbolos, reservado
+CABECALHO = struct.Struct("<4sHHIIiIII")
+
+def _tabela_textos(textos: list) -> bytes:
+    # offsets int32 seguidos dos textos em utf-8, com preenchimento ate multiplo de 4
+    codificados = [texto.encode("utf-8") for texto in textos]
+    offsets = array("i", [0])
+    for texto in codificados:
+        offsets.append(offsets[-1] + len(texto))
+    if sys.byteorder != "little":
+        offsets.byteswap()
+    bloco = b"".join(codificados)
+    bloco += b"\0" * (-len(bloco) % 4)
+    return offsets.tobytes() + bloco
+
+def salvar_afd_binario(afd: AFD, caminho_saida: str):
+    """
+    salva o AFD no formato binario compacto (.afdb)
+
+    argumentos:
+        afd (AFD): o automato a ser salvo
+        caminho_saida (str): caminho do arquivo de saida
+    """
+    estados = sorted(afd.nomes_estados())
+    simbolos = sorted(afd.alfabeto)
+    indice_estado = {estado: i for i, estado in enumerate(estados)}
+    indice_simbolo = {simbolo: j for j, simbolo in enumerate(simbolos)}
+    k = len(simbolos)
+
+    aceitacao = array("i", [1 if estado in afd.estados_aceitacao else 0 for estado in estados])
+    transicoes = array("i", [-1]) * (len(estados) * k)
+    for origem, simbolo, destino in afd.transicoes():
+        if simbolo in indice_simbolo:
+            transicoes[indice_estado[origem] * k + indice_simbolo[simbolo]] = indice_estado[destino]
+    if sys.byteorder != "little":
+        aceitacao.byteswap()
+        transicoes.byteswap()
+
+    tabela_nomes = _tabela_textos(estados)
+    tabela_simbolos = _tabela_textos(simbolos)
+    inicio_nomes = CABECALHO.size + 4 * (len(aceitacao) + len(transicoes))
+    inicio_simbolos = inicio_nomes + len(tabela_nomes)
+
+    cabecalho = CABECALHO.pack(
+        MAGICO, VERSAO, 0, len(estados), k,
+        indice_estado.get(afd.estado_inicial, -1),
+        inicio_nomes, inicio_simbolos, 0
+    )
+    with open(caminho_saida, "wb") as arquivo:
+        arquivo.write(cabecalho)
+        arquivo.write(aceitacao.tobytes())
+        arquivo.write(transicoes.tobytes())
+        arquivo.write(tabela_nomes)
+        arquivo.write(tabela_simbolos)
+
+def carregar_afd_binario(caminho_arquivo: str) -> "AFDBinario":
+    """
+    abre um arquivo .afdb mapeado em memoria (somente leitura)
+
+    retorno:
+        AFDBinario: o AFD pronto para testar cadeias; use para_afd() para obter um AFD comum
+    """
+    with open(caminho_arquivo, "rb") as arquivo:
+        mapa = mmap.mmap(arquivo.fileno(), 0, access=mmap.ACCESS_READ)
+    try:
+        return AFDBinario(mapa)
+    except BaseException:
+        # arquivo invalido: o mmap nao fica aberto ate o coletor de lixo passar
+        mapa.close()
+        raise
+
+
+class AFDBinario:
+    """
+    AFD lido de um arquivo .afdb. as tabelas de aceitacao e de transicoes sao
+    memoryviews sobre o proprio mmap, entao carregar o arquivo nao depende do
+    numero de transicoes e varios processos que abrem o mesmo arquivo compartilham
+    as mesmas paginas de memoria. os nomes dos estados so sao decodificados em para_afd
+    """
+    def __init__(self, dados):
+        self._mapa = dados
+        self._visao = memoryview(dados)
+        self.aceitacao = None
+        self.transicoes = None
+        try:
+            self._ler()
+        except BaseException:
+            # as visoes sao liberadas para que quem chamou possa fechar o mmap
+            self._liberar_visoes()
+            raise
+
+    def _ler(self):
+        # le o cabecalho e monta as visoes das tabelas (struct.error / IndexError
+        # indicam um arquivo truncado)
+        visao = self._visao
+        (magico, versao, _, n_estados, n_simbolos, inicial,
+         inicio_nomes, inicio_simbolos, _) = CABECALHO.unpack_from(visao, 0)
+        if magico != MAGICO:
+            raise ValueError("Arquivo nao esta no formato .afdb")
+        if versao != VERSAO:
+            raise ValueError(f"Versao {versao} do formato .afdb nao suportada")
+
+        self.n_estados = n_estados
+        self.n_simbolos = n_simbolos
+        self.inicial = inicial
+
+        fim_aceitacao = CABECALHO.size + 4 * n_estados
+        fim_transicoes = fim_aceitacao + 4 * n_estados * n_simbolos
+        if fim_transicoes > len(visao) or not -1 <= inicial < n_estados:
+            raise ValueError("Arquivo .afdb truncado ou corrompido")
+        self.aceitacao = self._inteiros(visao[CABECALHO.size:fim_aceitacao])
+        self.transicoes = self._inteiros(visao[fim_aceitacao:fim_transicoes])
+        self._inicio_nomes = inicio_nomes
+
+        self.simbolos = self._textos(inicio_simbolos, n_simbolos)
+        self.coluna = {simbolo: j for j, simbolo in enumerate(self.simbolos)}
+
+    @staticmethod
+    def _inteiros(trecho: memoryview):
+        if sys.byteorder == "little":
+            return trecho.cast("i")
+        # maquinas big-endian precisam de uma copia convertida
+        convertido = array("i", trecho.tobytes())
+        convertido.byteswap()
+        return convertido
+
+    def _textos(self, inicio: int, quantidade: int) -> list:
+        if inicio + 4 * (quantidade + 1) > len(self._visao):
+            raise ValueError("Arquivo .afdb truncado ou corrompido")
+        offsets = self._inteiros(self._visao[inicio:inicio + 4 * (quantidade + 1)])
+        bloco = inicio + 4 * (quantidade + 1)
+        try:
+            if bloco + offsets[quantidade] > len(self._visao):
+                raise ValueError("Arquivo .afdb truncado ou corrompido")
+            return [bytes(self._visao[bloco + offsets[i]:bloco + offsets[i + 1]]).decode("utf-8")
+                    for i in range(quantidade)]
+        finally:
+            # mesmo com um nome invalido, nenhuma visao fica presa ao mmap
+            if isinstance(offsets, memoryview):
+                offsets.release()
+
+    def aceita(self, cadeia: str) -> bool:
+        # teste da cadeia sem mensagens: simbolo desconhecido ou transicao indefinida rejeita
+        transicoes = self.transicoes
+        coluna = self.coluna
+        k = self.n_simbolos
+        estado = self.inicial
+        if estado < 0:
+            return False
+        for simbolo in cadeia:
+            j = coluna.get(simbolo)
+            if j is None:
+                return False
+            estado = transicoes[estado * k + j]
+            if estado < 0:
+                return False
+        return self.aceitacao[estado] == 1
+
+    def processar_lote(self, cadeias) -> list:
+        # testa varias cadeias de uma vez, na mesma ordem
+        return [self.aceita(cadeia) for cadeia in cadeias]
+
+    def para_afd(self) -> AFD:
+        """
+        reconstroi o objeto AFD completo a partir do arquivo
+        """
+        estados = self._textos(self._inicio_nomes, self.n_estados)
+        k = self.n_simbolos
+        func_transicao = {}
+        for i, estado in enumerate(estados):
+            for j, simbolo in enumerate(self.simbolos):
+                destino = self.transicoes[i * k + j]
+                if destino >= 0:
+                    func_transicao[(estado, simbolo)] = estados[destino]
+        return AFD(
+            estados=set(estados),
+            alfabeto=set(self.simbolos),
+            func_transicao=func_transicao,
+            estado_inicial=estados[self.inicial] if self.inicial >= 0 else None,
+            estados_aceitacao={estados[i] for i in range(self.n_estados) if self.aceitacao[i]}
+        )
+
+    def _liberar_visoes(self):
+        for visao in (self.aceitacao, self.transicoes, self._visao):
+            if isinstance(visao, memoryview):
+                visao.release()
+
+    def fechar(self):
+        # libera as memoryviews e o mmap
+        self._liberar_visoes()
+        if isinstance(self._mapa, mmap.mmap):
+            self._mapa.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *excecao):
+        self.fechar()
@@ -1,54 +1,83 @@
+import sys
 import xml.etree.ElementTree as ET
 from afn import AFN, EPSILON
 from afd import AFD
 
+def _simbolo_jflap(read_text) -> str:
+    # por padrão arquivos JFLAP costumam contera tag <read/> vazio para transicoes epsilon
+    if read_text is None:
+        # tag <read/> ausente -> interpreta como epsilon
+        return EPSILON
+    # remove espaços em branco ao redor; se apos limpar a string estiver vazia, tambem e epsilon
+    read_text_limpo = read_text.strip()
+    if read_text_limpo == "":
+        return EPSILON
+    return sys.intern(read_text_limpo)
+
 def carregar_afn_jflap(caminho_arquivo: str) -> AFN:
     """
     le um arquivo .jff (JFLAP) e retorna um objeto AFN.
-    """
-    tree = ET.parse(caminho_arquivo)
-    root = tree.getroot()
 
+    o arquivo e lido de forma incremental (iterparse): cada <state> e <transition>
+    e processado assim que termina e removido da arvore em seguida, entao a memoria
+    usada nao cresce com o tamanho do XML, apenas com o AFN montado. os ids dos
+    estados sao resolvidos por dicionario e os nomes/simbolos sao internados
+    """
     estados = set()
     alfabeto = set()
     func_transicao = {}
     estado_inicial = None
     estados_aceitacao = set()
     id_nome = {}
+    # transicoes que citam ids de estados ainda nao lidos (nao e o caso do JFLAP,
+    # que grava os estados primeiro, mas o XML nao garante a ordem)
+    pendentes = []
 
-    # leitura dos estados
-    for state in root.findall(".//state"):
-        estado_id = state.get("id")
-        nome = state.get("name")
-        id_nome[estado_id] = nome
-        estados.add(nome)
-
-        if state.find("initial") is not None:
-            estado_inicial = nome
-        if state.find("final") is not None:
-            estados_aceitacao.add(nome)
-
-    # leitura das transicoes
-    for trans in root.findall(".//transition"):
-        origem = id_nome[trans.findtext('from')]
-        destino = id_nome[trans.findtext('to')]
-        # por padrão arquivos JFLAP costumam contera tag <read/> vazio para transicoes epsilon
-        read_text = trans.findtext('read')
-        # normaliza e decide se é epsilon
-        if read_text is None:
-            # tag <read/> ausente -> interpreta como epsilon
-            simbolo = EPSILON
+    def adicionar(origem: str, destino: str, simbolo: str):
+        alfabeto.add(simbolo)
+        destinos = func_transicao.get((origem, simbolo))
+        if destinos is None:
+            func_transicao[(origem, simbolo)] = {destino}
         else:
-            # remove espaços em branco ao redor
-            read_text_limpo = read_text.strip()
-            # se apos limpar a string estiver vazia, tambem e epsilon
-            if read_text_limpo == "":
-                simbolo = EPSILON
+            destinos.add(destino)
+
+    # pilha com os elementos abertos, para retirar os ja processados do pai
+    abertos = []
+    for evento, elem in ET.iterparse(caminho_arquivo, events=("start", "end")):
+        if evento == "start":
+            abertos.append(elem)
+            continue
+        abertos.pop()
+
+        if elem.tag == "state":
+            # leitura dos estados
+            nome = sys.intern(elem.get("name"))
+            id_nome[elem.get("id")] = nome
+            estados.add(nome)
+
+            if elem.find("initial") is not None:
+                estado_inicial = nome
+            if elem.find("final") is not None:
+                estados_aceitacao.add(nome)
+        elif elem.tag == "transition":
+            # leitura das transicoes
+            origem_id = elem.findtext('from').strip()
+            destino_id = elem.findtext('to').strip()
+            simbolo = _simbolo_jflap(elem.findtext('read'))
+            if origem_id in id_nome and destino_id in id_nome:
+                adicionar(id_nome[origem_id], id_nome[destino_id], simbolo)
             else:
-                simbolo = read_text_limpo
+                pendentes.append((origem_id, destino_id, simbolo))
+        else:
+            continue
 
-        alfabeto.add(simbolo)
-        func_transicao.setdefault((origem, simbolo), set()).add(destino)
+        # o elemento ja processado e sempre o ultimo filho do pai: descarta-o
+        elem.clear()
+        if abertos:
+            del abertos[-1][-1]
+
+    for origem_id, destino_id, simbolo in pendentes:
+        adicionar(id_nome[origem_id], id_nome[destino_id], simbolo)
 
     # remove epsilon do alfabeto publico do AFN
     alfabeto.discard(EPSILON)
@@ -61,32 +90,131 @@ def carregar_afn_jflap(caminho_arquivo: str) -> AFN:
         estados_aceitacao=estados_aceitacao
     )
 
-def salvar_afd_jflap(afd: AFD, caminho_saida: str):
+# layouts aceitos por salvar_afd_jflap para posicionar os estados no JFLAP
+LAYOUTS = ("linha", "grade", "camadas")
+# distancia, em pixels do JFLAP, entre estados vizinhos
+ESPACAMENTO = 100
+
+def _escapar_texto(texto: str) -> str:
+    # mesmo escape que o ElementTree aplica ao conteudo dos elementos
+    return texto.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
+
+def _escapar_atributo(valor: str) -> str:
+    # mesmo escape que o ElementTree aplica aos valores de atributos
+    return (_escapar_texto(valor).replace('"', "&quot;").replace("\r", "&#13;")
+            .replace("\n", "&#10;").replace("\t", "&#09;"))
+
+def _posicoes(afd: AFD, estados: list, layout: str) -> list:
+    """
+    calcula as coordenadas (x, y) de cada estado, na mesma ordem de 'estados'
+
+    - linha: todos os estados lado a lado (layout original)
+    - grade: os estados preenchem uma grade quase quadrada, linha por linha
+    - camadas: cada coluna e uma camada da busca em largura a partir do estado
+               inicial; estados inalcancaveis ficam em uma ultima coluna
+    """
+    if layout == "linha":
+        return [(100 + i * ESPACAMENTO, 200) for i in range(len(estados))]
+
+    if layout == "grade":
+        colunas = max(1, int(len(estados) ** 0.5 + 0.999))
+        return [(100 + (i % colunas) * ESPACAMENTO, 100 + (i // colunas) * ESPACAMENTO)
+                for i in range(len(estados))]
+
+    # camadas: profundidade de cada estado na busca em largura
+    sucessores = {}
+    for origem, _, destino in afd.transicoes():
+        sucessores.setdefault(origem, []).append(destino)
+    profundidade = {afd.estado_inicial: 0}
+    fila = [afd.estado_inicial]
+    for estado in fila:
+        for destino in sucessores.get(estado, ()):
+            if destino not in profundidade:
+                profundidade[destino] = profundidade[estado] + 1
+                fila.append(destino)
+    ultima = max(profundidade.values(), default=-1) + 1
+
+    ocupacao = {}
+    posicoes = []
+    for estado in estados:
+        camada = profundidade.get(estado, ultima)
+        linha = ocupacao.get(camada, 0)
+        ocupacao[camada] = linha + 1
+        posicoes.append((100 + camada * ESPACAMENTO * 2, 100 + linha * ESPACAMENTO))
+    return posicoes
+
+def salvar_afd_jflap(afd: AFD, caminho_saida: str, layout: str = "linha"):
     """
     salva o AFD em formato JFLAP (.jff).
+
+    o XML e escrito de forma incremental em um arquivo com buffer, sem montar a
+    arvore na memoria. com o layout "linha" o arquivo gerado e identico ao que o
+    ElementTree produzia, a menos da ordem das transicoes (agora por estado)
+
+    argumentos:
+        afd (AFD): o automato a ser salvo
+        caminho_saida (str): caminho do arquivo .jff
+        layout (str): posicionamento dos estados, um de LAYOUTS
     """
-    structure = ET.Element("structure")
-    ET.SubElement(structure, "type").text = "fa"
-    automaton = ET.SubElement(structure, "automaton")
+    if layout not in LAYOUTS:
+        raise ValueError(f"Layout invalido: '{layout}'. Use um de {LAYOUTS}")
 
+    estados = sorted(afd.nomes_estados())
+    posicoes = _posicoes(afd, estados, layout)
     id_map = {}
-    for i, estado in enumerate(sorted(afd.estados)):
-        st_el = ET.SubElement(automaton, "state", id=str(i), name=estado)
-        ET.SubElement(st_el, "x").text = str(100 + i * 100)
-        ET.SubElement(st_el, "y").text = "200"
-        id_map[estado] = str(i)
-
-        if estado == afd.estado_inicial:
-            ET.SubElement(st_el, "initial")
-        if estado in afd.estados_aceitacao:
-            ET.SubElement(st_el, "final")
-
-    for (origem, simbolo), destino in afd.func_transicao.items():
-        tr_el = ET.SubElement(automaton, "transition")
-        ET.SubElement(tr_el, "from").text = id_map[origem]
-        ET.SubElement(tr_el, "to").text = id_map[destino]
-        # grava string vazia para epsilon (se EPSILON == '')
-        ET.SubElement(tr_el, "read").text = (simbolo if simbolo is not None else "")
-
-    tree = ET.ElementTree(structure)
-    tree.write(caminho_saida, encoding="utf-8", xml_declaration=True)
\ No newline at end of file
+
+    with open(caminho_saida, "w", encoding="utf-8", newline="", buffering=1 << 20) as arquivo:
+        escrever = arquivo.write
+        escrever("<?xml version='1.0' encoding='utf-8'?>\n")
+        escrever("<structure><type>fa</type><automaton>")
+
+        for i, estado in enumerate(estados):
+            id_map[estado] = str(i)
+            x, y = posicoes[i]
+            partes = [f'<state id="{i}" name="{_escapar_atributo(estado)}"><x>{x}</x><y>{y}</y>']
+            if estado == afd.estado_inicial:
+                partes.append("<initial />")
+            if estado in afd.estados_aceitacao:
+                partes.append("<final />")
+            partes.append("</state>")
+            escrever("".join(partes))
+
+        for origem, simbolo, destino in afd.transicoes():
+            # grava string vazia para epsilon (se EPSILON == '')
+            if simbolo:
+                leitura = f"<read>{_escapar_texto(simbolo)}</read>"
+            else:
+                leitura = "<read />"
+            escrever(f"<transition><from>{id_map[origem]}</from><to>{id_map[destino]}</to>{leitura}</transition>")
+
+        escrever("</automaton></structure>")
+
+def salvar_afn_jflap(afn: AFN, caminho_saida: str):
+    """
+    salva o AFN em formato JFLAP (.jff), no mesmo estilo incremental de salvar_afd_jflap.
+    cada destino de delta(estado, simbolo) vira uma <transition>; epsilon e gravado como <read />
+    """
+    estados = afn.nomes_estados()
+    id_map = {}
+
+    with open(caminho_saida, "w", encoding="utf-8", newline="", buffering=1 << 20) as arquivo:
+        escrever = arquivo.write
+        escrever("<?xml version='1.0' encoding='utf-8'?>\n")
+        escrever("<structure><type>fa</type><automaton>")
+
+        for i, estado in enumerate(estados):
+            id_map[estado] = str(i)
+            partes = [f'<state id="{i}" name="{_escapar_atributo(estado)}"><x>{100 + i * ESPACAMENTO}</x><y>200</y>']
+            if estado == afn.estado_inicial:
+                partes.append("<initial />")
+            if estado in afn.estados_aceitacao:
+                partes.append("<final />")
+            partes.append("</state>")
+            escrever("".join(partes))
+
+        for origem, simbolo, destinos in afn.transicoes():
+            leitura = f"<read>{_escapar_texto(simbolo)}</read>" if simbolo else "<read />"
+            for destino in sorted(destinos):
+                escrever(f"<transition><from>{id_map[origem]}</from><to>{id_map[destino]}</to>{leitura}</transition>")
+
+        escrever("</automaton></structure>")
@@ -0,0 +1,186 @@
+import argparse
+import glob
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from conversor import conversor_afn_para_afd
+from io_jflap import LAYOUTS, carregar_afn_jflap, salvar_afd_jflap
+from io_binario import salvar_afd_binario
+
+"""
+modo nao interativo (lote) do conversor: converte varios arquivos .jff em paralelo
+
+exemplo:
+    python3 main.py entradas/ outros/*.jff --saida convertidos --jobs 8 --json resumo.json
+"""
+
+def expandir_entradas(entradas: list) -> list:
+    """
+    transforma a lista de entradas (arquivos, diretorios ou padroes glob) na lista
+    ordenada e sem repeticoes dos arquivos .jff a converter
+    """
+    arquivos = []
+    for entrada in entradas:
+        if os.path.isdir(entrada):
+            # ignora as saidas de execucoes anteriores gravadas no mesmo diretorio
+            arquivos.extend(caminho for caminho in glob.glob(os.path.join(entrada, "*.jff"))
+                            if not caminho.endswith("-afd.jff"))
+        elif glob.has_magic(entrada):
+            arquivos.extend(glob.glob(entrada, recursive=True))
+        else:
+            arquivos.append(entrada)
+    return sorted(set(arquivos))
+
+def caminho_de_saida(caminho_entrada: str, diretorio_saida, formato: str, raiz: str = None) -> str:
+    """
+    entrada.jff -> <diretorio_saida>/entrada-afd.jff (ou .afdb); sem diretorio de
+    saida, o arquivo fica ao lado da entrada. com raiz, o caminho da entrada relativo
+    a ela e mantido dentro do diretorio de saida (a/x.jff e b/x.jff nao colidem)
+    """
+    base = os.path.splitext(os.path.basename(caminho_entrada))[0]
+    if not diretorio_saida:
+        diretorio = os.path.dirname(caminho_entrada)
+    elif raiz is None:
+        diretorio = diretorio_saida
+    else:
+        relativo = os.path.relpath(os.path.dirname(os.path.abspath(caminho_entrada)), raiz)
+        diretorio = os.path.normpath(os.path.join(diretorio_saida, relativo))
+    return os.path.join(diretorio, f"{base}-afd.{formato}")
+
+def raiz_comum(arquivos: list) -> str:
+    # diretorio comum a todas as entradas, a partir do qual a estrutura e mantida na saida
+    return os.path.commonpath([os.path.dirname(os.path.abspath(arquivo)) for arquivo in arquivos])
+
+def converter_arquivo(caminho_entrada: str, caminho_saida: str, minimizar: bool = False,
+                      layout: str = "linha") -> dict:
+    """
+    executa carregar_afn_jflap -> conversor_afn_para_afd -> salvar em um unico arquivo.
+    roda dentro dos processos do pool, entao nunca propaga excecoes: o erro vai no resultado
+
+    retorno:
+        dict: arquivo, saida, ok, erro, quantidade de estados e tempos de cada etapa (s)
+    """
+    resultado = {"arquivo": caminho_entrada, "saida": caminho_saida, "ok": False, "erro": None}
+    inicio = time.perf_counter()
+    try:
+        # o logging nao e configurado no modo lote, entao a conversao nao imprime nada
+        t0 = time.perf_counter()
+        afn = carregar_afn_jflap(caminho_entrada)
+        t1 = time.perf_counter()
+        afd = conversor_afn_para_afd(afn, modo="bitset", minimizar=minimizar)
+        t2 = time.perf_counter()
+        if caminho_saida.endswith(".afdb"):
+            salvar_afd_binario(afd, caminho_saida)
+        else:
+            salvar_afd_jflap(afd, caminho_saida, layout=layout)
+        t3 = time.perf_counter()
+
+        resultado.update({
+            "ok": True,
+            "estados_afn": afn.quantidade_estados,
+            "estados_afd": afd.quantidade_estados,
+            "transicoes_afd": afd.quantidade_transicoes,
+            "tempo_carregar": t1 - t0,
+            "tempo_converter": t2 - t1,
+            "tempo_salvar": t3 - t2,
+        })
+    except Exception as e:
+        resultado["erro"] = f"{type(e).__name__}: {e}"
+    resultado["tempo_total"] = time.perf_counter() - inicio
+    return resultado
+
+def criar_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="main.py",
+        description="Converte arquivos JFLAP (.jff) de AFN para AFD em lote. "
+                    "Sem argumentos, o main.py abre o menu interativo."
+    )
+    parser.add_argument("entradas", nargs="+",
+                        help="arquivos .jff, diretorios ou padroes glob (ex.: 'afns/*.jff')")
+    parser.add_argument("-o", "--saida", default=None,
+                        help="diretorio de saida (padrao: o diretorio de cada entrada)")
+    parser.add_argument("-j", "--jobs", type=int, default=os.cpu_count() or 1,
+                        help="quantidade de processos em paralelo (padrao: numero de CPUs)")
+    parser.add_argument("--formato", choices=("jff", "afdb"), default="jff",
+                        help="formato dos arquivos de saida")
+    parser.add_argument("--layout", choices=LAYOUTS, default="linha",
+                        help="posicionamento dos estados nos arquivos .jff")
+    parser.add_argument("--minimizar", action="store_true",
+                        help="minimiza cada AFD gerado (Hopcroft)")
+    parser.add_argument("--json", default=None,
+                        help="grava o resumo em JSON neste arquivo ('-' para a saida padrao)")
+    return parser
+
+def main(argv=None) -> int:
+    """
+    ponto de entrada do modo lote
+
+    retorno:
+        int: codigo de saida do processo (0 se todos os arquivos foram convertidos)
+    """
+    args = criar_parser().parse_args(argv)
+    arquivos = expandir_entradas(args.entradas)
+    if not arquivos:
+        print("Nenhum arquivo .jff encontrado.")
+        return 1
+
+    inicio = time.perf_counter()
+    raiz = raiz_comum(arquivos) if args.saida else None
+    tarefas = [(arquivo, caminho_de_saida(arquivo, args.saida, args.formato, raiz)) for arquivo in arquivos]
+    # ainda podem colidir entradas do mesmo diretorio com o mesmo nome e extensoes diferentes
+    saidas = {}
+    for entrada, saida in tarefas:
+        if saida in saidas:
+            print(f"Erro: '{saidas[saida]}' e '{entrada}' seriam gravados no mesmo arquivo '{saida}'.")
+            return 1
+        saidas[saida] = entrada
+    if args.saida:
+        for diretorio in {os.path.dirname(saida) for saida in saidas}:
+            os.makedirs(diretorio, exist_ok=True)
+    jobs = max(1, min(args.jobs, len(tarefas)))
+    resumo_texto = args.json != "-"
+
+    resultados = []
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        futuros = [pool.submit(converter_arquivo, entrada, saida, args.minimizar, args.layout)
+                   for entrada, saida in tarefas]
+        # os resultados sao mostrados na ordem dos arquivos
+        for (entrada, saida), futuro in zip(tarefas, futuros):
+            try:
+                resultado = futuro.result()
+            except Exception as e:
+                # o processo que convertia o arquivo morreu (BrokenProcessPool, por
+                # exemplo por falta de memoria) ou o resultado nao voltou do pool
+                resultado = {"arquivo": entrada, "saida": saida, "ok": False,
+                             "erro": f"{type(e).__name__}: {e}"}
+            resultados.append(resultado)
+            if not resumo_texto:
+                continue
+            if resultado["ok"]:
+                print(f"[ok]    {resultado['arquivo']} -> {resultado['saida']} "
+                      f"({resultado['estados_afn']} -> {resultado['estados_afd']} estados, "
+                      f"{resultado['tempo_total']:.3f}s)")
+            else:
+                print(f"[falha] {resultado['arquivo']}: {resultado['erro']}")
+
+    falhas = sum(1 for resultado in resultados if not resultado["ok"])
+    resumo = {
+        "arquivos": resultados,
+        "total": len(resultados),
+        "convertidos": len(resultados) - falhas,
+        "falhas": falhas,
+        "jobs": jobs,
+        "tempo_total": time.perf_counter() - inicio,
+    }
+
+    if resumo_texto:
+        print(f"\n{resumo['convertidos']}/{resumo['total']} arquivos convertidos "
+              f"em {resumo['tempo_total']:.3f}s com {jobs} processo(s).")
+    if args.json == "-":
+        print(json.dumps(resumo, indent=2, ensure_ascii=False))
+    elif args.json:
+        with open(args.json, "w", encoding="utf-8") as arquivo:
+            json.dump(resumo, arquivo, indent=2, ensure_ascii=False)
+
+    return 1 if falhas else 0
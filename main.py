@@ -1,42 +1,20 @@
 # em main.py
-import xml.etree.ElementTree as ET
+import logging
+import sys
 from afn import AFN, EPSILON
 from conversor import conversor_afn_para_afd
 from io_jflap import carregar_afn_jflap, salvar_afd_jflap
+from io_binario import carregar_afd_binario, salvar_afd_binario
 
-def afn_jflap(caminho_arquivo: str) -> AFN:
-    tree = ET.parse(caminho_arquivo)
-    root = tree.getroot()
-
-    estados = set()
-    alfabeto = set()
-    func_transicao = {}
-    estado_inicial = None
-    estados_aceitacao = set()
-
-    for state in root.findall(".//state"):
-        nome = state.get("name")
-        estados.add(nome)
-        if state.find("initial") is not None:
-            estado_inicial = nome
-        if state.find("final") is not None:
-            estados_aceitacao.add(nome)
-
-    for trans in root.findall(".//transition"):
-        origem = root.findtext(".//state[@id='" + trans.findtext('from') + "']").get("name")
-        destino = root.findtext(".//state[@id='" + trans.findtext('to') + "']").get("name")
-        simbolo = trans.findtext("read") or "ε"
-
-        alfabeto.add(simbolo)
-        func_transicao.setdefault((origem, simbolo), set()).add(destino)
-
-    return AFN(
-        estados = estados,
-        alfabeto = alfabeto - {EPSILON},
-        func_transicao = func_transicao,
-        estado_inicial = estado_inicial,
-        estados_aceitacao = estados_aceitacao
-    )
+def salvar_afd(afd, caminho_saida: str):
+    """
+    salva o AFD no formato escolhido pela extensao: binario compacto para '.afdb'
+    (pode ser recarregado pela opcao 3 sem refazer a conversao) e JFLAP nos demais casos
+    """
+    if caminho_saida.lower().endswith(".afdb"):
+        salvar_afd_binario(afd, caminho_saida)
+    else:
+        salvar_afd_jflap(afd, caminho_saida)
 
 def obter_definicao_afn_usuario():
     """
@@ -147,6 +125,8 @@ def obter_definicao_afn_usuario():
 
 # --- Função Principal ---
 def main():
+    # exibe no terminal as mensagens informativas da conversao
+    logging.basicConfig(level=logging.INFO, format="%(message)s", stream=sys.stdout)
     try:
         print("==============================")
         print("   Conversor AFN para AFD ")
@@ -154,28 +134,36 @@ def main():
         print("Escolha uma opcao:")
         print("  1 - Digitar AFN (entrada via prompt)")
         print("  2 - Ler AFN de arquivo JFLAP (.jff)")
-        escolha = input("Opção (1 ou 2): ").strip()
+        print("  3 - Carregar AFD ja convertido (.afdb)")
+        escolha = input("Opção (1, 2 ou 3): ").strip()
 
         if escolha == '1':
             afn = obter_definicao_afn_usuario()
-            afd_convertido = conversor_afn_para_afd(afn)
+            minimizar = input("Deseja minimizar o AFD gerado? (s/n): ").strip().lower() == 's'
+            afd_convertido = conversor_afn_para_afd(afn, minimizar=minimizar)
 
             # gera ou nao uma saida jflap
             salvar = input("Deseja salvar o AFD gerado em arquivo .jff? (s/n): ").strip().lower()
             if salvar == 's':
-                caminho_saida = input("Caminho do arquivo de saida (.jff): ").strip()
-                salvar_afd_jflap(afd_convertido, caminho_saida)
+                caminho_saida = input("Caminho do arquivo de saida (.jff ou .afdb): ").strip()
+                salvar_afd(afd_convertido, caminho_saida)
                 print(f"AFD salvo em: {caminho_saida}")
 
         elif escolha == '2':
             caminho_entrada = input("Caminho do arquivo .jff (AFN): ").strip()
-            caminho_saida = input("Caminho do arquivo de saida .jff (AFD): ").strip()
+            caminho_saida = input("Caminho do arquivo de saida .jff ou .afdb (AFD): ").strip()
+            minimizar = input("Deseja minimizar o AFD gerado? (s/n): ").strip().lower() == 's'
 
             afn = carregar_afn_jflap(caminho_entrada)
-            afd_convertido = conversor_afn_para_afd(afn)
-            salvar_afd_jflap(afd_convertido, caminho_saida)
+            afd_convertido = conversor_afn_para_afd(afn, minimizar=minimizar)
+            salvar_afd(afd_convertido, caminho_saida)
             print(f"Conversao concluida. O AFD foi salvo no arquivo: {caminho_saida}")
 
+        elif escolha == '3':
+            caminho_entrada = input("Caminho do arquivo .afdb (AFD): ").strip()
+            with carregar_afd_binario(caminho_entrada) as afd_binario:
+                afd_convertido = afd_binario.para_afd()
+
         else:
             print("Opcao invalida.")
             return
@@ -184,12 +172,16 @@ def main():
         print("\n--- AFD Equivalente ---")
         afd_convertido.imprimir()
 
+        # o AFD minimo (ou um .afdb salvo a partir dele) nao tem o estado morto: os testes
+        # usam uma copia com sumidouro explicito, para que as rejeicoes comuns nao
+        # aparecam como transicao indefinida
+        afd_teste = afd_convertido.completar()
         print("\nTeste aqui as cadeias no AFD equivalente (digite 'sair' para encerrar):")
         while True:
             cadeia = input("Cadeia: ").strip()
             if cadeia.lower() == 'sair':
                 break
-            resultado = afd_convertido.processar_cadeia(cadeia)
+            resultado = afd_teste.processar_cadeia(cadeia)
             print("ACEITA" if resultado else "REJEITA")
 
     # tratamento de erro (para identificar melhor)
@@ -200,4 +192,8 @@ def main():
 
 # Ponto de entrada do script
 if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        # com argumentos: modo lote, sem menu interativo (ver lote.py)
+        import lote
+        sys.exit(lote.main(sys.argv[1:]))
     main()
\ No newline at end of file
@@ -0,0 +1,299 @@
+import argparse
+import asyncio
+import json
+import logging
+import os
+import sys
+import time
+from conversor import conversor_afn_para_afd
+from io_jflap import carregar_afn_jflap
+from io_binario import carregar_afd_binario
+
+"""
+servidor local de casamento de cadeias: carrega um ou mais AFDs uma unica vez e
+responde pedidos de varios clientes ao mesmo tempo (asyncio), por socket unix ou
+TCP em localhost
+
+exemplo:
+    python3 servidor.py binario=afns/binario.jff outro.afdb --unix /tmp/conversor.sock
+    python3 servidor.py afns/*.jff --porta 7070
+
+protocolo (texto utf-8, uma linha por comando; as respostas saem na ordem dos
+pedidos, entao o cliente pode enviar varios pedidos sem esperar as respostas):
+    M <automato> <cadeia>   -> "1" se a cadeia e aceita, "0" se nao
+    B <automato> <n>        -> seguido de n linhas, uma cadeia por linha; a resposta
+                               e uma unica linha com n caracteres "1"/"0"
+    L                       -> nomes dos automatos carregados, separados por espaco
+    S                       -> estatisticas de cada automato, em JSON (uma linha)
+    erros sao respondidos com "E <mensagem>"
+
+linhas maiores que o limite (--limite-linha) sao descartadas ate o fim e
+respondidas com "E linha longa demais", sem fechar a conexao. um lote com mais de
+--max-lote cadeias tem as linhas descartadas sem serem guardadas e recebe um erro
+"""
+
+logger = logging.getLogger(__name__)
+
+# cadeias testadas entre duas devolucoes do controle ao laco de eventos em um lote,
+# para que um lote grande nao segure os demais clientes
+TAMANHO_FATIA_LOTE = 1000
+# tamanho maximo de uma linha do protocolo em bytes (o padrao do asyncio)
+LIMITE_LINHA = 64 * 1024
+# quantidade maxima de cadeias em um comando B
+MAX_LOTE = 100_000
+
+class EstatisticasAutomato:
+    """
+    contadores de uso de um automato no servidor
+
+    atributos:
+        requisicoes: comandos M e B atendidos
+        cadeias / aceitas: cadeias testadas e quantas foram aceitas
+        simbolos: total de simbolos lidos
+        tempo_casamento: segundos gastos testando cadeias
+        latencia_maxima: maior tempo de casamento de uma requisicao (s)
+    """
+    def __init__(self):
+        self.requisicoes = 0
+        self.cadeias = 0
+        self.aceitas = 0
+        self.simbolos = 0
+        self.tempo_casamento = 0.0
+        self.latencia_maxima = 0.0
+
+    def registrar(self, cadeias: list, aceitas: int, tempo: float):
+        self.requisicoes += 1
+        self.cadeias += len(cadeias)
+        self.aceitas += aceitas
+        self.simbolos += sum(len(cadeia) for cadeia in cadeias)
+        self.tempo_casamento += tempo
+        if tempo > self.latencia_maxima:
+            self.latencia_maxima = tempo
+
+    def como_dict(self) -> dict:
+        dados = dict(vars(self))
+        dados["latencia_media"] = self.tempo_casamento / self.requisicoes if self.requisicoes else 0.0
+        dados["cadeias_por_segundo"] = self.cadeias / self.tempo_casamento if self.tempo_casamento else 0.0
+        return dados
+
+
+def carregar_automato(caminho: str, minimizar: bool = False):
+    """
+    prepara um automato para o servidor: .afdb e aberto direto (mmap) e .jff passa
+    pela conversao (modo bitset) e pela compilacao em tabela
+
+    retorno:
+        objeto com o metodo aceita(cadeia) -> bool (TabelaAFD ou AFDBinario)
+    """
+    if caminho.lower().endswith(".afdb"):
+        return carregar_afd_binario(caminho)
+    afn = carregar_afn_jflap(caminho)
+    return conversor_afn_para_afd(afn, modo="bitset", minimizar=minimizar).compilar()
+
+def nome_e_caminho(entrada: str) -> tuple:
+    # "nome=caminho" ou apenas "caminho" (o nome e o arquivo sem a extensao)
+    if "=" in entrada:
+        nome, caminho = entrada.split("=", 1)
+        return nome, caminho
+    return os.path.splitext(os.path.basename(entrada))[0], entrada
+
+
+class ServidorCasamento:
+    """
+    atende os comandos do protocolo (ver o inicio deste modulo) sobre os automatos
+    recebidos. cada conexao e lida linha a linha e respondida na mesma ordem; o
+    casamento usa as tabelas ja compiladas, entao nenhum pedido refaz a conversao
+
+    argumentos:
+        automatos (dict): nome -> objeto com aceita(cadeia) (ver carregar_automato)
+        limite_linha (int): tamanho maximo de uma linha, em bytes
+        max_lote (int): quantidade maxima de cadeias em um comando B
+    """
+    def __init__(self, automatos: dict, limite_linha: int = LIMITE_LINHA, max_lote: int = MAX_LOTE):
+        self.automatos = automatos
+        self.limite_linha = limite_linha
+        self.max_lote = max_lote
+        self.estatisticas_automatos = {nome: EstatisticasAutomato() for nome in automatos}
+        self.conexoes = 0
+        self.conexoes_abertas = 0
+        self._inicio = time.perf_counter()
+
+    def estatisticas(self) -> dict:
+        return {
+            "tempo_ativo": time.perf_counter() - self._inicio,
+            "conexoes": self.conexoes,
+            "conexoes_abertas": self.conexoes_abertas,
+            "automatos": {nome: estatisticas.como_dict()
+                          for nome, estatisticas in self.estatisticas_automatos.items()},
+        }
+
+    async def _casar(self, nome: str, cadeias: list) -> str:
+        # testa as cadeias no automato, em fatias, e devolve a resposta "1"/"0"
+        aceita = self.automatos[nome].aceita
+        inicio = time.perf_counter()
+        partes = []
+        for i in range(0, len(cadeias), TAMANHO_FATIA_LOTE):
+            if i:
+                await asyncio.sleep(0)
+            partes.append("".join("1" if aceita(cadeia) else "0"
+                                  for cadeia in cadeias[i:i + TAMANHO_FATIA_LOTE]))
+        resposta = "".join(partes)
+        self.estatisticas_automatos[nome].registrar(cadeias, resposta.count("1"),
+                                                   time.perf_counter() - inicio)
+        return resposta
+
+    @staticmethod
+    async def _ler_linha(leitor: asyncio.StreamReader):
+        """
+        le uma linha inteira (com o \\n). diferente de readline(), uma linha maior que o
+        limite do leitor e consumida ate o fim, para que o restante dela nao seja
+        lido como um novo comando
+
+        retorno:
+            bytes: a linha (b"" no fim da conexao), ou None se ela passou do limite
+        """
+        try:
+            return await leitor.readuntil(b"\n")
+        except asyncio.IncompleteReadError as e:
+            # conexao fechada: devolve o que sobrou, como readline()
+            return e.partial
+        except asyncio.LimitOverrunError as e:
+            consumidos = e.consumed
+        while True:
+            await leitor.readexactly(consumidos)
+            try:
+                await leitor.readuntil(b"\n")
+                return None
+            except asyncio.IncompleteReadError:
+                return None
+            except asyncio.LimitOverrunError as e:
+                consumidos = e.consumed
+
+    async def _responder(self, linha: str, leitor: asyncio.StreamReader) -> str:
+        comando, _, resto = linha.partition(" ")
+        if comando == "M":
+            nome, _, cadeia = resto.partition(" ")
+            if nome not in self.automatos:
+                return f"E automato desconhecido: {nome}"
+            return await self._casar(nome, [cadeia])
+
+        if comando == "B":
+            nome, _, quantidade = resto.partition(" ")
+            try:
+                quantidade = int(quantidade)
+            except ValueError:
+                return "E quantidade invalida"
+            # as n linhas do lote sao lidas mesmo com erro, para nao virarem comandos;
+            # acima de max_lote elas sao apenas descartadas
+            guardar = quantidade <= self.max_lote
+            cadeias = []
+            linha_longa = False
+            for _ in range(max(quantidade, 0)):
+                dados = await self._ler_linha(leitor)
+                if dados is None:
+                    linha_longa = True
+                    continue
+                if not dados:
+                    break
+                if guardar:
+                    cadeias.append(dados.decode("utf-8", errors="replace").rstrip("\r\n"))
+            if not guardar:
+                return f"E lote maior que o maximo de {self.max_lote} cadeias"
+            if linha_longa:
+                return "E linha longa demais"
+            if nome not in self.automatos:
+                return f"E automato desconhecido: {nome}"
+            return await self._casar(nome, cadeias)
+
+        if comando == "L":
+            return " ".join(sorted(self.automatos))
+        if comando == "S":
+            return json.dumps(self.estatisticas(), ensure_ascii=False)
+        return f"E comando desconhecido: {comando}"
+
+    async def atender(self, leitor: asyncio.StreamReader, escritor: asyncio.StreamWriter):
+        # trata uma conexao ate o cliente fechar
+        self.conexoes += 1
+        self.conexoes_abertas += 1
+        try:
+            while True:
+                dados = await self._ler_linha(leitor)
+                if dados is None:
+                    resposta = "E linha longa demais"
+                else:
+                    if not dados:
+                        break
+                    linha = dados.decode("utf-8", errors="replace").rstrip("\r\n")
+                    if not linha:
+                        continue
+                    resposta = await self._responder(linha, leitor)
+                escritor.write(resposta.encode("utf-8") + b"\n")
+                await escritor.drain()
+        except ConnectionResetError:
+            pass
+        finally:
+            self.conexoes_abertas -= 1
+            escritor.close()
+
+    async def iniciar(self, host: str = "127.0.0.1", porta: int = 7070, unix: str = None):
+        """
+        abre o servidor (socket unix se 'unix' for dado, senao TCP em host:porta)
+
+        retorno:
+            asyncio.Server: o servidor ja escutando
+        """
+        if unix:
+            servidor = await asyncio.start_unix_server(self.atender, path=unix, limit=self.limite_linha)
+            logger.info("Servidor ouvindo em %s", unix)
+        else:
+            servidor = await asyncio.start_server(self.atender, host, porta, limit=self.limite_linha)
+            logger.info("Servidor ouvindo em %s:%d", host, porta)
+        return servidor
+
+
+def criar_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        description="Servidor local que testa cadeias em AFDs carregados uma unica vez."
+    )
+    parser.add_argument("automatos", nargs="+",
+                        help="arquivos .jff (AFN, convertido ao iniciar) ou .afdb, "
+                             "opcionalmente como nome=caminho")
+    parser.add_argument("--host", default="127.0.0.1", help="endereco TCP (padrao: 127.0.0.1)")
+    parser.add_argument("--porta", type=int, default=7070, help="porta TCP (padrao: 7070)")
+    parser.add_argument("--unix", default=None, help="caminho de um socket unix (em vez de TCP)")
+    parser.add_argument("--minimizar", action="store_true",
+                        help="minimiza os AFDs convertidos a partir de .jff")
+    parser.add_argument("--limite-linha", type=int, default=LIMITE_LINHA,
+                        help=f"tamanho maximo de uma linha em bytes (padrao: {LIMITE_LINHA})")
+    parser.add_argument("--max-lote", type=int, default=MAX_LOTE,
+                        help=f"quantidade maxima de cadeias em um comando B (padrao: {MAX_LOTE})")
+    return parser
+
+async def _executar(args):
+    automatos = {}
+    for entrada in args.automatos:
+        nome, caminho = nome_e_caminho(entrada)
+        inicio = time.perf_counter()
+        automatos[nome] = carregar_automato(caminho, args.minimizar)
+        logger.info("Automato '%s' carregado de %s em %.3fs", nome, caminho, time.perf_counter() - inicio)
+
+    servidor = await ServidorCasamento(automatos, args.limite_linha, args.max_lote).iniciar(
+        args.host, args.porta, args.unix
+    )
+    async with servidor:
+        await servidor.serve_forever()
+
+def main(argv=None) -> int:
+    logging.basicConfig(level=logging.INFO, format="%(message)s", stream=sys.stdout)
+    args = criar_parser().parse_args(argv)
+    try:
+        asyncio.run(_executar(args))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if args.unix and os.path.exists(args.unix):
+            os.remove(args.unix)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
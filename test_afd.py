@@ -0,0 +1,285 @@
+import contextlib
+import io
+import random
+import unittest
+from afd import AFD
+from test_conversor import cadeias, gerar_afd, linguagem
+
+"""
+testes do AFD: a tabela compilada (processar_lote, processar_fluxo) contra
+processar_cadeia, as classes de simbolos, as alteracoes no lugar contra um dict
+modelo, e a minimizacao e os produtos contra a enumeracao de cadeias
+
+    python3 -m unittest test_afd
+"""
+
+def processar_sem_mensagens(afd: AFD, cadeia: str) -> bool:
+    with contextlib.redirect_stdout(io.StringIO()):
+        return afd.processar_cadeia(cadeia)
+
+
+class TesteTabelaAFD(unittest.TestCase):
+    def test_lote_igual_processar_cadeia(self):
+        # 'x' e 'd' nunca estao no alfabeto e parte dos AFDs nao usa todo o "abc"
+        gerador = random.Random(10)
+        todas = cadeias("abcx", 4) + ["d", "ad", "aaaaaaaaax"]
+        for _ in range(100):
+            afd = gerar_afd(gerador)
+            self.assertEqual(afd.processar_lote(todas),
+                             [processar_sem_mensagens(afd, cadeia) for cadeia in todas])
+
+    def test_simbolo_desconhecido_rejeita(self):
+        afd = AFD({"e0"}, {"a"}, {("e0", "a"): "e0"}, "e0", {"e0"})
+        self.assertEqual(afd.processar_lote(["", "aaa", "b", "aab", "ba"]), [True, True, False, False, False])
+        saida = io.StringIO()
+        with contextlib.redirect_stdout(saida):
+            self.assertFalse(afd.processar_cadeia("ab"))
+        self.assertIn("b", saida.getvalue())
+
+    def test_processar_fluxo(self):
+        afd = AFD({"e0", "e1"}, {"a", "b"}, {("e0", "a"): "e1", ("e1", "b"): "e0"}, "e0", {"e0"})
+        arquivo = io.StringIO("ab\nabab\r\na\n\nabx\nab")
+        resultados = afd.processar_fluxo(arquivo)
+        # gerador: nada e lido antes do primeiro resultado ser pedido
+        self.assertEqual(arquivo.tell(), 0)
+        self.assertEqual(list(resultados), [True, True, False, True, False, True])
+
+    def test_alteracao_descarta_a_tabela(self):
+        afd = AFD({"e0", "e1"}, {"a"}, {("e0", "a"): "e1"}, "e0", {"e1"})
+        tabela = afd.compilar()
+        self.assertIs(afd.compilar(), tabela)
+        self.assertEqual(afd.processar_lote(["a", "aa"]), [True, False])
+        afd.definir_transicao("e1", "a", "e1")
+        self.assertIsNot(afd.compilar(), tabela)
+        self.assertEqual(afd.processar_lote(["a", "aa"]), [True, True])
+        afd.func_transicao[("e1", "a")] = "e0"
+        self.assertEqual(afd.processar_lote(["a", "aa", "aaa"]), [True, False, True])
+
+
+class TesteRepresentacao(unittest.TestCase):
+    def test_leitura_nao_monta_as_visoes(self):
+        gerador = random.Random(23)
+        for _ in range(30):
+            afd = gerar_afd(gerador)
+            esperado = (sorted(afd.estados), sorted((origem, simbolo, destino)
+                                                    for (origem, simbolo), destino in afd.func_transicao.items()))
+            copia = AFD(set(afd.estados), set(afd.alfabeto), dict(afd.func_transicao),
+                        afd.estado_inicial, set(afd.estados_aceitacao))
+            with contextlib.redirect_stdout(io.StringIO()) as saida:
+                copia.imprimir()
+                copia.processar_cadeia("abc")
+            self.assertEqual((sorted(copia.nomes_estados()), sorted(copia.transicoes())), esperado)
+            self.assertIsNone(copia._estados)
+            self.assertIsNone(copia._func_transicao)
+            self.assertEqual(saida.getvalue().count("δ("), len(esperado[1]))
+
+    def test_mensagens_de_processar_cadeia(self):
+        afd = AFD({"e0", "e1"}, {"a", "b"}, {("e0", "a"): "e1"}, "e0", {"e1"})
+        saida = io.StringIO()
+        with contextlib.redirect_stdout(saida):
+            self.assertFalse(afd.processar_cadeia("ab"))
+        self.assertIn("'e1' com o símbolo 'b'", saida.getvalue())
+        # estado inicial fora do AFD: a primeira transicao ja e indefinida
+        afd = AFD({"e0"}, {"a"}, {("e0", "a"): "e0"}, "x", set())
+        saida = io.StringIO()
+        with contextlib.redirect_stdout(saida):
+            self.assertFalse(afd.processar_cadeia("a"))
+            self.assertFalse(afd.processar_cadeia(""))
+        self.assertIn("'x' com o símbolo 'a'", saida.getvalue())
+
+
+def afd_digitos_e_letras(letras: str = "abcdefghijklmnopqrstuvwxyz") -> AFD:
+    # aceita identificadores: uma letra seguida de letras ou digitos
+    func_transicao = {}
+    for letra in letras:
+        func_transicao[("inicio", letra)] = "nome"
+        func_transicao[("nome", letra)] = "nome"
+    for digito in "0123456789":
+        func_transicao[("nome", digito)] = "nome"
+    return AFD({"inicio", "nome"}, set(letras) | set("0123456789"), func_transicao, "inicio", {"nome"})
+
+
+class TesteClassesSimbolos(unittest.TestCase):
+    def test_colunas_iguais_viram_uma_classe(self):
+        afd = afd_digitos_e_letras()
+        self.assertEqual(afd.classes_simbolos(), [list("0123456789"), list("abcdefghijklmnopqrstuvwxyz")])
+        self.assertEqual(afd.quantidade_transicoes, 26 * 2 + 10)
+        self.assertEqual(len(afd.func_transicao), 26 * 2 + 10)
+        self.assertEqual(afd.processar_lote(["x1", "1x", "abc9", ""]), [True, False, True, False])
+
+    def test_simbolos_sem_transicao_ficam_juntos(self):
+        afd = AFD({"e0", "e1"}, {"a", "b", "c", "d"}, {("e0", "a"): "e1"}, "e0", {"e1"})
+        self.assertEqual(afd.classes_simbolos(), [["a"], ["b", "c", "d"]])
+        self.assertEqual(afd.processar_lote(["a", "b", "ad"]), [True, False, False])
+
+    def test_alfabeto_grande_nao_alarga_a_tabela(self):
+        letras = "".join(chr(codigo) for codigo in range(0x4E00, 0x4E00 + 5000))
+        afd = afd_digitos_e_letras(letras)
+        self.assertEqual(len(afd.classes_simbolos()), 2)
+        # duas linhas de duas colunas, mais a coluna dos simbolos fora do alfabeto
+        tabela = afd.compilar()
+        self.assertEqual([len(linha) for linha in tabela.linhas], [3, 3, 3])
+        self.assertEqual(tabela.coluna_fora, 2)
+        self.assertEqual(afd.processar_lote([letras[-1] + "7", "7", letras[:50]]), [True, False, True])
+
+    def test_argumento_classes(self):
+        # so o primeiro simbolo de cada classe precisa estar em func_transicao
+        afd = AFD({"e0", "e1"}, {"a", "b", "c", "x"},
+                  {("e0", "a"): "e1", ("e1", "a"): "e0", ("e1", "x"): "e1"}, "e0", {"e1"},
+                  classes=[["a", "b", "c"]])
+        self.assertEqual(afd.classes_simbolos(), [["a", "b", "c"], ["x"]])
+        self.assertEqual(afd.func_transicao[("e0", "c")], "e1")
+        self.assertEqual(afd.processar_lote(["b", "cx", "ab", "x"]), [True, True, False, False])
+
+    def test_definir_transicao_separa_a_classe(self):
+        afd = afd_digitos_e_letras()
+        afd.definir_transicao("nome", "7", None)
+        self.assertEqual(afd.classes_simbolos(),
+                         [list("012345689"), list("abcdefghijklmnopqrstuvwxyz"), ["7"]])
+        self.assertEqual(afd.processar_lote(["a6", "a7"]), [True, False])
+        # voltar ao comportamento antigo nao junta as colunas de novo, mas a linguagem e a mesma
+        afd.definir_transicao("nome", "7", "nome")
+        self.assertEqual(afd.equivalente(afd_digitos_e_letras()), (True, None))
+
+    def test_minimizar_e_produtos_mantem_as_classes(self):
+        afd = afd_digitos_e_letras()
+        self.assertEqual(afd.minimizar().classes_simbolos(), afd.classes_simbolos())
+        so_letras = AFD({"e0"}, set("abcdefghijklmnopqrstuvwxyz"),
+                        {("e0", letra): "e0" for letra in "abcdefghijklmnopqrstuvwxyz"}, "e0", {"e0"})
+        intersecao = afd.intersecao(so_letras)
+        self.assertEqual(len(intersecao.classes_simbolos()), 2)
+        self.assertEqual(intersecao.processar_lote(["abc", "ab1", ""]), [True, False, False])
+
+
+class TesteAlteracoes(unittest.TestCase):
+    def test_alteracoes_no_lugar(self):
+        # adicionar_estado / remover_estados / definir_transicoes contra um dict modelo
+        gerador = random.Random(6)
+        for _ in range(150):
+            simbolos = list("abcd")[:gerador.randint(1, 4)]
+            estados = [f"e{i}" for i in range(gerador.randint(1, 6))]
+            modelo = {(origem, simbolo): gerador.choice(estados)
+                      for origem in estados for simbolo in simbolos if gerador.random() < 0.6}
+            afd = AFD(set(estados), set(simbolos), modelo, "e0", set(estados[:1]))
+            existentes = set(estados)
+            proximo = 100
+            for _ in range(20):
+                operacao = gerador.random()
+                if operacao < 0.25:
+                    afd.adicionar_estado(f"e{proximo}")
+                    existentes.add(f"e{proximo}")
+                    proximo += 1
+                elif operacao < 0.4:
+                    candidatos = sorted(existentes - {"e0"})
+                    if candidatos:
+                        removido = gerador.choice(candidatos)
+                        afd.remover_estados([removido])
+                        existentes.discard(removido)
+                        modelo = {chave: destino for chave, destino in modelo.items()
+                                  if chave[0] != removido and destino != removido}
+                else:
+                    origem = gerador.choice(sorted(existentes))
+                    destino = gerador.choice(sorted(existentes) + [None])
+                    grupo = gerador.sample(simbolos, gerador.randint(1, len(simbolos)))
+                    afd.definir_transicoes(origem, grupo, destino)
+                    for simbolo in grupo:
+                        if destino is None:
+                            modelo.pop((origem, simbolo), None)
+                        else:
+                            modelo[(origem, simbolo)] = destino
+                self.assertEqual(afd.estados, existentes)
+                self.assertEqual(dict(afd.func_transicao), modelo)
+                referencia = AFD(set(existentes), set(simbolos), dict(modelo), "e0",
+                                 set(afd.estados_aceitacao))
+                self.assertEqual(afd.equivalente(referencia), (True, None))
+                cadeia = "".join(gerador.choice(simbolos) for _ in range(gerador.randint(0, 6)))
+                self.assertEqual(afd.compilar().aceita(cadeia), referencia.compilar().aceita(cadeia))
+
+    def test_linhas_livres_sao_reaproveitadas(self):
+        afd = AFD({"e0", "e1", "e2"}, {"a"}, {("e0", "a"): "e1", ("e1", "a"): "e2"}, "e0", {"e2"})
+        afd.remover_estados(["e2"])
+        self.assertEqual(afd.quantidade_estados, 2)
+        self.assertEqual(dict(afd.func_transicao), {("e0", "a"): "e1"})
+        linhas = len(afd.compilar().linhas)
+        afd.adicionar_estado("e3")
+        afd.definir_transicao("e1", "a", "e3")
+        afd.estados_aceitacao.add("e3")
+        self.assertEqual(len(afd.compilar().linhas), linhas)
+        self.assertEqual(afd.processar_lote(["aa", "a"]), [True, False])
+
+    def test_estado_desconhecido(self):
+        afd = AFD({"e0"}, {"a"}, {}, "e0", set())
+        with self.assertRaises(ValueError):
+            afd.definir_transicao("e0", "a", "e9")
+
+
+class TesteMinimizar(unittest.TestCase):
+    def test_minimizar(self):
+        # o minimo aceita as mesmas cadeias e tem um estado por classe de Myhill-Nerode
+        # (sem a classe morta); com ate 5 estados (mais o morto), prefixos de ate 4
+        # simbolos chegam em todos e sufixos de ate 4 simbolos separam as classes
+        gerador = random.Random(5)
+        for _ in range(150):
+            afd = gerar_afd(gerador)
+            alfabeto = "".join(sorted(afd.alfabeto))
+            minimo = afd.minimizar()
+            todas = cadeias(alfabeto, 6)
+            self.assertEqual(linguagem(minimo, todas), linguagem(afd, todas))
+
+            tabela = afd.compilar()
+            sufixos = cadeias(alfabeto, 4)
+            assinaturas = set()
+            for prefixo in cadeias(alfabeto, 4):
+                assinatura = tuple(tabela.aceita(prefixo + sufixo) for sufixo in sufixos)
+                if any(assinatura):
+                    assinaturas.add(assinatura)
+            self.assertEqual(len(minimo.estados), max(len(assinaturas), 1))
+
+    def test_minimo_nao_altera_o_original(self):
+        afd = AFD({"e0", "e1", "e2"}, {"a"}, {("e0", "a"): "e1", ("e1", "a"): "e2", ("e2", "a"): "e1"},
+                  "e0", {"e1", "e2"})
+        minimo = afd.minimizar()
+        self.assertEqual(minimo.quantidade_estados, 2)
+        self.assertEqual(afd.quantidade_estados, 3)
+        self.assertEqual(minimo.estados_aceitacao, {"e1"})
+
+
+class TesteProdutos(unittest.TestCase):
+    def test_produtos_e_equivalencia(self):
+        gerador = random.Random(4)
+        todas = cadeias("abc", 5)
+        for _ in range(150):
+            a, b = gerar_afd(gerador), gerar_afd(gerador)
+            em_a, em_b = linguagem(a, todas), linguagem(b, todas)
+            self.assertEqual(linguagem(a.intersecao(b), todas), [x and y for x, y in zip(em_a, em_b)])
+            self.assertEqual(linguagem(a.uniao(b), todas), [x or y for x, y in zip(em_a, em_b)])
+            self.assertEqual(linguagem(a.diferenca(b), todas), [x and not y for x, y in zip(em_a, em_b)])
+            for cadeia, x, y in zip(todas, em_a, linguagem(a.complemento(), todas)):
+                if set(cadeia) <= a.alfabeto:
+                    self.assertEqual(y, not x)
+            equivalente, contraexemplo = a.equivalente(b)
+            self.assertEqual(equivalente, em_a == em_b)
+            if not equivalente:
+                self.assertNotEqual(a.processar_lote([contraexemplo]), b.processar_lote([contraexemplo]))
+
+    def test_produto_so_com_pares_alcancaveis(self):
+        # dois contadores modulo 2 e 3 sobre 'a': o produto tem 6 pares, todos alcancaveis,
+        # e o estado isolado de cada lado nao entra
+        a = AFD({"p0", "p1", "px"}, {"a"}, {("p0", "a"): "p1", ("p1", "a"): "p0"}, "p0", {"p0"})
+        b = AFD({"r0", "r1", "r2", "rx"}, {"a"},
+                {("r0", "a"): "r1", ("r1", "a"): "r2", ("r2", "a"): "r0"}, "r0", {"r0"})
+        intersecao = a.intersecao(b)
+        self.assertEqual(intersecao.quantidade_estados, 6)
+        self.assertEqual(intersecao.processar_lote(["", "aa", "aaa", "a" * 6]), [True, False, False, True])
+        self.assertEqual(a.uniao(b).processar_lote(["aa", "aaa", "a"]), [True, True, False])
+
+    def test_contraexemplo_minimo(self):
+        # o contraexemplo vem da busca em largura: a menor cadeia que separa os dois
+        a = AFD({"e0", "e1"}, {"a", "b"}, {("e0", "a"): "e0", ("e0", "b"): "e1"}, "e0", {"e0"})
+        b = AFD({"e0"}, {"a", "b"}, {("e0", "a"): "e0", ("e0", "b"): "e0"}, "e0", {"e0"})
+        self.assertEqual(a.equivalente(b), (False, "b"))
+        self.assertEqual(a.equivalente(a.minimizar()), (True, None))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,56 @@
+import contextlib
+import io
+import random
+import unittest
+from afd_sob_demanda import AFDSobDemanda
+from conversor import conversor_afn_para_afd
+from test_conversor import cadeias, gerar_afn, linguagem
+
+"""
+testes do AFDSobDemanda contra o AFD da conversao completa, com o cache grande,
+pequeno (esvaziado varias vezes por cadeia) e sem reinicios (simulacao do AFN)
+
+    python3 -m unittest test_afd_sob_demanda
+"""
+
+class TesteAFDSobDemanda(unittest.TestCase):
+    def setUp(self):
+        gerador = random.Random(11)
+        self.afns = [gerar_afn(gerador, n=gerador.randint(2, 7)) for _ in range(60)]
+        # 'x' fica fora do alfabeto
+        self.todas = cadeias("abx", 5)
+
+    def verificar(self, **parametros) -> list:
+        sob_demanda = []
+        for afn in self.afns:
+            esperado = linguagem(conversor_afn_para_afd(afn, modo="bitset"), self.todas)
+            afd = AFDSobDemanda(afn, **parametros)
+            with contextlib.redirect_stdout(io.StringIO()):
+                self.assertEqual([afd.processar_cadeia(cadeia) for cadeia in self.todas], esperado)
+            sob_demanda.append(afd)
+        return sob_demanda
+
+    def test_cache_grande(self):
+        for afd in self.verificar():
+            self.assertEqual(afd.reinicios, 0)
+            self.assertEqual(afd.cadeias_simuladas, 0)
+
+    def test_cache_esvaziado(self):
+        afds = self.verificar(max_estados=2, max_reinicios=100)
+        self.assertGreater(sum(afd.reinicios for afd in afds), 0)
+        self.assertEqual(sum(afd.cadeias_simuladas for afd in afds), 0)
+        for afd in afds:
+            self.assertLessEqual(len(afd._mascaras), 2)
+
+    def test_simulacao_do_afn(self):
+        # sem reinicios: a primeira vez que o cache enche, o resto da cadeia e simulado
+        afds = self.verificar(max_estados=2, max_reinicios=0)
+        self.assertGreater(sum(afd.cadeias_simuladas for afd in afds), 0)
+
+    def test_cache_minimo(self):
+        with self.assertRaises(ValueError):
+            AFDSobDemanda(self.afns[0], max_estados=1)
+
+
+if __name__ == "__main__":
+    unittest.main()
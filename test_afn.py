@@ -0,0 +1,154 @@
+import contextlib
+import io
+import random
+import time
+import unittest
+from afn import AFN, EPSILON
+from conversor import conversor_afn_para_afd
+from io_jflap import carregar_afn_jflap
+from test_conversor import ENTRADA_TESTE, cadeias, gerar_afn, linguagem
+
+"""
+testes do AFN: o fecho-epsilon do IndiceAFN contra uma busca ingenua, as classes
+de simbolos do indice e a simulacao direta (processar_cadeia, processar_lote) contra o AFD equivalente
+
+    python3 -m unittest test_afn
+"""
+
+def fecho_ingenuo(afn: AFN, estados: set) -> set:
+    fecho = set(estados)
+    pilha = list(estados)
+    while pilha:
+        for destino in afn.func_transicao.get((pilha.pop(), EPSILON), ()):
+            if destino not in fecho:
+                fecho.add(destino)
+                pilha.append(destino)
+    return fecho
+
+def afn_cadeia_epsilon(n: int, inicial: str = "q0") -> AFN:
+    # q0 -&-> q1 -&-> ... -&-> q<n-1>, com 'a' de cada estado para q0
+    estados = {f"q{i}" for i in range(n)}
+    func_transicao = {(f"q{i}", EPSILON): {f"q{i + 1}"} for i in range(n - 1)}
+    func_transicao.update({(f"q{i}", "a"): {"q0"} for i in range(n)})
+    return AFN(estados, {"a"}, func_transicao, inicial, {f"q{n - 1}"})
+
+
+class TesteFecho(unittest.TestCase):
+    def test_fecho_igual_busca_ingenua(self):
+        gerador = random.Random(2)
+        for _ in range(100):
+            afn = gerar_afn(gerador, epsilon=0.2)
+            for _ in range(10):
+                estados = set(gerador.sample(sorted(afn.estados), gerador.randint(0, len(afn.estados))))
+                self.assertEqual(afn.calcula_fecho_epsilon(estados), fecho_ingenuo(afn, estados))
+
+    def test_fecho_de_um_estado_nao_resolve_os_demais(self):
+        # so a componente do estado pedido (e as que ela alcanca) e resolvida
+        afn = afn_cadeia_epsilon(200, inicial="q199")
+        indice = afn.indexar()
+        self.assertEqual(indice.fechos_calculados, 0)
+        self.assertEqual(afn.calcula_fecho_epsilon({"q197"}), {"q197", "q198", "q199"})
+        # as componentes {q197} e {q198}, mais o fecho do conjunto
+        self.assertEqual(indice.fechos_calculados, 3)
+        self.assertEqual(afn.calcula_fecho_epsilon({"q0"}), {f"q{i}" for i in range(200)})
+
+    def test_cadeia_epsilon_longa(self):
+        # fechos de tamanho n em cada um dos n estados: guardados como bitmask, sem
+        # custo quadratico; a conversao monta so as mascaras dos macro-estados alcancados
+        afn = afn_cadeia_epsilon(20000)
+        inicio = time.perf_counter()
+        self.assertEqual(len(afn.calcula_fecho_epsilon({"q0"})), 20000)
+        afd = conversor_afn_para_afd(afn, modo="bitset")
+        self.assertLess(time.perf_counter() - inicio, 10)
+        self.assertEqual(afd.quantidade_estados, 1)
+        # as 19999 componentes nao triviais, mais o fecho do conjunto {q0}
+        self.assertEqual(afn.indexar().fechos_calculados, 20000)
+
+    def test_alteracoes_invalidam_o_indice(self):
+        gerador = random.Random(3)
+        afn = gerar_afn(gerador, n=6, epsilon=0.0)
+        antes = afn.calcula_fecho_epsilon({"q0"})
+        afn.adicionar_transicao("q0", EPSILON, "q5")
+        self.assertIn("q5", afn.calcula_fecho_epsilon({"q0"}))
+        afn.remover_transicao("q0", EPSILON, "q5")
+        self.assertEqual(afn.calcula_fecho_epsilon({"q0"}), antes)
+        # edicao direto na visao
+        afn.func_transicao.setdefault(("q0", EPSILON), set()).add("q4")
+        self.assertIn("q4", afn.calcula_fecho_epsilon({"q0"}))
+
+
+class TesteClassesIndice(unittest.TestCase):
+    def test_classes_do_indice(self):
+        # 'a' e 'b' tem as mesmas transicoes, 'c' nao; 'x' e 'y' nao tem nenhuma
+        transicoes = {("q0", "c"): {"q1"}, ("q1", "c"): {"q0", "q1"}}
+        for simbolo in "ab":
+            transicoes[("q0", simbolo)] = {"q0", "q1"}
+        afn = AFN({"q0", "q1"}, set("abcxy"), transicoes, "q0", {"q1"})
+        indice = afn.indexar()
+        self.assertEqual(sorted(indice.classes), [["a", "b"], ["c"], ["x", "y"]])
+        self.assertEqual(indice.classe_de["a"], indice.classe_de["b"])
+        self.assertNotEqual(indice.classe_de["a"], indice.classe_de["c"])
+
+    def test_conversao_por_classe(self):
+        # alfabeto grande com poucos comportamentos distintos: o AFD tem uma coluna por
+        # classe e a mesma linguagem nos tres modos
+        gerador = random.Random(22)
+        base = gerar_afn(gerador, n=5, alfabeto="ab", epsilon=0.15)
+        copias = {"a": "abcdefghij", "b": "klmnopqrst", EPSILON: [EPSILON]}
+        transicoes = {}
+        for (origem, simbolo), destinos in base.func_transicao.items():
+            for copia in copias[simbolo]:
+                transicoes[(origem, copia)] = set(destinos)
+        afn = AFN(set(base.estados), set("abcdefghijklmnopqrst"), transicoes, "q0", set(base.estados_aceitacao))
+        self.assertLessEqual(len(afn.indexar().classes), 3)
+        referencia = conversor_afn_para_afd(afn, modo="conjuntos")
+        todas = cadeias("ajkt", 4)
+        for modo in ("bitset", "paralelo"):
+            with self.subTest(modo=modo):
+                afd = conversor_afn_para_afd(afn, modo=modo)
+                self.assertLessEqual(len(afd.classes_simbolos()), 3)
+                self.assertEqual(afd.equivalente(referencia), (True, None))
+                self.assertEqual(linguagem(afd, todas), afn.processar_lote(todas))
+
+
+class TesteSimulacao(unittest.TestCase):
+    def test_igual_ao_afd_equivalente(self):
+        # 'x' fica fora do alfabeto
+        gerador = random.Random(22)
+        todas = cadeias("abx", 5)
+        afns = [carregar_afn_jflap(ENTRADA_TESTE)] + [gerar_afn(gerador) for _ in range(80)]
+        for afn in afns:
+            esperado = linguagem(conversor_afn_para_afd(afn), todas)
+            self.assertEqual(afn.processar_lote(todas), esperado)
+            with contextlib.redirect_stdout(io.StringIO()):
+                self.assertEqual([afn.processar_cadeia(cadeia) for cadeia in todas], esperado)
+
+    def test_simbolo_desconhecido_depois_do_conjunto_vazio(self):
+        # a cadeia ja esta rejeitada, mas o simbolo invalido ainda e avisado
+        afn = AFN({"q0", "q1"}, {"a", "b"}, {("q0", "a"): {"q1"}}, "q0", {"q1"})
+        saida = io.StringIO()
+        with contextlib.redirect_stdout(saida):
+            self.assertFalse(afn.processar_cadeia("bbz"))
+        self.assertIn("z", saida.getvalue())
+        self.assertEqual(afn.processar_lote(["a", "aa", "az", ""]), [True, False, False, False])
+
+    def test_leitura_nao_monta_as_visoes(self):
+        afn = gerar_afn(random.Random(24), n=6)
+        esperado = (sorted(afn.estados), dict(afn.func_transicao))
+        copia = AFN(set(afn.estados), set(afn.alfabeto), dict(afn.func_transicao),
+                    afn.estado_inicial, set(afn.estados_aceitacao))
+        copia.processar_lote(["ab", "ba"])
+        self.assertEqual((copia.nomes_estados(), {(origem, simbolo): set(destinos)
+                                                  for origem, simbolo, destinos in copia.transicoes()}), esperado)
+        self.assertIsNone(copia._estados)
+        self.assertIsNone(copia._func_transicao)
+
+    def test_alteracao_muda_a_simulacao(self):
+        afn = AFN({"q0", "q1"}, {"a"}, {("q0", "a"): {"q1"}}, "q0", {"q1"})
+        self.assertEqual(afn.processar_lote(["a", "aa"]), [True, False])
+        afn.adicionar_transicao("q1", EPSILON, "q0")
+        self.assertEqual(afn.processar_lote(["a", "aa"]), [True, True])
+
+
+if __name__ == "__main__":
+    unittest.main()
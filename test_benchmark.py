@@ -0,0 +1,96 @@
+import contextlib
+import io
+import json
+import os
+import tempfile
+import unittest
+import benchmark
+from benchmark import comparar, gerar_afn_cadeia_epsilon, gerar_afn_n_esimo, medir_caso
+from conversor import conversor_afn_para_afd
+
+"""
+testes do benchmark: comparacao com o baseline (tolerancia e pisos absolutos),
+geradores sinteticos e uma execucao curta do main
+
+    python3 -m unittest test_benchmark
+"""
+
+def resultado(tempo: float, memoria: int, caso: str = "caso", etapa: str = "converter") -> dict:
+    return {"casos": {caso: {etapa: {"tempo": tempo, "memoria_pico": memoria}}}}
+
+
+class TesteComparar(unittest.TestCase):
+    def test_piora_acima_da_tolerancia_e_do_piso(self):
+        regressoes = comparar(resultado(0.5, 4_000_000), resultado(0.1, 1_000_000), 0.2)
+        self.assertEqual(len(regressoes), 2)
+        self.assertTrue(regressoes[0].startswith("caso/converter/tempo"))
+        self.assertTrue(regressoes[1].startswith("caso/converter/memoria_pico"))
+
+    def test_piso_de_tempo(self):
+        # +200%, mas so 0.2ms a mais: ruido
+        self.assertEqual(comparar(resultado(0.0003, 1000), resultado(0.0001, 1000), 0.2), [])
+        # o mesmo salto com um piso menor passa a contar
+        self.assertEqual(len(comparar(resultado(0.0003, 1000), resultado(0.0001, 1000), 0.2, piso_tempo=0.0001)), 1)
+
+    def test_piso_de_memoria(self):
+        # +100%, mas so 1KB a mais
+        self.assertEqual(comparar(resultado(0.1, 2048), resultado(0.1, 1024), 0.2), [])
+        self.assertEqual(len(comparar(resultado(0.1, 2048), resultado(0.1, 1024), 0.2, piso_memoria=512)), 1)
+
+    def test_dentro_da_tolerancia_melhora_e_casos_novos(self):
+        self.assertEqual(comparar(resultado(1.1, 1_100_000), resultado(1.0, 1_000_000), 0.2), [])
+        self.assertEqual(comparar(resultado(0.1, 1000), resultado(1.0, 1_000_000), 0.2), [])
+        self.assertEqual(comparar(resultado(9.0, 10 ** 9, caso="novo"), resultado(0.1, 1000), 0.2), [])
+        # baseline sem a medida (ou com zero) nao e comparado
+        self.assertEqual(comparar(resultado(9.0, 10 ** 9), resultado(0.0, 0), 0.2), [])
+
+
+class TesteGeradores(unittest.TestCase):
+    def test_n_esimo_tem_afd_minimo_exponencial(self):
+        for n in range(1, 6):
+            afd = conversor_afn_para_afd(gerar_afn_n_esimo(n), modo="bitset", minimizar=True)
+            self.assertEqual(afd.quantidade_estados, 2 ** n)
+
+    def test_cadeia_epsilon(self):
+        afn = gerar_afn_cadeia_epsilon(10)
+        self.assertEqual(len(afn.calcula_fecho_epsilon({"q0"})), 11)
+        self.assertTrue(afn.processar_lote(["", "ab"])[0])
+
+
+class TesteMedicao(unittest.TestCase):
+    def test_medir_caso(self):
+        with tempfile.TemporaryDirectory() as diretorio:
+            medidas = medir_caso(gerar_afn_n_esimo(3), diretorio, repeticoes=1,
+                                 quantidade_cadeias=10, tamanho_cadeias=5)
+        self.assertEqual(medidas["estados_afn"], 4)
+        self.assertEqual(medidas["estados_afd"], 8)
+        for etapa in benchmark.ETAPAS:
+            self.assertGreaterEqual(medidas[etapa]["tempo"], 0)
+            self.assertGreater(medidas[etapa]["memoria_pico"], 0)
+
+    def test_main_com_baseline(self):
+        with tempfile.TemporaryDirectory() as diretorio:
+            atual = os.path.join(diretorio, "atual.json")
+            argumentos = ["--casos", "n_esimo_8", "--repeticoes", "1", "--saida", atual]
+            with contextlib.redirect_stdout(io.StringIO()):
+                self.assertEqual(benchmark.main(argumentos), 0)
+                # contra si mesmo, com pisos folgados: nenhuma regressao
+                self.assertEqual(benchmark.main(argumentos[:4] + ["--baseline", atual, "--piso-tempo", "10",
+                                                                  "--piso-memoria", str(10 ** 9)]), 0)
+
+            with open(atual, encoding="utf-8") as arquivo:
+                baseline = json.load(arquivo)
+            for medidas in baseline["casos"]["n_esimo_8"].values():
+                if isinstance(medidas, dict):
+                    medidas["tempo"] = 1e-9
+                    medidas["memoria_pico"] = 1
+            with open(atual, "w", encoding="utf-8") as arquivo:
+                json.dump(baseline, arquivo)
+            saida = io.StringIO()
+            with contextlib.redirect_stdout(saida):
+                self.assertEqual(benchmark.main(argumentos[:4] + ["--baseline", atual]), 1)
+            self.assertIn("n_esimo_8/converter/memoria_pico", saida.getvalue())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,117 @@
+import os
+import random
+import tempfile
+import unittest
+from afn import AFN
+from cache_conversao import CacheConversao, impressao_digital
+from conversor import conversor_afn_para_afd
+from test_conversor import gerar_afn, mesmo_afd
+
+"""
+testes do CacheConversao: impressao digital, acertos em memoria e em disco, falhas
+e remocao por limite de memoria e de tamanho em disco
+
+    python3 -m unittest test_cache_conversao
+"""
+
+def arquivos_afdb(diretorio: str) -> list:
+    return sorted(nome for nome in os.listdir(diretorio) if nome.endswith(".afdb"))
+
+
+class TesteImpressaoDigital(unittest.TestCase):
+    def test_independe_da_ordem(self):
+        afn = gerar_afn(random.Random(17), n=6)
+        transicoes = list(afn.func_transicao.items())
+        random.Random(18).shuffle(transicoes)
+        embaralhado = AFN(set(sorted(afn.estados, reverse=True)), set(afn.alfabeto), dict(transicoes),
+                          afn.estado_inicial, set(afn.estados_aceitacao))
+        self.assertEqual(impressao_digital(embaralhado), impressao_digital(afn))
+
+    def test_muda_com_o_conteudo(self):
+        afn = gerar_afn(random.Random(19), n=4)
+        antes = impressao_digital(afn)
+        afn.adicionar_transicao("q3", "b", "q0")
+        afn.adicionar_transicao("q3", "a", "q1")
+        self.assertNotEqual(impressao_digital(afn), antes)
+
+
+class TesteCacheConversao(unittest.TestCase):
+    def setUp(self):
+        self.pasta = tempfile.TemporaryDirectory()
+        self.addCleanup(self.pasta.cleanup)
+        gerador = random.Random(20)
+        self.afns = [gerar_afn(gerador, n=5) for _ in range(4)]
+
+    def test_falha_acerto_em_memoria_e_em_disco(self):
+        cache = CacheConversao(self.pasta.name)
+        afn = self.afns[0]
+        afd = cache.obter(afn)
+        self.assertTrue(mesmo_afd(afd, conversor_afn_para_afd(afn, modo="bitset")))
+        self.assertIs(cache.obter(afn), afd)
+        self.assertEqual(cache.estatisticas(),
+                         {"acertos_memoria": 1, "acertos_disco": 0, "falhas": 1, "em_memoria": 1})
+
+        # outro cache (outro processo) no mesmo diretorio le o arquivo gravado
+        outro = CacheConversao(self.pasta.name)
+        self.assertTrue(mesmo_afd(outro.obter(afn), afd))
+        self.assertEqual((outro.acertos_disco, outro.falhas), (1, 0))
+
+    def test_minimizar_faz_parte_da_chave(self):
+        cache = CacheConversao(self.pasta.name)
+        afn = self.afns[1]
+        afd = cache.obter(afn)
+        minimo = cache.obter(afn, minimizar=True)
+        self.assertEqual(cache.falhas, 2)
+        self.assertEqual(afd.equivalente(minimo), (True, None))
+        self.assertEqual(len(arquivos_afdb(self.pasta.name)), 2)
+
+    def test_limite_em_memoria(self):
+        cache = CacheConversao(self.pasta.name, max_memoria=2)
+        for afn in self.afns[:3]:
+            cache.obter(afn)
+        self.assertEqual(cache.estatisticas()["em_memoria"], 2)
+        # o primeiro saiu da memoria, mas continua em disco
+        cache.obter(self.afns[0])
+        self.assertEqual((cache.acertos_memoria, cache.acertos_disco, cache.falhas), (0, 1, 3))
+
+    def test_limite_em_disco(self):
+        cache = CacheConversao(self.pasta.name)
+        cache.obter(self.afns[0])
+        tamanho = os.path.getsize(os.path.join(self.pasta.name, arquivos_afdb(self.pasta.name)[0]))
+        cache.limpar()
+
+        cache = CacheConversao(self.pasta.name, max_bytes=2 * tamanho + tamanho // 2)
+        for afn in self.afns:
+            cache.obter(afn)
+            total = sum(os.path.getsize(os.path.join(self.pasta.name, nome))
+                        for nome in arquivos_afdb(self.pasta.name))
+            self.assertLessEqual(total, cache.max_bytes)
+        self.assertLess(len(arquivos_afdb(self.pasta.name)), len(self.afns))
+        self.assertTrue(arquivos_afdb(self.pasta.name))
+
+    def test_arquivo_corrompido_e_refeito(self):
+        cache = CacheConversao(self.pasta.name)
+        afn = self.afns[2]
+        afd = cache.obter(afn)
+        caminho = os.path.join(self.pasta.name, impressao_digital(afn) + ".afdb")
+        with open(caminho, "r+b") as arquivo:
+            arquivo.truncate(20)
+
+        outro = CacheConversao(self.pasta.name)
+        self.assertTrue(mesmo_afd(outro.obter(afn), afd))
+        self.assertEqual((outro.acertos_disco, outro.falhas), (0, 1))
+        self.assertGreater(os.path.getsize(caminho), 20)
+
+    def test_limpar(self):
+        cache = CacheConversao(self.pasta.name)
+        for afn in self.afns:
+            cache.obter(afn)
+        cache.limpar()
+        self.assertEqual(arquivos_afdb(self.pasta.name), [])
+        self.assertEqual(cache.estatisticas()["em_memoria"], 0)
+        cache.obter(self.afns[0])
+        self.assertEqual(cache.falhas, len(self.afns) + 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,99 @@
+import itertools
+import os
+import random
+import unittest
+import conversor
+from afd import AFD
+from afn import AFN, EPSILON
+from conversor import conversor_afn_para_afd
+from io_jflap import carregar_afn_jflap
+
+"""
+testes cruzados com automatos aleatorios (sementes fixas): os motores de conversao
+contra o modo "conjuntos". os geradores e comparacoes daqui sao usados pelos
+demais modulos de teste
+
+    python3 -m pytest -q
+    python3 -m unittest test_conversor
+"""
+
+ENTRADA_TESTE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "entrada-teste.jff")
+
+def gerar_afn(gerador: random.Random, n: int = None, alfabeto: str = "ab",
+              densidade: float = 0.25, epsilon: float = 0.12) -> AFN:
+    # AFN aleatorio com estados q0..q<n-1>, inicial q0
+    n = n or gerador.randint(1, 7)
+    estados = [f"q{i}" for i in range(n)]
+    func_transicao = {}
+    for origem in estados:
+        for simbolo in list(alfabeto) + [EPSILON]:
+            for destino in estados:
+                if gerador.random() < (epsilon if simbolo == EPSILON else densidade):
+                    func_transicao.setdefault((origem, simbolo), set()).add(destino)
+    aceitacao = {estado for estado in estados if gerador.random() < 0.3}
+    return AFN(set(estados), set(alfabeto), func_transicao, "q0", aceitacao)
+
+def gerar_afd(gerador: random.Random, alfabeto: str = "abc") -> AFD:
+    # AFD aleatorio (parcial) com 1 a 5 estados sobre uma parte do alfabeto
+    simbolos = set(gerador.sample(alfabeto, gerador.randint(1, len(alfabeto))))
+    estados = [f"e{i}" for i in range(gerador.randint(1, 5))]
+    func_transicao = {(origem, simbolo): gerador.choice(estados)
+                      for origem in estados for simbolo in sorted(simbolos) if gerador.random() < 0.8}
+    aceitacao = {estado for estado in estados if gerador.random() < 0.4}
+    return AFD(set(estados), simbolos, func_transicao, "e0", aceitacao)
+
+def cadeias(alfabeto: str, tamanho: int) -> list:
+    # todas as cadeias sobre o alfabeto com ate 'tamanho' simbolos
+    return ["".join(p) for n in range(tamanho + 1) for p in itertools.product(alfabeto, repeat=n)]
+
+def mesmo_afd(a: AFD, b: AFD) -> bool:
+    return (a.estados, a.alfabeto, dict(a.func_transicao), a.estado_inicial, a.estados_aceitacao) == \
+           (b.estados, b.alfabeto, dict(b.func_transicao), b.estado_inicial, b.estados_aceitacao)
+
+def linguagem(automato: AFD, todas: list) -> list:
+    # aceita(cadeia) de cada cadeia, pela tabela compilada (o mesmo que processar_cadeia, sem mensagens)
+    tabela = automato.compilar()
+    return [tabela.aceita(cadeia) for cadeia in todas]
+
+
+class TesteMotores(unittest.TestCase):
+    def setUp(self):
+        gerador = random.Random(1)
+        self.afns = [carregar_afn_jflap(ENTRADA_TESTE)] + [gerar_afn(gerador) for _ in range(120)]
+
+    def test_bitset_igual_conjuntos(self):
+        for afn in self.afns:
+            self.assertTrue(mesmo_afd(conversor_afn_para_afd(afn, modo="bitset"),
+                                      conversor_afn_para_afd(afn)))
+
+    def test_bitset_sem_estado_inicial_conhecido(self):
+        # estado inicial sem nenhuma transicao (fora do indice) e AFN sem transicoes
+        afn = AFN({"q0", "q1"}, {"a"}, {("q1", "a"): {"q1"}}, "q0", {"q0"})
+        self.assertTrue(mesmo_afd(conversor_afn_para_afd(afn, modo="bitset"), conversor_afn_para_afd(afn)))
+        afn = AFN({"q0"}, {"a", "b"}, {}, "q0", set())
+        self.assertTrue(mesmo_afd(conversor_afn_para_afd(afn, modo="bitset"), conversor_afn_para_afd(afn)))
+
+    def test_modo_invalido(self):
+        with self.assertRaises(ValueError):
+            conversor_afn_para_afd(self.afns[0], modo="bitmask")
+
+    def test_paralelo_igual_conjuntos(self):
+        # fronteira minima baixa para que o pool seja usado mesmo em AFNs pequenos
+        original = conversor.MIN_FRONTEIRA_PARALELA
+        conversor.MIN_FRONTEIRA_PARALELA = 2
+        try:
+            for afn in self.afns[:15]:
+                self.assertTrue(mesmo_afd(conversor_afn_para_afd(afn, modo="paralelo", processos=2),
+                                          conversor_afn_para_afd(afn)))
+        finally:
+            conversor.MIN_FRONTEIRA_PARALELA = original
+
+    def test_minimizar_na_conversao(self):
+        for afn in self.afns[:40]:
+            afd = conversor_afn_para_afd(afn)
+            minimo = conversor_afn_para_afd(afn, modo="bitset", minimizar=True)
+            self.assertEqual(afd.equivalente(minimo), (True, None))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,82 @@
+import random
+import unittest
+from afn import AFN, EPSILON
+from benchmark import gerar_afn_n_esimo
+from conversor import conversor_afn_para_afd
+from incremental import ConversorIncremental
+from test_conversor import gerar_afn, mesmo_afd
+
+"""
+testes do ConversorIncremental: atualizar() contra a conversao completa e o custo
+de uma alteracao local
+
+    python3 -m unittest test_incremental
+"""
+
+class TesteIncremental(unittest.TestCase):
+    @staticmethod
+    def alterar(gerador: random.Random, afn: AFN):
+        # adiciona ou remove uma transicao (as vezes com estado ou simbolo novo)
+        if gerador.random() < 0.5:
+            estados = sorted(afn.estados) + ["x"]
+            simbolo = gerador.choice(["a", "b", "c", EPSILON] + (["d"] if gerador.random() < 0.1 else []))
+            afn.adicionar_transicao(gerador.choice(estados), simbolo, gerador.choice(estados))
+        else:
+            transicoes = list(afn.transicoes())
+            if transicoes:
+                origem, simbolo, destinos = gerador.choice(transicoes)
+                afn.remover_transicao(origem, simbolo, gerador.choice(sorted(destinos)))
+
+    def test_primeira_conversao_igual_a_completa(self):
+        gerador = random.Random(7)
+        for _ in range(100):
+            afn = gerar_afn(gerador, alfabeto="abc")
+            self.assertTrue(mesmo_afd(ConversorIncremental(afn).afd, conversor_afn_para_afd(afn, modo="bitset")))
+
+    def test_atualizar_igual_a_reconversao(self):
+        gerador = random.Random(8)
+        for _ in range(150):
+            afn = gerar_afn(gerador, alfabeto="abc")
+            incremental = ConversorIncremental(afn)
+            for _ in range(5):
+                antes = {macro: nome for nome, macro in incremental.macro_estados().items()}
+                alfabeto = set(afn.alfabeto)
+                afd_anterior = incremental.afd
+                for _ in range(gerador.randint(1, 3)):
+                    self.alterar(gerador, afn)
+                afd = incremental.atualizar()
+
+                completo = ConversorIncremental(afn)
+                depois = incremental.macro_estados()
+                self.assertEqual(set(depois.values()), set(completo.macro_estados().values()))
+                self.assertEqual(afd.equivalente(completo.afd), (True, None))
+                # o AFD corrigido no lugar e o mesmo que seria montado do zero
+                self.assertTrue(mesmo_afd(afd, incremental._montar_afd()))
+                if set(afn.alfabeto) == alfabeto:
+                    self.assertIs(afd, afd_anterior)
+                # os macro-estados que continuam existindo mantem o nome
+                for nome, macro in depois.items():
+                    if macro in antes:
+                        self.assertEqual(antes[macro], nome)
+
+    def test_alteracao_local(self):
+        # AFD com 2^10 macro-estados; q10 esta em metade deles
+        afn = gerar_afn_n_esimo(10)
+        incremental = ConversorIncremental(afn)
+        afd = incremental.afd
+        afn.adicionar_transicao("q10", "b", "q10")
+        self.assertIs(incremental.atualizar(), afd)
+        # so a coluna 'b' dos macro-estados com q10 e recalculada
+        self.assertLessEqual(incremental.recalculadas, 512)
+        self.assertEqual((incremental.novos, incremental.removidos), (0, 0))
+        self.assertEqual(afd.quantidade_estados, 1024)
+
+        # sem q0 -a-> q1, so sobra o macro-estado {q0}
+        afn.remover_transicao("q0", "a", "q1")
+        incremental.atualizar()
+        self.assertEqual((afd.quantidade_estados, incremental.removidos), (1, 1023))
+        self.assertTrue(mesmo_afd(afd, conversor_afn_para_afd(afn, modo="bitset")))
+
+
+if __name__ == "__main__":
+    unittest.main()
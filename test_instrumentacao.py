@@ -0,0 +1,115 @@
+import unittest
+import conversor
+from benchmark import gerar_afn_cadeia_epsilon, gerar_afn_n_esimo
+from conversor import MODOS_CONVERSAO, conversor_afn_para_afd
+from instrumentacao import ConversaoInterrompida, LimitesConversao, ObservadorConversao
+
+"""
+testes da instrumentacao da conversao: observador e LimitesConversao nos tres modos
+
+    python3 -m unittest test_instrumentacao
+"""
+
+class ObservadorRegistro(ObservadorConversao):
+    # guarda as chamadas recebidas
+    def __init__(self, intervalo: int = 1):
+        self.intervalo = intervalo
+        self.chamadas = []
+
+    def inicio(self, estatisticas):
+        self.chamadas.append("inicio")
+
+    def progresso(self, estatisticas):
+        self.chamadas.append("progresso")
+
+    def fim(self, estatisticas):
+        self.chamadas.append("fim")
+        self.final = estatisticas.como_dict()
+
+
+class TesteInstrumentacao(unittest.TestCase):
+    def setUp(self):
+        # fronteira minima baixa para que o modo paralelo use o pool
+        original = conversor.MIN_FRONTEIRA_PARALELA
+        conversor.MIN_FRONTEIRA_PARALELA = 2
+        self.addCleanup(setattr, conversor, "MIN_FRONTEIRA_PARALELA", original)
+        # AFD com 2^9 = 512 estados
+        self.afn = gerar_afn_n_esimo(9)
+
+    def converter(self, modo: str, **parametros):
+        if modo == "paralelo":
+            parametros["processos"] = 2
+        return conversor_afn_para_afd(self.afn, modo=modo, **parametros)
+
+    def test_observador(self):
+        for modo in MODOS_CONVERSAO:
+            with self.subTest(modo=modo):
+                observador = ObservadorRegistro(intervalo=100)
+                afd = self.converter(modo, observador=observador)
+                self.assertEqual(observador.chamadas[0], "inicio")
+                self.assertEqual(observador.chamadas[-1], "fim")
+                self.assertIn("progresso", observador.chamadas)
+                final = observador.final
+                self.assertFalse(final["interrompida"])
+                self.assertEqual(final["macro_estados"], afd.quantidade_estados)
+                self.assertEqual(final["processados"], afd.quantidade_estados)
+                self.assertEqual(final["modo"], modo)
+
+    def test_fechos_calculados(self):
+        # o AFN do n-esimo simbolo nao tem transicoes-epsilon; este tem 30 fechos nao triviais
+        self.afn = gerar_afn_cadeia_epsilon(30)
+        for modo in MODOS_CONVERSAO:
+            with self.subTest(modo=modo):
+                # so conta o que e calculado durante a conversao: o indice comeca vazio
+                self.afn.invalidar_indice()
+                observador = ObservadorRegistro()
+                self.converter(modo, observador=observador)
+                self.assertGreaterEqual(observador.final["fechos_calculados"], 30)
+
+    def test_limite_de_estados(self):
+        for modo in MODOS_CONVERSAO:
+            with self.subTest(modo=modo):
+                observador = ObservadorRegistro()
+                with self.assertRaises(ConversaoInterrompida) as contexto:
+                    self.converter(modo, observador=observador, limites=LimitesConversao(max_estados=50))
+                estatisticas = contexto.exception.estatisticas
+                self.assertTrue(estatisticas.interrompida)
+                self.assertIn("50 macro-estados", estatisticas.motivo)
+                self.assertGreater(estatisticas.macro_estados, 50)
+                self.assertLess(estatisticas.macro_estados, 512)
+                self.assertEqual(observador.chamadas[-1], "fim")
+                self.assertTrue(observador.final["interrompida"])
+
+    def test_limite_de_tempo(self):
+        for modo in MODOS_CONVERSAO:
+            with self.subTest(modo=modo):
+                with self.assertRaises(ConversaoInterrompida) as contexto:
+                    self.converter(modo, observador=ObservadorRegistro(), limites=LimitesConversao(max_segundos=0))
+                self.assertIn("segundos", contexto.exception.motivo)
+                self.assertLess(contexto.exception.estatisticas.processados, 512)
+
+    def test_limite_de_memoria(self):
+        # a memoria ja liberada por outros testes pode ser reaproveitada pela conversao,
+        # entao o proprio observador faz a memoria residente crescer 8MB a cada aviso
+        class ObservadorGuloso(ObservadorRegistro):
+            def progresso(self, estatisticas):
+                super().progresso(estatisticas)
+                self.blocos = getattr(self, "blocos", []) + [b"x" * (8 << 20)]
+
+        for modo in MODOS_CONVERSAO:
+            with self.subTest(modo=modo):
+                with self.assertRaises(ConversaoInterrompida) as contexto:
+                    self.converter(modo, observador=ObservadorGuloso(intervalo=16),
+                                   limites=LimitesConversao(max_memoria=4 << 20))
+                self.assertIn("memoria", contexto.exception.motivo)
+                self.assertGreater(contexto.exception.estatisticas.memoria_usada, 4 << 20)
+
+    def test_limites_folgados(self):
+        limites = LimitesConversao(max_estados=512, max_segundos=600, max_memoria=1 << 40)
+        for modo in MODOS_CONVERSAO:
+            with self.subTest(modo=modo):
+                self.assertEqual(self.converter(modo, limites=limites).quantidade_estados, 512)
+
+
+if __name__ == "__main__":
+    unittest.main()
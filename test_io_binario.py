@@ -0,0 +1,87 @@
+import os
+import random
+import struct
+import tempfile
+import unittest
+from afd import AFD
+from io_binario import carregar_afd_binario, salvar_afd_binario
+from test_conversor import cadeias, gerar_afd, linguagem, mesmo_afd
+
+"""
+testes do formato binario .afdb: ida e volta, teste de cadeias direto no arquivo
+e arquivos truncados ou corrompidos
+
+    python3 -m unittest test_io_binario
+"""
+
+class TesteAFDBinario(unittest.TestCase):
+    def setUp(self):
+        self.pasta = tempfile.TemporaryDirectory()
+        self.addCleanup(self.pasta.cleanup)
+        self.caminho = os.path.join(self.pasta.name, "afd.afdb")
+
+    def test_ida_e_volta(self):
+        gerador = random.Random(15)
+        todas = cadeias("abcx", 4)
+        for _ in range(50):
+            afd = gerar_afd(gerador)
+            salvar_afd_binario(afd, self.caminho)
+            with carregar_afd_binario(self.caminho) as binario:
+                self.assertTrue(mesmo_afd(binario.para_afd(), afd))
+                self.assertEqual(binario.processar_lote(todas), linguagem(afd, todas))
+
+    def test_nomes_nao_ascii_e_sem_estado_inicial(self):
+        afd = AFD({"ínicio", "fim→"}, {"ç", "a"}, {("ínicio", "ç"): "fim→"}, "ínicio", {"fim→"})
+        salvar_afd_binario(afd, self.caminho)
+        with carregar_afd_binario(self.caminho) as binario:
+            self.assertTrue(mesmo_afd(binario.para_afd(), afd))
+            self.assertEqual(binario.processar_lote(["ç", "a", ""]), [True, False, False])
+
+        afd = AFD({"e0"}, {"a"}, {}, None, set())
+        salvar_afd_binario(afd, self.caminho)
+        with carregar_afd_binario(self.caminho) as binario:
+            self.assertIsNone(binario.para_afd().estado_inicial)
+            self.assertFalse(binario.aceita(""))
+
+    def test_mesmo_afd_mesmo_arquivo(self):
+        afd = gerar_afd(random.Random(16))
+        salvar_afd_binario(afd, self.caminho)
+        with open(self.caminho, "rb") as arquivo:
+            primeiro = arquivo.read()
+        copia = AFD(set(afd.estados), set(afd.alfabeto), dict(afd.func_transicao),
+                    afd.estado_inicial, set(afd.estados_aceitacao))
+        salvar_afd_binario(copia, self.caminho)
+        with open(self.caminho, "rb") as arquivo:
+            self.assertEqual(arquivo.read(), primeiro)
+
+    def test_arquivo_truncado(self):
+        # os simbolos ocupam 4 bytes, sem preenchimento: qualquer corte e detectado
+        afd = AFD({"e0", "e1", "estado"}, {"abc", "d"}, {("e0", "abc"): "e1", ("e1", "d"): "estado"},
+                  "e0", {"estado"})
+        salvar_afd_binario(afd, self.caminho)
+        with open(self.caminho, "rb") as arquivo:
+            dados = arquivo.read()
+        truncado = os.path.join(self.pasta.name, "truncado.afdb")
+        for tamanho in range(len(dados)):
+            with open(truncado, "wb") as arquivo:
+                arquivo.write(dados[:tamanho])
+            with self.subTest(tamanho=tamanho):
+                with self.assertRaises((ValueError, struct.error)):
+                    carregar_afd_binario(truncado).fechar()
+
+    def test_arquivo_invalido(self):
+        afd = AFD({"e0"}, {"a"}, {("e0", "a"): "e0"}, "e0", {"e0"})
+        salvar_afd_binario(afd, self.caminho)
+        with open(self.caminho, "rb") as arquivo:
+            dados = bytearray(arquivo.read())
+        for posicao, valor in ((0, ord("X")), (4, 9)):
+            corrompido = bytearray(dados)
+            corrompido[posicao] = valor
+            with open(self.caminho, "wb") as arquivo:
+                arquivo.write(corrompido)
+            with self.assertRaises(ValueError):
+                carregar_afd_binario(self.caminho)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,133 @@
+import os
+import random
+import tempfile
+import unittest
+import xml.etree.ElementTree as ET
+from afd import AFD
+from afn import EPSILON
+from io_jflap import LAYOUTS, carregar_afn_jflap, salvar_afd_jflap, salvar_afn_jflap
+from test_conversor import ENTRADA_TESTE, gerar_afd, gerar_afn
+
+"""
+testes da leitura e da escrita de arquivos JFLAP (.jff)
+
+    python3 -m unittest test_io_jflap
+"""
+
+# transicoes antes dos estados, ids fora de ordem e nao sequenciais, e as tres
+# formas de epsilon (<read/>, <read> </read> e sem <read>)
+FORA_DE_ORDEM = """<?xml version="1.0" encoding="UTF-8"?>
+<structure><type>fa</type><automaton>
+  <transition><from>7</from><to>3</to><read>a</read></transition>
+  <transition><from>3</from><to>12</to><read/></transition>
+  <state id="12" name="fim"><final/></state>
+  <transition><from>12</from><to>7</to><read> </read></transition>
+  <state id="3" name="meio"/>
+  <transition><from>7</from><to>12</to></transition>
+  <transition><from>3</from><to>3</to><read> b </read></transition>
+  <state id="7" name="inicio"><initial/></state>
+</automaton></structure>
+"""
+
+
+class TesteCarregarJflap(unittest.TestCase):
+    def setUp(self):
+        self.pasta = tempfile.TemporaryDirectory()
+        self.addCleanup(self.pasta.cleanup)
+
+    def test_ids_fora_de_ordem(self):
+        caminho = os.path.join(self.pasta.name, "fora.jff")
+        with open(caminho, "w", encoding="utf-8") as arquivo:
+            arquivo.write(FORA_DE_ORDEM)
+        afn = carregar_afn_jflap(caminho)
+        self.assertEqual(afn.estados, {"inicio", "meio", "fim"})
+        self.assertEqual(afn.alfabeto, {"a", "b"})
+        self.assertEqual(afn.estado_inicial, "inicio")
+        self.assertEqual(afn.estados_aceitacao, {"fim"})
+        self.assertEqual(dict(afn.func_transicao), {
+            ("inicio", "a"): {"meio"},
+            ("inicio", EPSILON): {"fim"},
+            ("meio", EPSILON): {"fim"},
+            ("meio", "b"): {"meio"},
+            ("fim", EPSILON): {"inicio"},
+        })
+
+    def test_arquivo_de_exemplo(self):
+        afn = carregar_afn_jflap(ENTRADA_TESTE)
+        self.assertEqual(afn.estado_inicial, "q0")
+        self.assertEqual(afn.estados_aceitacao, {"q2"})
+        self.assertIn(("q0", "a"), afn.func_transicao)
+
+    def test_salvar_e_carregar_afn(self):
+        gerador = random.Random(12)
+        caminho = os.path.join(self.pasta.name, "afn.jff")
+        for _ in range(30):
+            afn = gerar_afn(gerador)
+            salvar_afn_jflap(afn, caminho)
+            lido = carregar_afn_jflap(caminho)
+            self.assertEqual(lido.estados, afn.estados)
+            self.assertEqual(dict(lido.func_transicao), dict(afn.func_transicao))
+            self.assertEqual((lido.estado_inicial, lido.estados_aceitacao),
+                             (afn.estado_inicial, afn.estados_aceitacao))
+            # simbolos sem transicao nao sao gravados no .jff
+            self.assertLessEqual(lido.alfabeto, afn.alfabeto)
+
+
+class TesteSalvarJflap(unittest.TestCase):
+    def setUp(self):
+        self.pasta = tempfile.TemporaryDirectory()
+        self.addCleanup(self.pasta.cleanup)
+        self.caminho = os.path.join(self.pasta.name, "afd.jff")
+
+    def verificar_afd(self, afd: AFD):
+        # o AFD relido como AFN tem as mesmas transicoes (cada uma com um unico destino)
+        lido = carregar_afn_jflap(self.caminho)
+        self.assertEqual(lido.estados, afd.estados)
+        self.assertEqual({chave: next(iter(destinos)) for chave, destinos in lido.func_transicao.items()},
+                         dict(afd.func_transicao))
+        self.assertEqual((lido.estado_inicial, lido.estados_aceitacao),
+                         (afd.estado_inicial, afd.estados_aceitacao))
+
+    def test_escape_de_nomes_e_simbolos(self):
+        estados = {'a<b', 'c&d', '"q"', "x'y", "t\tu"}
+        simbolos = {"<", "&", ">", '"'}
+        gerador = random.Random(13)
+        func_transicao = {(origem, simbolo): gerador.choice(sorted(estados))
+                          for origem in estados for simbolo in simbolos}
+        afd = AFD(estados, simbolos, func_transicao, "c&d", {'a<b', '"q"'})
+        salvar_afd_jflap(afd, self.caminho)
+        self.verificar_afd(afd)
+
+    def test_layouts(self):
+        gerador = random.Random(14)
+        for _ in range(20):
+            afd = gerar_afd(gerador)
+            for layout in LAYOUTS:
+                salvar_afd_jflap(afd, self.caminho, layout=layout)
+                self.verificar_afd(afd)
+                # cada estado em uma posicao diferente
+                posicoes = [(estado.findtext("x"), estado.findtext("y"))
+                            for estado in ET.parse(self.caminho).getroot().iter("state")]
+                self.assertEqual(len(set(posicoes)), len(afd.estados))
+
+    def test_layout_camadas(self):
+        # e0 -> e1 -> e2 e e0 -> e3: colunas pela distancia ao inicial, e4 inalcancavel na ultima
+        afd = AFD({"e0", "e1", "e2", "e3", "e4"}, {"a", "b"},
+                  {("e0", "a"): "e1", ("e1", "a"): "e2", ("e0", "b"): "e3"}, "e0", {"e2"})
+        salvar_afd_jflap(afd, self.caminho, layout="camadas")
+        x = {estado.get("name"): int(estado.findtext("x"))
+             for estado in ET.parse(self.caminho).getroot().iter("state")}
+        self.assertEqual(x["e1"], x["e3"])
+        self.assertLess(x["e0"], x["e1"])
+        self.assertLess(x["e1"], x["e2"])
+        self.assertLess(x["e2"], x["e4"])
+
+    def test_layout_invalido(self):
+        afd = AFD({"e0"}, {"a"}, {}, "e0", set())
+        with self.assertRaises(ValueError):
+            salvar_afd_jflap(afd, self.caminho, layout="circulo")
+        self.assertFalse(os.path.exists(self.caminho))
+
+
+if __name__ == "__main__":
+    unittest.main()
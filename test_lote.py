@@ -0,0 +1,100 @@
+import contextlib
+import io
+import json
+import os
+import random
+import tempfile
+import unittest
+import lote
+from io_binario import carregar_afd_binario
+from io_jflap import carregar_afn_jflap, salvar_afn_jflap
+from conversor import conversor_afn_para_afd
+from test_conversor import gerar_afn
+
+"""
+testes do modo lote (lote.main): arquivos gerados, resumo em JSON e codigo de saida
+
+    python3 -m unittest test_lote
+"""
+
+class TesteLote(unittest.TestCase):
+    def setUp(self):
+        self.pasta = tempfile.TemporaryDirectory()
+        self.addCleanup(self.pasta.cleanup)
+        self.gerador = random.Random(21)
+
+    def criar_afn(self, *partes: str) -> str:
+        caminho = os.path.join(self.pasta.name, *partes)
+        os.makedirs(os.path.dirname(caminho), exist_ok=True)
+        salvar_afn_jflap(gerar_afn(self.gerador, n=4), caminho)
+        return caminho
+
+    def executar(self, *argumentos: str):
+        # roda lote.main com o resumo JSON na saida padrao
+        saida = io.StringIO()
+        with contextlib.redirect_stdout(saida):
+            codigo = lote.main([*argumentos, "--jobs", "2", "--json", "-"])
+        return codigo, json.loads(saida.getvalue())
+
+    def test_diretorio_e_resumo_json(self):
+        entradas = [self.criar_afn("afns", f"afn{i}.jff") for i in range(3)]
+        codigo, resumo = self.executar(os.path.join(self.pasta.name, "afns"))
+        self.assertEqual(codigo, 0)
+        self.assertEqual((resumo["total"], resumo["convertidos"], resumo["falhas"]), (3, 3, 0))
+        self.assertEqual([resultado["arquivo"] for resultado in resumo["arquivos"]], entradas)
+        for entrada, resultado in zip(entradas, resumo["arquivos"]):
+            self.assertTrue(resultado["ok"])
+            self.assertEqual(resultado["saida"], entrada[:-len(".jff")] + "-afd.jff")
+            esperado = conversor_afn_para_afd(carregar_afn_jflap(entrada), modo="bitset")
+            self.assertEqual(resultado["estados_afd"], esperado.quantidade_estados)
+            self.assertTrue(os.path.exists(resultado["saida"]))
+
+        # as saidas gravadas no diretorio nao viram entradas na execucao seguinte
+        codigo, resumo = self.executar(os.path.join(self.pasta.name, "afns"))
+        self.assertEqual(resumo["total"], 3)
+
+    def test_falha_muda_o_codigo_de_saida(self):
+        valido = self.criar_afn("ok.jff")
+        invalido = os.path.join(self.pasta.name, "invalido.jff")
+        with open(invalido, "w") as arquivo:
+            arquivo.write("<structure><automaton>")
+        codigo, resumo = self.executar(valido, invalido, os.path.join(self.pasta.name, "ausente.jff"))
+        self.assertEqual(codigo, 1)
+        self.assertEqual((resumo["convertidos"], resumo["falhas"]), (1, 2))
+        falhas = [resultado for resultado in resumo["arquivos"] if not resultado["ok"]]
+        self.assertTrue(all(resultado["erro"] for resultado in falhas))
+
+    def test_sem_entradas(self):
+        saida = io.StringIO()
+        with contextlib.redirect_stdout(saida):
+            codigo = lote.main([os.path.join(self.pasta.name, "*.jff")])
+        self.assertEqual(codigo, 1)
+
+    def test_saida_mantem_subdiretorios(self):
+        # a/x.jff e b/x.jff no mesmo diretorio de saida, em formato binario
+        primeiro = self.criar_afn("a", "x.jff")
+        segundo = self.criar_afn("b", "x.jff")
+        destino = os.path.join(self.pasta.name, "convertidos")
+        codigo, resumo = self.executar(primeiro, segundo, "--saida", destino, "--formato", "afdb")
+        self.assertEqual(codigo, 0)
+        saidas = [resultado["saida"] for resultado in resumo["arquivos"]]
+        self.assertEqual(saidas, [os.path.join(destino, "a", "x-afd.afdb"), os.path.join(destino, "b", "x-afd.afdb")])
+        for entrada, saida in zip((primeiro, segundo), saidas):
+            esperado = conversor_afn_para_afd(carregar_afn_jflap(entrada), modo="bitset")
+            with carregar_afd_binario(saida) as afd:
+                self.assertEqual(afd.para_afd().equivalente(esperado), (True, None))
+
+    def test_saidas_repetidas(self):
+        primeiro = self.criar_afn("x.jff")
+        segundo = os.path.join(self.pasta.name, "x.xml")
+        os.rename(self.criar_afn("y.jff"), segundo)
+        saida = io.StringIO()
+        with contextlib.redirect_stdout(saida):
+            codigo = lote.main([primeiro, segundo, "--saida", os.path.join(self.pasta.name, "saida")])
+        self.assertEqual(codigo, 1)
+        self.assertIn("mesmo arquivo", saida.getvalue())
+        self.assertFalse(os.path.exists(os.path.join(self.pasta.name, "saida")))
+
+
+if __name__ == "__main__":
+    unittest.main()
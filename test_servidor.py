@@ -0,0 +1,112 @@
+import asyncio
+import json
+import os
+import tempfile
+import unittest
+import servidor
+from afd import AFD
+from io_binario import salvar_afd_binario
+from servidor import ServidorCasamento, carregar_automato, nome_e_caminho
+from test_conversor import ENTRADA_TESTE
+
+"""
+testes do servidor de casamento: os comandos M, B, L e S por uma conexao TCP em
+localhost, linhas longas demais, o limite de cadeias por lote e a carga dos automatos
+
+    python3 -m unittest test_servidor
+"""
+
+def afd_par() -> AFD:
+    # aceita as cadeias sobre {a, b} com uma quantidade par de 'a'
+    return AFD({"par", "impar"}, {"a", "b"},
+               {("par", "a"): "impar", ("par", "b"): "par", ("impar", "a"): "par", ("impar", "b"): "impar"},
+               "par", {"par"})
+
+
+class TesteServidor(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.servidor = ServidorCasamento({"par": afd_par().compilar()}, limite_linha=64, max_lote=5)
+        self.tcp = await self.servidor.iniciar("127.0.0.1", 0)
+        self.porta = self.tcp.sockets[0].getsockname()[1]
+
+    async def asyncTearDown(self):
+        self.tcp.close()
+        await self.tcp.wait_closed()
+
+    async def conversar(self, texto: str, respostas: int) -> list:
+        # envia tudo de uma vez (pedidos em sequencia) e le as respostas na ordem
+        leitor, escritor = await asyncio.open_connection("127.0.0.1", self.porta)
+        try:
+            escritor.write(texto.encode("utf-8"))
+            await escritor.drain()
+            linhas = [await asyncio.wait_for(leitor.readline(), 10) for _ in range(respostas)]
+        finally:
+            escritor.close()
+            await escritor.wait_closed()
+        return [linha.decode("utf-8").rstrip("\n") for linha in linhas]
+
+    async def test_comandos(self):
+        respostas = await self.conversar("M par aa\nM par ab\n\nB par 3\na\n\nbab\nL\nX\nM outro a\n", 6)
+        self.assertEqual(respostas, ["1", "0", "010", "par",
+                                     "E comando desconhecido: X", "E automato desconhecido: outro"])
+
+    async def test_lote_com_erros(self):
+        # as linhas do lote sao consumidas mesmo quando o lote e recusado
+        respostas = await self.conversar("B outro 2\na\nb\nB par x\nB par 0\nM par M\n", 4)
+        self.assertEqual(respostas, ["E automato desconhecido: outro", "E quantidade invalida", "", "0"])
+
+    async def test_lote_maior_que_o_maximo(self):
+        cadeias = "".join(f"{'a' * i}\n" for i in range(6))
+        respostas = await self.conversar(f"B par 6\n{cadeias}B par 5\n{cadeias[:-len('aaaaa') - 1]}M par b\n", 3)
+        self.assertEqual(respostas, ["E lote maior que o maximo de 5 cadeias", "10101", "1"])
+        self.assertEqual(self.servidor.estatisticas_automatos["par"].cadeias, 6)
+
+    async def test_lote_em_fatias(self):
+        original = servidor.TAMANHO_FATIA_LOTE
+        servidor.TAMANHO_FATIA_LOTE = 2
+        self.addCleanup(setattr, servidor, "TAMANHO_FATIA_LOTE", original)
+        respostas = await self.conversar("B par 5\naa\na\nb\naba\nbbb\nM par a\n", 2)
+        self.assertEqual(respostas, ["10111", "0"])
+
+    async def test_linha_longa(self):
+        longa = "a" * 1000
+        respostas = await self.conversar(f"M par {longa}\nM par aa\nB par 2\n{longa}\nb\nL\n", 4)
+        self.assertEqual(respostas, ["E linha longa demais", "1", "E linha longa demais", "par"])
+
+    async def test_estatisticas(self):
+        await self.conversar("M par aa\nB par 2\na\nbb\n", 2)
+        respostas = await self.conversar("S\n", 1)
+        dados = json.loads(respostas[0])
+        self.assertEqual(dados["conexoes"], 2)
+        par = dados["automatos"]["par"]
+        self.assertEqual((par["requisicoes"], par["cadeias"], par["aceitas"], par["simbolos"]), (2, 3, 2, 5))
+
+    async def test_clientes_simultaneos(self):
+        lote = "".join("ab\n" for _ in range(5))
+        respostas = await asyncio.gather(*(self.conversar(f"B par 5\n{lote}M par a\n", 2) for _ in range(8)))
+        self.assertEqual(respostas, [["00000", "0"]] * 8)
+
+
+class TesteCarga(unittest.TestCase):
+    def test_nome_e_caminho(self):
+        self.assertEqual(nome_e_caminho("binario=afns/x.jff"), ("binario", "afns/x.jff"))
+        self.assertEqual(nome_e_caminho(os.path.join("afns", "outro.afdb")), ("outro", os.path.join("afns", "outro.afdb")))
+
+    def test_carregar_automato(self):
+        cadeias = ["", "a", "ab", "ba", "abba", "bbbb", "x"]
+        automato = carregar_automato(ENTRADA_TESTE)
+        with tempfile.TemporaryDirectory() as diretorio:
+            caminho = os.path.join(diretorio, "par.afdb")
+            salvar_afd_binario(afd_par(), caminho)
+            binario = carregar_automato(caminho)
+            try:
+                self.assertEqual([binario.aceita(cadeia) for cadeia in cadeias], afd_par().processar_lote(cadeias))
+            finally:
+                binario.fechar()
+        minimo = carregar_automato(ENTRADA_TESTE, minimizar=True)
+        self.assertEqual([automato.aceita(cadeia) for cadeia in cadeias],
+                         [minimo.aceita(cadeia) for cadeia in cadeias])
+
+
+if __name__ == "__main__":
+    unittest.main()
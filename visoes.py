@@ -0,0 +1,96 @@
+"""
+conjuntos e dicionarios que avisam o automato dono quando sao alterados
+
+o AFN e o AFD guardam as transicoes em arrays compactos e montam estados /
+func_transicao como visoes sob demanda. essas visoes (e os atributos alfabeto e
+estados_aceitacao) sao destas classes: qualquer alteracao feita diretamente nelas
+chama o aviso do dono, que descarta o que ficou obsoleto (arrays, indice, tabela
+compilada) e refaz na proxima consulta
+"""
+
+class ConjuntoMonitorado(set):
+    """
+    set que chama aviso() depois de cada operacao que o altera
+    """
+    __slots__ = ("_aviso",)
+
+    def __init__(self, dados=(), aviso=None):
+        super().__init__(dados)
+        self._aviso = aviso
+
+    def _alterado(self):
+        if self._aviso is not None:
+            self._aviso()
+
+    def __repr__(self):
+        return repr(set(self))
+
+    def __reduce__(self):
+        # copias (pickle / copy) continuam avisando o dono copiado junto
+        return (ConjuntoMonitorado, (list(self), self._aviso))
+
+
+class DicionarioMonitorado(dict):
+    """
+    dict que chama aviso() depois de cada operacao que o altera. com
+    'monitorar_valores', os valores guardados viram ConjuntoMonitorado com o mesmo
+    aviso, entao func_transicao[(estado, simbolo)].add(destino) tambem avisa
+    """
+    __slots__ = ("_aviso", "_monitorar_valores")
+
+    def __init__(self, dados=(), aviso=None, monitorar_valores=False):
+        self._aviso = aviso
+        self._monitorar_valores = monitorar_valores
+        super().__init__()
+        for chave, valor in dict(dados).items():
+            super().__setitem__(chave, self._valor(valor))
+
+    def _valor(self, valor):
+        if self._monitorar_valores:
+            return ConjuntoMonitorado(valor, self._aviso)
+        return valor
+
+    def _alterado(self):
+        if self._aviso is not None:
+            self._aviso()
+
+    def __setitem__(self, chave, valor):
+        super().__setitem__(chave, self._valor(valor))
+        self._alterado()
+
+    def setdefault(self, chave, padrao=None):
+        if chave not in self:
+            self[chave] = padrao
+        return self[chave]
+
+    def update(self, *args, **kwargs):
+        for chave, valor in dict(*args, **kwargs).items():
+            super().__setitem__(chave, self._valor(valor))
+        self._alterado()
+
+    def __ior__(self, outro):
+        self.update(outro)
+        return self
+
+    def __reduce__(self):
+        return (DicionarioMonitorado, (dict(self), self._aviso, self._monitorar_valores))
+
+
+def _monitorar(classe, base, nomes):
+    # sobrescreve os metodos que alteram o conteudo para chamar _alterado() em seguida
+    for nome in nomes:
+        original = getattr(base, nome)
+
+        def metodo(self, *args, _original=original):
+            resultado = _original(self, *args)
+            self._alterado()
+            return resultado
+        metodo.__name__ = nome
+        setattr(classe, nome, metodo)
+
+_monitorar(ConjuntoMonitorado, set, (
+    "add", "discard", "remove", "pop", "clear", "update", "difference_update",
+    "intersection_update", "symmetric_difference_update",
+    "__ior__", "__iand__", "__isub__", "__ixor__",
+))
+_monitorar(DicionarioMonitorado, dict, ("__delitem__", "pop", "popitem", "clear"))